@@ -1,9 +1,15 @@
 from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
 from app.config import Config
 from app.extensions import db, migrate, jwt, ma
 from app.routes.auth_routes import auth_bp
 from app.routes.post_routes import post_bp
 from app.routes.comment_routes import comment_bp
+from app.routes.change_routes import change_bp
+from app.routes.metrics_routes import metrics_bp
+from app.routes.export_routes import export_bp
+from app.utils.admission import init_admission_control
+from app.utils.profiling import init_profiling
 from app.logger import setup_logger
 from flasgger import Swagger
 from app.swagger_config import SWAGGER_TEMPLATE
@@ -25,6 +31,12 @@ def create_app():
         app.config.from_object(Config)
         logger.info("Configuration loaded into Flask app.")
 
+        # Take the client address from the trusted reverse proxies, not the connection
+        hops = app.config['TRUSTED_PROXY_HOPS']
+        if hops:
+            app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+            logger.info(f"ProxyFix enabled for {hops} trusted proxy hop(s).")
+
         # Initialize Flask extensions
         db.init_app(app)
         logger.info("SQLAlchemy initialized.")
@@ -53,8 +65,19 @@ def create_app():
         app.register_blueprint(auth_bp, url_prefix='/api/auth')
         app.register_blueprint(post_bp, url_prefix='/api')
         app.register_blueprint(comment_bp, url_prefix='/api')
+        app.register_blueprint(change_bp, url_prefix='/api')
+        app.register_blueprint(metrics_bp, url_prefix='/api')
+        app.register_blueprint(export_bp, url_prefix='/api')
         logger.info("Blueprints registered successfully.")
 
+        # Shed excess load per endpoint class before it queues on the database
+        if app.config['ADMISSION_CONTROL_ENABLED']:
+            init_admission_control(app)
+
+        # Sampling profiler for a fraction of requests; no hooks at all unless switched on
+        if app.config['PROFILING_ENABLED'] or app.config['PROFILING_TOKEN']:
+            init_profiling(app)
+
         logger.info("Flask application setup completed successfully.")
         return app
 
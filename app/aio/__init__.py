@@ -0,0 +1,51 @@
+from quart import Quart
+from app.config import Config
+from app.aio.database import init_async_db
+from app.aio.routes.auth_routes import auth_bp
+from app.aio.routes.post_routes import post_bp
+from app.aio.routes.comment_routes import comment_bp
+from app.aio.routes.change_routes import change_bp
+from app.logger import setup_logger
+
+# Initialize module-level logger
+logger = setup_logger(__name__)
+
+def create_async_app():
+    """
+    Async application factory.
+    Creates a Quart (ASGI) application exposing the same URL surface and JSON
+    shapes as the Flask app, backed by an async SQLAlchemy engine.
+    """
+    try:
+        # Create Quart app instance
+        app = Quart(__name__)
+        logger.info("Quart app instance created.")
+
+        # Load the shared configuration plus the JWT default Flask-JWT-Extended would set
+        app.config.from_object(Config)
+        app.config.setdefault('JWT_ALGORITHM', 'HS256')
+        logger.info("Configuration loaded into Quart app.")
+
+        # Async engine and session factory
+        init_async_db(app)
+        if app.config.get('SHARD_BINDS'):
+            logger.warning("SHARD_BINDS is set but the async app only serves the main database; "
+                           "run the WSGI app while posts are sharded.")
+
+        # Import models to register them with SQLAlchemy metadata
+        from app import models  # noqa: F401
+        logger.debug("Models imported and SQLAlchemy metadata registered.")
+
+        # Register async blueprints with the same prefixes as the WSGI app
+        app.register_blueprint(auth_bp, url_prefix='/api/auth')
+        app.register_blueprint(post_bp, url_prefix='/api')
+        app.register_blueprint(comment_bp, url_prefix='/api')
+        app.register_blueprint(change_bp, url_prefix='/api')
+        logger.info("Async blueprints registered successfully.")
+
+        logger.info("Quart application setup completed successfully.")
+        return app
+
+    except Exception as e:
+        logger.error(f"Async application setup failed: {e}")
+        raise
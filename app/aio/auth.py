@@ -0,0 +1,133 @@
+import uuid
+from datetime import datetime, timezone
+from functools import wraps
+import jwt
+from quart import request, jsonify, current_app
+from app.models.user import User
+from app.aio.database import get_session
+from app.services.token_revocation import get_revocation_store
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+
+def _create_token(identity, token_type, expires_delta):
+    """
+    Creates a token compatible with Flask-JWT-Extended, so tokens work
+    against both the WSGI and the ASGI deployment.
+    """
+    now = datetime.now(timezone.utc)
+    claims = {
+        "fresh": False,
+        "iat": now,
+        "nbf": now,
+        "jti": str(uuid.uuid4()),
+        "type": token_type,
+        "sub": identity,
+        "exp": now + expires_delta,
+    }
+    return jwt.encode(claims, current_app.config['JWT_SECRET_KEY'],
+                      algorithm=current_app.config['JWT_ALGORITHM'])
+
+
+def create_access_token(identity):
+    return _create_token(identity, 'access', current_app.config['JWT_ACCESS_TOKEN_EXPIRES'])
+
+
+def create_refresh_token(identity):
+    return _create_token(identity, 'refresh', current_app.config['JWT_REFRESH_TOKEN_EXPIRES'])
+
+
+async def is_token_revoked(jti):
+    """
+    Async counterpart of app.services.token_revocation.is_token_revoked, sharing
+    the same in-memory store and incremental sync query.
+    """
+    store = get_revocation_store(current_app._get_current_object())
+
+    if store.needs_sync():
+        async with get_session() as session:
+            store.apply((await session.execute(store.sync_query())).all())
+
+    return jti in store
+
+
+async def _verify_bearer_token(token_types):
+    """
+    Decodes the Bearer token of the current request.
+
+    Returns:
+        tuple: (claims, None) if valid, or (None, error response) otherwise
+    """
+    auth_header = request.headers.get('Authorization', '')
+    if not auth_header.startswith('Bearer '):
+        return None, (jsonify({"msg": "Missing Authorization Header"}), 401)
+
+    try:
+        claims = jwt.decode(
+            auth_header[len('Bearer '):],
+            current_app.config['JWT_SECRET_KEY'],
+            algorithms=[current_app.config['JWT_ALGORITHM']]
+        )
+    except jwt.PyJWTError as e:
+        logger.warning(f"Invalid JWT: {e}")
+        return None, (jsonify({"error": "Authentication failed", "details": str(e)}), 401)
+
+    if claims.get('type') not in token_types:
+        return None, (jsonify({"msg": f"Only {' or '.join(token_types)} tokens are allowed"}), 422)
+
+    if await is_token_revoked(claims['jti']):
+        return None, (jsonify({"msg": "Token has been revoked"}), 401)
+
+    return claims, None
+
+
+def jwt_required(token_types=('access',)):
+    """
+    Async counterpart of flask_jwt_extended.jwt_required for the given token types.
+    The decoded claims are available as request.jwt_claims.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            claims, error = await _verify_bearer_token(token_types)
+            if error:
+                return error
+
+            request.jwt_claims = claims
+            return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def jwt_required_with_user(fn):
+    """
+    Async counterpart of app.utils.decorators.jwt_required_with_user.
+
+    Validates the Bearer access token and injects the authenticated user
+    into the route handler.
+
+    Returns 401 if JWT is invalid or missing.
+    Returns 404 if user from JWT is not found in the database.
+    """
+
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        claims, error = await _verify_bearer_token(('access',))
+        if error:
+            return error
+
+        async with get_session() as session:
+            user = await session.get(User, int(claims['sub']))
+
+        if not user:
+            logger.warning(f"User not found for user_id={claims['sub']}")
+            return jsonify({"error": "User not found."}), 404
+
+        request.jwt_claims = claims
+        return await fn(user, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,74 @@
+from quart import current_app
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.extensions import db
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# Sync driver -> async driver used by the ASGI variant
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'postgresql+psycopg2': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+
+def to_async_url(url):
+    """
+    Converts a sync SQLAlchemy URL (as used by DATABASE_URL) to its async driver.
+
+    Parameters:
+        url (str): Database URL, e.g. postgresql://... or sqlite:///...
+
+    Returns:
+        str: URL using asyncpg or aiosqlite
+    """
+    scheme, sep, rest = url.partition('://')
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+def init_async_db(app):
+    """
+    Creates the async engine and session factory and registers them on the app.
+    """
+    url = app.config.get('ASYNC_DATABASE_URL') or to_async_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    engine_options = {}
+
+    if url.startswith('sqlite') and ':memory:' in url:
+        # Share one connection so every session sees the same in-memory database
+        engine_options.update(poolclass=StaticPool, connect_args={'check_same_thread': False})
+
+    engine = create_async_engine(url, **engine_options)
+    app.extensions['async_db'] = {
+        'engine': engine,
+        'sessionmaker': async_sessionmaker(engine, expire_on_commit=False),
+    }
+    logger.info(f"Async SQLAlchemy engine created for {engine.url.render_as_string(hide_password=True)}")
+
+    @app.after_serving
+    async def dispose_engine():
+        await engine.dispose()
+        logger.info("Async SQLAlchemy engine disposed.")
+
+
+def get_session():
+    """
+    Returns a new AsyncSession bound to the current app's engine.
+
+    Usage:
+        async with get_session() as session:
+            ...
+    """
+    return current_app.extensions['async_db']['sessionmaker']()
+
+
+async def create_all():
+    """
+    Creates all tables on the async engine (used for local SQLite and tests).
+    """
+    engine = current_app.extensions['async_db']['engine']
+    async with engine.begin() as conn:
+        await conn.run_sync(db.metadata.create_all)
+    logger.info("Database tables created on async engine.")
@@ -0,0 +1,200 @@
+import asyncio
+from datetime import datetime, timezone
+from quart import Blueprint, request, jsonify, current_app
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import generate_password_hash, check_password_hash
+from app.models.user import User
+from app.models.revoked_token import RevokedToken
+from app.aio.auth import create_access_token, create_refresh_token, jwt_required
+from app.services.token_revocation import get_revocation_store
+from app.services.availability import get_availability_index, taken_query
+from app.services.auth_service import user_insert_stmt
+from app.aio.database import get_session
+from app.routes.auth_routes import validate_email, validate_password, availability_values
+from app.logger import setup_logger
+
+# Set up logger
+logger = setup_logger(__name__)
+
+# Define blueprint for async authentication routes
+auth_bp = Blueprint('auth', __name__)
+
+
+@auth_bp.route('/register', methods=['POST'])
+async def register():
+    """
+    Registers a new user with validation.
+    """
+    data = await request.get_json(silent=True)
+    if data is None:
+        logger.warning("Register request failed: Missing or invalid JSON.")
+        return jsonify({"error": "Missing or invalid JSON"}), 400
+
+    try:
+        required_fields = ['username', 'email', 'password']
+        if not all(field in data for field in required_fields):
+            logger.warning("Register request failed: Missing required fields.")
+            return jsonify({"error": f"Missing required fields: {', '.join(required_fields)}"}), 400
+
+        username = data['username'].strip()
+        email = data['email'].strip().lower()
+        password = data['password']
+
+        # Field validation
+        if len(username) < 4:
+            return jsonify({"error": "Username must be at least 4 characters"}), 400
+        if not validate_email(email):
+            return jsonify({"error": "Invalid email format"}), 400
+        if not validate_password(password):
+            return jsonify({
+                "error": "Password must be 8+ characters with at least one uppercase, one lowercase, and one number"
+            }), 400
+
+        # Hashing is CPU-bound; keep it off the event loop
+        hashed_password = await asyncio.to_thread(generate_password_hash, password)
+
+        async with get_session() as session:
+            # Insert optimistically; the unique constraints decide conflicts
+            try:
+                user = (await session.execute(user_insert_stmt(username, email, hashed_password))).one()
+                await session.commit()
+            except IntegrityError:
+                await session.rollback()
+                logger.warning(f"Registration conflict for {username}")
+                return jsonify({"error": "Username or email already exists."}), 409
+
+        get_availability_index(current_app._get_current_object()).add(username, email)
+        logger.info(f"User registered: {username} (ID: {user.id})")
+        return jsonify({
+            "message": "User registered successfully",
+            "user": {
+                "id": user.id,
+                "username": user.username,
+                "email": user.email
+            }
+        }), 201
+
+    except Exception as e:
+        logger.error(f"Unexpected error during registration: {e}")
+        return jsonify({"error": "Registration failed", "details": str(e)}), 500
+
+
+@auth_bp.route('/available', methods=['GET'])
+async def available():
+    """
+    Checks whether a username and/or email is still free, sharing the
+    in-memory filter and queries of app.services.availability.
+    """
+    values = availability_values(request.args)
+    if not values:
+        return jsonify({"error": "Give a username and/or email to check"}), 400
+
+    try:
+        index = get_availability_index(current_app._get_current_object())
+        async with get_session() as session:
+            if index.needs_load():
+                index.load((await session.execute(index.load_query())).all())
+            elif index.needs_sync():
+                index.apply((await session.execute(index.sync_query())).all())
+
+            result = {}
+            for field, value in values.items():
+                if not index.might_exist(field, value):
+                    result[field] = True
+                else:
+                    result[field] = (await session.execute(taken_query(field, value))).first() is None
+
+        return jsonify({"available": result}), 200
+
+    except Exception as e:
+        logger.error(f"Error checking availability: {e}")
+        return jsonify({"error": "Availability check failed", "details": str(e)}), 500
+
+
+@auth_bp.route('/login', methods=['POST'])
+async def login():
+    """
+    Authenticates a user and returns a JWT token.
+    """
+    data = await request.get_json(silent=True)
+    if data is None:
+        logger.warning("Login request failed: Missing JSON in request.")
+        return jsonify({"error": "Missing JSON in request"}), 400
+
+    try:
+        required_fields = ['username', 'password']
+        if not all(field in data for field in required_fields):
+            logger.warning("Login request failed: Missing required fields.")
+            return jsonify({"error": f"Missing required fields: {', '.join(required_fields)}"}), 400
+
+        username = data['username'].strip()
+        password = data['password']
+
+        async with get_session() as session:
+            user = (await session.execute(
+                select(User).where(User.username == username)
+            )).scalar_one_or_none()
+
+        if not user or not await asyncio.to_thread(check_password_hash, user.password, password):
+            logger.warning(f"Authentication failed for user: {username}")
+            return jsonify({"error": "Invalid credentials."}), 401
+
+        access_token = create_access_token(identity=user.id)
+        refresh_token = create_refresh_token(identity=user.id)
+
+        logger.info(f"User logged in: {username} (ID: {user.id})")
+        return jsonify({
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "token_type": "bearer",
+            "user": {
+                "id": user.id,
+                "username": user.username
+            }
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Unexpected error during login: {e}")
+        return jsonify({"error": "Login failed", "details": str(e)}), 500
+
+
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(token_types=('refresh',))
+async def refresh():
+    """
+    Issues a new access token for the identity of a valid refresh token.
+    """
+    identity = request.jwt_claims['sub']
+    logger.info(f"Access token refreshed for user ID {identity}")
+    return jsonify({
+        "access_token": create_access_token(identity=identity),
+        "token_type": "bearer"
+    }), 200
+
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(token_types=('access', 'refresh'))
+async def logout():
+    """
+    Revokes the token (access or refresh) used for this request.
+    """
+    try:
+        claims = request.jwt_claims
+        expires_at = datetime.fromtimestamp(claims['exp'], timezone.utc).replace(tzinfo=None)
+
+        async with get_session() as session:
+            try:
+                session.add(RevokedToken(jti=claims['jti'], expires_at=expires_at))
+                await session.commit()
+            except IntegrityError:
+                await session.rollback()
+
+        get_revocation_store(current_app._get_current_object()).add(claims['jti'], expires_at)
+
+        logger.info(f"User logged out: ID {claims['sub']}")
+        return jsonify({"message": "Successfully logged out."}), 200
+
+    except Exception as e:
+        logger.error(f"Unexpected error during logout: {e}")
+        return jsonify({"error": "Logout failed", "details": str(e)}), 500
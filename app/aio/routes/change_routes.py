@@ -0,0 +1,50 @@
+from quart import Blueprint, request, jsonify, current_app
+from app.aio.database import get_session
+from app.services.change_feed import (
+    oldest_change_query, cursor_expired, changes_query, committed_prefix,
+    changed_ids, current_rows_queries, build_page
+)
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# Define blueprint for the async change feed
+change_bp = Blueprint('changes', __name__)
+
+
+@change_bp.route('/changes', methods=['GET'])
+async def list_changes():
+    try:
+        page_size = current_app.config['CHANGE_FEED_PAGE_SIZE']
+        since = request.args.get('since', type=int)
+        limit = request.args.get('limit', type=int)
+
+        # A malformed value parses as None; reject it rather than fall back to a full resync
+        if 'since' in request.args and (since is None or since < 0):
+            return jsonify({"error": "since must be a non-negative integer."}), 400
+        if 'limit' in request.args and (limit is None or not 1 <= limit <= page_size):
+            return jsonify({"error": f"limit must be between 1 and {page_size}."}), 400
+        since = since or 0
+        limit = limit or page_size
+
+        async with get_session() as session:
+            if cursor_expired(since, (await session.execute(oldest_change_query())).scalar()):
+                logger.info(f"Change feed cursor {since} expired; client must resync.")
+                return jsonify({"error": "Cursor expired; resync required."}), 410
+
+            rows = (await session.execute(changes_query(since, limit))).all()
+            committed, blocked = committed_prefix(rows, since, current_app.config['CHANGE_FEED_GAP_TIMEOUT'])
+            compacted = changed_ids(committed)
+
+            posts_stmt, comments_stmt = current_rows_queries(compacted)
+            posts = (await session.execute(posts_stmt)).scalars().all() if posts_stmt is not None else []
+            comments = (await session.execute(comments_stmt)).all() if comments_stmt is not None else []
+
+        page = build_page(since, limit, rows, committed, blocked, compacted, posts, comments)
+        logger.info(f"Fetched {len(page['changes'])} changes since {since}.")
+        return jsonify(page), 200
+
+    except Exception as e:
+        logger.error(f"Error fetching changes since {request.args.get('since')}: {e}")
+        return jsonify({"error": "Failed to retrieve changes"}), 500
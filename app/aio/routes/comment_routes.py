@@ -0,0 +1,394 @@
+import asyncio
+from quart import Blueprint, Response, request, jsonify, current_app
+from sqlalchemy import select, insert
+from app.models.comment import Comment
+from app.models.comment_archive import CommentArchive
+from app.models.post import Post
+from app.schemas.comment_schema import comment_schema
+from app.aio.auth import jwt_required_with_user
+from app.aio.database import get_session
+from app.aio.trending import record_comment_activity
+from app.services.post_stats import comment_added_stmt, comment_removed_stmt
+from app.models.change import Change
+from app.services.comment_threads import (
+    thread_query, build_thread, parse_thread_limits, subtree_delete_stmt, subtree_summary, tombstone_rows
+)
+from app.services.change_feed import change_stmt
+from app.services.comment_stream import get_comment_hub, catch_up_query, encode_catch_up
+from app.services.comment_archive import (
+    archived_probe_query, post_lock_query, restore_post_stmts, comments_list_query,
+    archive_watermark_query, archive_needed, watermark_reached, merge_comment_pages, archived_post_query
+)
+from app.services.owned_writes import comment_insert_stmt, comment_update_stmt, comment_owner_query, refusal
+from app.services.count_service import (
+    post_comment_count_query, exact_count_query, estimate_statement, parse_estimate, set_total_count,
+    EXACT, ESTIMATED
+)
+from app.services.read_path import comment_rows
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# Define blueprint for async comment-related routes
+comment_bp = Blueprint('comments', __name__)
+
+
+async def _restore_post_comments(session, post_id):
+    """Async counterpart of comment_archive.restore_post_comments(); does not commit."""
+    if (await session.execute(archived_probe_query(post_id))).first() is None:
+        return False
+
+    await session.execute(post_lock_query(post_id))
+    for statement in restore_post_stmts(post_id):
+        await session.execute(statement)
+    return True
+
+
+async def _restore_owned_comment(session, comment_id, user_id):
+    """
+    After a conditional write matched nothing: restores the comment's thread
+    if it is the user's archived comment. Returns (owner id, restored).
+    """
+    owner_id = (await session.execute(comment_owner_query(comment_id))).scalar()
+    if owner_id != user_id:
+        return owner_id, False
+
+    post_id = (await session.execute(archived_post_query(comment_id))).scalar()
+    restored = post_id is not None and await _restore_post_comments(session, post_id)
+    return owner_id, restored
+
+
+@comment_bp.route('/comments', methods=['POST'])
+@jwt_required_with_user
+async def create_comment(current_user):
+    data = await request.get_json(silent=True)
+    if data is None:
+        logger.warning("Create comment failed: Invalid JSON")
+        return jsonify({"error": "Missing or invalid JSON"}), 400
+
+    try:
+        content = data.get('content')
+        post_id = data.get('post_id')
+
+        if not content or not post_id:
+            logger.warning("Create comment failed: Missing fields.")
+            return jsonify({"error": "Content and post_id are required."}), 400
+
+        parent_id = data.get('parent_id')
+
+        async with get_session() as session:
+            # A post that becomes active again gets its archived thread back first
+            await _restore_post_comments(session, int(post_id))
+
+            if parent_id is not None:
+                parent_post_id = (await session.execute(
+                    select(Comment.post_id).where(Comment.id == parent_id)
+                )).scalar()
+                if parent_post_id is None or parent_post_id != int(post_id):
+                    logger.warning(f"Create comment failed: invalid parent_id={parent_id}")
+                    return jsonify({"error": "parent_id must be a comment on the same post."}), 400
+
+            # INSERT ... RETURNING hands back the dumped columns; no refresh query after commit
+            row = (await session.execute(
+                comment_insert_stmt(content, post_id, current_user.id, parent_id)
+            )).one()
+            await session.execute(comment_added_stmt(post_id))
+            await session.execute(change_stmt('comment', row.id))
+            await session.commit()
+
+        payload = comment_rows.dump_row(row)
+        get_comment_hub(current_app._get_current_object()).publish(payload)
+        await record_comment_activity(post_id)
+
+        logger.info(f"Comment created by user {current_user.id} on post {post_id}")
+        return jsonify(payload), 201
+
+    except Exception as e:
+        logger.error(f"Error while creating comment: {e}")
+        return jsonify({"error": "Failed to create comment"}), 500
+
+
+async def _count_comments(session, post_id):
+    """Async counterpart of count_service.count_comments()."""
+    if post_id is not None:
+        return (await session.execute(post_comment_count_query(post_id))).scalar() or 0, EXACT
+
+    connection = await session.connection()
+    total, kind = 0, EXACT
+    for model in (Comment, CommentArchive):
+        query = comments_list_query(model)
+        statement = estimate_statement(query, connection.dialect)
+        if statement is None:
+            total += (await session.execute(exact_count_query(query))).scalar()
+        else:
+            total += parse_estimate((await connection.exec_driver_sql(*statement)).scalar())
+            kind = ESTIMATED
+    return total, kind
+
+
+@comment_bp.route('/comments', methods=['GET'])
+async def get_comments():
+    try:
+        post_id = request.args.get('post_id', type=int) or None
+        before = request.args.get('before', type=int)
+        limit = request.args.get('limit', type=int)
+        max_page = current_app.config['COMMENTS_MAX_PAGE_SIZE']
+
+        if 'before' in request.args and before is None:
+            return jsonify({"error": "before must be a comment id."}), 400
+        if limit is None and before is not None:
+            limit = max_page
+        if 'limit' in request.args and (limit is None or not 1 <= limit <= max_page):
+            return jsonify({"error": f"limit must be between 1 and {max_page}."}), 400
+
+        if post_id:
+            logger.info(f"Fetching comments for post_id={post_id}")
+        else:
+            logger.info("Fetching all comments")
+
+        async with get_session() as session:
+            # Plain Core rows: no ORM instances are built for a list
+            connection = await session.connection()
+            hot = (await connection.execute(comments_list_query(Comment, post_id, before, limit))).all()
+
+            # The archive is only read once the request reaches archived ranges
+            needed = archive_needed(hot, post_id, limit)
+            if needed is None:
+                needed = watermark_reached(hot, (await session.execute(archive_watermark_query())).scalar())
+            archived = []
+            if needed:
+                archived = (await connection.execute(
+                    comments_list_query(CommentArchive, post_id, before, limit)
+                )).all()
+
+            count, kind = await _count_comments(session, post_id)
+
+        comments, next_cursor = merge_comment_pages(hot, archived, limit)
+        response = set_total_count(jsonify(comment_rows.dump(comments)), count, kind)
+        if next_cursor is not None:
+            response.headers['X-Next-Cursor'] = str(next_cursor)
+        return response, 200
+
+    except Exception as e:
+        logger.error(f"Error retrieving comments: {e}")
+        return jsonify({"error": "Failed to retrieve comments"}), 500
+
+
+async def _poll_comments(hub):
+    """Async counterpart of app.services.comment_stream.start_poller."""
+    while True:
+        await asyncio.sleep(hub.poll_interval)
+        try:
+            async with get_session() as session:
+                hub.apply_poll(await session.execute(hub.poll_query()))
+        except Exception as e:
+            logger.error(f"Comment stream poll failed: {e}")
+
+
+@comment_bp.route('/comments/stream', methods=['GET'])
+async def stream_comments():
+    post_id = request.args.get('post_id', type=int)
+    if post_id is None:
+        return jsonify({"error": "post_id is required."}), 400
+
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    try:
+        last_event_id = int(last_event_id) if last_event_id is not None else None
+    except ValueError:
+        return jsonify({"error": "Last-Event-ID must be a comment id."}), 400
+
+    config = current_app.config
+    hub = get_comment_hub(current_app._get_current_object())
+    loop = asyncio.get_running_loop()
+    subscription = None
+
+    try:
+        async with get_session() as session:
+            post = (await session.execute(
+                select(Post.id).where(Post.id == post_id, Post.deleted_at.is_(None))
+            )).scalar()
+            if post is None:
+                return jsonify({"error": "Post not found."}), 404
+
+            if not config.get('BACKGROUND_TASKS_EAGER') and hub.claim_poller():
+                loop.create_task(_poll_comments(hub))
+
+            # Subscribe before reading the backlog so nothing committed in between is lost;
+            # an idle subscriber costs one asyncio.Event
+            woken = asyncio.Event()
+            subscription = hub.subscribe(post_id, lambda: loop.call_soon_threadsafe(woken.set))
+
+            backlog = []
+            if last_event_id is not None:
+                backlog = encode_catch_up((await session.execute(
+                    catch_up_query(post_id, last_event_id, config['COMMENT_STREAM_BACKLOG'])
+                )).scalars().all())
+
+    except Exception as e:
+        if subscription is not None:
+            hub.unsubscribe(post_id, subscription)
+        logger.error(f"Error opening comment stream for post {post_id}: {e}")
+        return jsonify({"error": "Failed to open comment stream"}), 500
+
+    async def events():
+        try:
+            yield f"retry: {config['COMMENT_STREAM_RETRY_MS']}\n\n"
+
+            sent = set()
+            for comment_id, encoded in backlog:
+                sent.add(comment_id)
+                yield encoded
+
+            while True:
+                for comment_id, encoded in subscription.drain():
+                    if comment_id not in sent:
+                        yield encoded
+
+                try:
+                    await asyncio.wait_for(woken.wait(), timeout=config['COMMENT_STREAM_HEARTBEAT'])
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                woken.clear()
+        finally:
+            hub.unsubscribe(post_id, subscription)
+
+    logger.info(f"Comment stream opened for post_id={post_id} (resume from {last_event_id})")
+    response = Response(events(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.timeout = None  # Streams stay open indefinitely
+    return response
+
+
+@comment_bp.route('/comments/thread', methods=['GET'])
+async def get_post_thread():
+    try:
+        post_id = request.args.get('post_id', type=int)
+        if post_id is None:
+            return jsonify({"error": "post_id is required."}), 400
+
+        limits, error = parse_thread_limits(request.args, current_app.config)
+        if error:
+            return jsonify({"error": error}), 400
+
+        async with get_session() as session:
+            rows = (await session.execute(thread_query(post_id=post_id, **limits))).all()
+            if not rows:
+                # Threads of long-idle posts are archived as a whole
+                rows = (await session.execute(
+                    thread_query(post_id=post_id, model=CommentArchive, **limits)
+                )).all()
+
+        logger.info(f"Fetched comment thread for post_id={post_id}")
+        return jsonify(build_thread(rows)), 200
+
+    except Exception as e:
+        logger.error(f"Error retrieving thread for post {request.args.get('post_id')}: {e}")
+        return jsonify({"error": "Failed to retrieve comment thread"}), 500
+
+
+@comment_bp.route('/comments/<int:comment_id>/replies', methods=['GET'])
+async def get_comment_replies(comment_id):
+    try:
+        limits, error = parse_thread_limits(request.args, current_app.config)
+        if error:
+            return jsonify({"error": error}), 400
+
+        async with get_session() as session:
+            rows = (await session.execute(thread_query(root_id=comment_id, **limits))).all()
+            if not rows:
+                rows = (await session.execute(
+                    thread_query(root_id=comment_id, model=CommentArchive, **limits)
+                )).all()
+
+        subtree = build_thread(rows)
+        if not subtree:
+            return jsonify({"error": "Comment not found."}), 404
+
+        logger.info(f"Fetched reply subtree of comment ID: {comment_id}")
+        return jsonify(subtree[0]), 200
+
+    except Exception as e:
+        logger.error(f"Error retrieving replies of comment {comment_id}: {e}")
+        return jsonify({"error": "Failed to retrieve replies"}), 500
+
+
+@comment_bp.route('/comments/<int:comment_id>', methods=['GET'])
+async def get_comment(comment_id):
+    try:
+        async with get_session() as session:
+            comment = await session.get(Comment, comment_id) or await session.get(CommentArchive, comment_id)
+
+        if comment is None:
+            return jsonify({"error": "Comment not found."}), 404
+
+        logger.info(f"Fetched comment ID: {comment_id}")
+        return jsonify(comment_schema.dump(comment)), 200
+
+    except Exception as e:
+        logger.error(f"Error fetching comment ID {comment_id}: {e}")
+        return jsonify({"error": "Failed to retrieve comment"}), 500
+
+
+@comment_bp.route('/comments/<int:comment_id>', methods=['PUT'])
+@jwt_required_with_user
+async def update_comment(current_user, comment_id):
+    data = await request.get_json(silent=True)
+    if data is None:
+        return jsonify({"error": "Missing or invalid JSON"}), 400
+
+    try:
+        async with get_session() as session:
+            # One conditional UPDATE ... RETURNING; the owner is only looked up if it matches nothing
+            row = (await session.execute(comment_update_stmt(comment_id, current_user.id, data))).first()
+            if row is None:
+                owner_id, restored = await _restore_owned_comment(session, comment_id, current_user.id)
+                if restored:
+                    row = (await session.execute(comment_update_stmt(comment_id, current_user.id, data))).first()
+            if row is None:
+                await session.rollback()
+                logger.warning(f"Update of comment {comment_id} by user {current_user.id} refused")
+                error, status = refusal(owner_id, 'Comment')
+                return jsonify(error), status
+
+            await session.execute(change_stmt('comment', comment_id))
+            await session.commit()
+
+        logger.info(f"Comment {comment_id} updated by user {current_user.id}")
+        return jsonify(comment_rows.dump_row(row)), 200
+
+    except Exception as e:
+        logger.error(f"Error updating comment {comment_id}: {e}")
+        return jsonify({"error": "Failed to update comment"}), 500
+
+
+@comment_bp.route('/comments/<int:comment_id>', methods=['DELETE'])
+@jwt_required_with_user
+async def delete_comment(current_user, comment_id):
+    try:
+        async with get_session() as session:
+            # Replies go with the comment in one conditional DELETE ... RETURNING
+            rows = (await session.execute(subtree_delete_stmt(comment_id, current_user.id))).all()
+            if not rows:
+                owner_id, restored = await _restore_owned_comment(session, comment_id, current_user.id)
+                if restored:
+                    rows = (await session.execute(subtree_delete_stmt(comment_id, current_user.id))).all()
+            if not rows:
+                await session.rollback()
+                logger.warning(f"Delete of comment {comment_id} by user {current_user.id} refused")
+                error, status = refusal(owner_id, 'Comment')
+                return jsonify(error), status
+
+            # Post stats and the change feed are updated in the same transaction
+            post_id, count, latest = subtree_summary(rows)
+            await session.execute(insert(Change), tombstone_rows(rows))
+            await session.execute(comment_removed_stmt(post_id, latest, count))
+            await session.commit()
+        await record_comment_activity(post_id, weight=-count)
+
+        logger.info(f"Comment {comment_id} and {count - 1} replies deleted by user {current_user.id}")
+        return jsonify({"message": "Comment deleted."}), 200
+
+    except Exception as e:
+        logger.error(f"Error deleting comment {comment_id}: {e}")
+        return jsonify({"error": "Failed to delete comment"}), 500
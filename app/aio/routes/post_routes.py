@@ -0,0 +1,203 @@
+import asyncio
+from quart import Blueprint, request, jsonify, current_app
+from sqlalchemy import select
+from app.models.post import Post
+from app.schemas.post_schema import post_schema
+from app.aio.auth import jwt_required_with_user
+from app.aio.database import get_session
+from app.aio.trending import get_trending_posts
+from app.services.change_feed import change_stmt, DELETE
+from app.services.count_service import counter_delta_stmt, counter_query, set_total_count, EXACT, POSTS
+from app.services.read_path import post_list_query, post_rows
+from app.services.owned_writes import post_insert_stmt, post_update_stmt, post_owner_query, refusal
+from app.services.post_service import (
+    owned_post_delete_stmt, owned_post_hide_stmt, comment_probe_query, thread_delete_stmts,
+    purge_batch_stmt, purge_final_stmts
+)
+from app.logger import setup_logger
+
+# Initialize logger for async post routes
+logger = setup_logger(__name__)
+
+# Define blueprint for async post-related routes
+post_bp = Blueprint('posts', __name__)
+
+
+async def _get_live_post(session, post_id):
+    """Loads a post that is not pending deletion, or None."""
+    return (await session.execute(
+        select(Post).where(Post.id == post_id, Post.deleted_at.is_(None))
+    )).scalar_one_or_none()
+
+
+@post_bp.route('/posts', methods=['POST'])
+@jwt_required_with_user
+async def create_post(current_user):
+    data = await request.get_json(silent=True)
+    if data is None:
+        logger.warning("Create post failed: Missing or invalid JSON.")
+        return jsonify({"error": "Missing or invalid JSON"}), 400
+
+    try:
+        title = data.get('title')
+        content = data.get('content')
+
+        if not title or not content:
+            logger.warning("Create post failed: Title or content missing.")
+            return jsonify({"error": "Title and content are required."}), 400
+
+        async with get_session() as session:
+            # INSERT ... RETURNING hands back the dumped columns; no refresh query after commit
+            row = (await session.execute(post_insert_stmt(title, content, current_user.id))).one()
+            await session.execute(change_stmt('post', row.id))
+            await session.execute(counter_delta_stmt(session.bind.dialect.name, POSTS, 1))
+            await session.commit()
+
+        logger.info(f"Post created by user {current_user.id}: Post ID {row.id}")
+        return jsonify(post_rows.dump_row(row)), 201
+
+    except Exception as e:
+        logger.error(f"Error creating post: {e}")
+        return jsonify({"error": "Failed to create post"}), 500
+
+
+@post_bp.route('/posts', methods=['GET'])
+async def get_posts():
+    try:
+        async with get_session() as session:
+            # Core rows straight to JSON; a list needs no ORM instances
+            connection = await session.connection()
+            posts = (await connection.execute(post_list_query())).all()
+            count = (await connection.execute(counter_query(POSTS))).scalar()
+
+        logger.info("Fetched all posts.")
+        return set_total_count(jsonify(post_rows.dump(posts)), count, EXACT), 200
+    except Exception as e:
+        logger.error(f"Error fetching posts: {e}")
+        return jsonify({"error": "Failed to retrieve posts"}), 500
+
+
+@post_bp.route('/posts/trending', methods=['GET'])
+async def get_trending():
+    try:
+        limit = request.args.get('limit', 10, type=int)
+        if limit < 1 or limit > current_app.config['TRENDING_SIZE']:
+            return jsonify({"error": f"limit must be between 1 and {current_app.config['TRENDING_SIZE']}."}), 400
+
+        posts = await get_trending_posts(limit)
+        logger.info(f"Fetched {len(posts)} trending posts.")
+        return jsonify(posts), 200
+    except Exception as e:
+        logger.error(f"Error fetching trending posts: {e}")
+        return jsonify({"error": "Failed to retrieve trending posts"}), 500
+
+
+@post_bp.route('/posts/<int:post_id>', methods=['GET'])
+async def get_post(post_id):
+    try:
+        async with get_session() as session:
+            post = await _get_live_post(session, post_id)
+
+        if post is None:
+            return jsonify({"error": "Post not found."}), 404
+
+        logger.info(f"Fetched post ID: {post_id}")
+        return jsonify(post_schema.dump(post)), 200
+    except Exception as e:
+        logger.error(f"Error fetching post {post_id}: {e}")
+        return jsonify({"error": "Failed to retrieve post"}), 500
+
+
+@post_bp.route('/posts/<int:post_id>', methods=['PUT'])
+@jwt_required_with_user
+async def update_post(current_user, post_id):
+    data = await request.get_json(silent=True)
+    if data is None:
+        return jsonify({"error": "Missing or invalid JSON"}), 400
+
+    try:
+        async with get_session() as session:
+            # One conditional UPDATE ... RETURNING; the owner is only looked up if it matches nothing
+            row = (await session.execute(post_update_stmt(post_id, current_user.id, data))).first()
+            if row is None:
+                await session.rollback()
+                logger.warning(f"Update of post {post_id} by user {current_user.id} refused")
+                error, status = refusal((await session.execute(post_owner_query(post_id))).scalar(), 'Post')
+                return jsonify(error), status
+
+            await session.execute(change_stmt('post', post_id))
+            await session.commit()
+
+        logger.info(f"Post {post_id} updated by user {current_user.id}")
+        return jsonify(post_rows.dump_row(row)), 200
+
+    except Exception as e:
+        logger.error(f"Error updating post {post_id}: {e}")
+        return jsonify({"error": "Failed to update post"}), 500
+
+
+async def _purge_post(post_id, batch_size):
+    """Async counterpart of post_service.purge_post(); commits after every batch."""
+    try:
+        total = 0
+        async with get_session() as session:
+            while True:
+                result = await session.execute(purge_batch_stmt(post_id, batch_size))
+                await session.commit()
+                total += result.rowcount
+                if result.rowcount < batch_size:
+                    break
+
+            for statement in purge_final_stmts(post_id):
+                await session.execute(statement)
+            await session.commit()
+        logger.info(f"Purge of post {post_id} completed: {total} comments deleted.")
+    except Exception as e:
+        # The post stays hidden; `flask purge-deleted-posts` finishes it
+        logger.error(f"Background purge of post {post_id} failed: {e}")
+
+
+@post_bp.route('/posts/<int:post_id>', methods=['DELETE'])
+@jwt_required_with_user
+async def delete_post(current_user, post_id):
+    """
+    Same as the sync path (post_service.delete_post): small threads are deleted
+    inline, larger ones are hidden right away and purged in background batches.
+    """
+    config = current_app.config
+    threshold = config['POST_PURGE_INLINE_THRESHOLD']
+
+    try:
+        async with get_session() as session:
+            # Probe at most threshold + 1 comment ids instead of counting the whole thread
+            inline = len((await session.execute(comment_probe_query(post_id, threshold))).all()) <= threshold
+
+            # The post goes in one conditional statement; the owner is only looked up if it matches nothing
+            statement = owned_post_delete_stmt if inline else owned_post_hide_stmt
+            if (await session.execute(statement(post_id, current_user.id))).first() is None:
+                await session.rollback()
+                logger.warning(f"Delete of post {post_id} by user {current_user.id} refused")
+                error, status = refusal((await session.execute(post_owner_query(post_id))).scalar(), 'Post')
+                return jsonify(error), status
+
+            if inline:
+                for statement in thread_delete_stmts(post_id):
+                    await session.execute(statement)
+            await session.execute(change_stmt('post', post_id, DELETE))
+            await session.execute(counter_delta_stmt(session.bind.dialect.name, POSTS, -1))
+            await session.commit()
+
+        logger.info(f"Post {post_id} deleted by user {current_user.id}")
+        if inline:
+            return jsonify({"message": "Post deleted."}), 200
+
+        purge = _purge_post(post_id, config['POST_PURGE_BATCH_SIZE'])
+        if config.get('BACKGROUND_TASKS_EAGER'):
+            await purge
+        else:
+            asyncio.get_running_loop().create_task(purge)
+        return jsonify({"message": "Post deletion scheduled."}), 202
+
+    except Exception as e:
+        logger.error(f"Error deleting post {post_id}: {e}")
+        return jsonify({"error": "Failed to delete post"}), 500
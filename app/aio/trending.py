@@ -0,0 +1,105 @@
+import asyncio
+from quart import current_app
+from sqlalchemy.exc import IntegrityError
+from app.aio.database import get_session
+from app.services.trending_service import (
+    get_trending_aggregator, pending_scores_query, prune_stmt, merge_pending_rows, top_posts_query, build_snapshot
+)
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+
+async def _merge_pending(session, aggregator, pending, base):
+    """Async counterpart of trending_service._merge_pending()."""
+    rows = (await session.execute(pending_scores_query(pending.keys()))).scalars().all()
+    added, removed = merge_pending_rows(aggregator, rows, pending, base)
+
+    for row in removed:
+        await session.delete(row)
+    session.add_all(added)
+    await session.commit()
+
+
+async def materialize_trending(aggregator):
+    """Async counterpart of trending_service.materialize_trending()."""
+    pending, base = aggregator.take_pending()
+
+    try:
+        async with get_session() as session:
+            if pending:
+                for attempt in range(2):
+                    try:
+                        await _merge_pending(session, aggregator, pending, base)
+                        break
+                    except IntegrityError:
+                        # Another worker inserted the same post concurrently; merge again
+                        await session.rollback()
+                        if attempt:
+                            raise
+
+            await session.execute(prune_stmt(aggregator))
+            await session.commit()
+
+        logger.debug(f"Trending scores materialized for {len(pending)} post(s).")
+        return len(pending)
+
+    except Exception as e:
+        logger.error(f"Failed to materialize trending scores: {e}")
+        raise
+    finally:
+        aggregator.finish_flush()
+
+
+async def _run_flush(aggregator):
+    try:
+        await materialize_trending(aggregator)
+    except Exception:
+        pass  # Logged by materialize_trending; retried next interval
+
+
+async def _flush_periodically(app, aggregator):
+    """Async counterpart of trending_service.start_flusher."""
+    while True:
+        await asyncio.sleep(max(aggregator.interval, 1.0))
+        if aggregator.claim_flush():
+            async with app.app_context():
+                await _run_flush(aggregator)
+
+
+async def _schedule_flush(app, aggregator):
+    """Materializes now: inline when BACKGROUND_TASKS_EAGER is set, else as a task."""
+    if app.config.get('BACKGROUND_TASKS_EAGER'):
+        await _run_flush(aggregator)
+    else:
+        asyncio.get_running_loop().create_task(_run_flush(aggregator))
+
+
+async def record_comment_activity(post_id, weight=1.0):
+    """Async counterpart of trending_service.record_comment_activity()."""
+    app = current_app._get_current_object()
+    aggregator = get_trending_aggregator(app)
+
+    if not app.config.get('BACKGROUND_TASKS_EAGER') and aggregator.claim_flusher():
+        asyncio.get_running_loop().create_task(_flush_periodically(app, aggregator))
+    if aggregator.record(int(post_id), weight):
+        await _schedule_flush(app, aggregator)
+
+
+async def get_trending_posts(limit):
+    """Async counterpart of trending_service.get_trending_posts(); the async app is never sharded."""
+    app = current_app._get_current_object()
+    aggregator = get_trending_aggregator(app)
+
+    if aggregator.claim_flush():
+        await _schedule_flush(app, aggregator)
+
+    if aggregator.snapshot_due():
+        async with get_session() as session:
+            rows = (await session.execute(top_posts_query(aggregator.size))).all()
+        posts = build_snapshot(aggregator, rows)
+        aggregator.set_snapshot(posts)
+        logger.debug(f"Trending snapshot refreshed with {len(posts)} post(s).")
+
+    return aggregator.snapshot(limit)
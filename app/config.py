@@ -1,4 +1,5 @@
 import os
+from datetime import timedelta
 from dotenv import load_dotenv
 from app.logger import setup_logger  # Adjust the import based on your structure
 
@@ -32,9 +33,117 @@ class Config:
     else:
         logger.info("JWT_SECRET_KEY loaded successfully.")
 
+    # Token lifetimes: short-lived access tokens, long-lived refresh tokens
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=int(os.getenv("JWT_ACCESS_TOKEN_EXPIRES_MINUTES", 15)))
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.getenv("JWT_REFRESH_TOKEN_EXPIRES_DAYS", 30)))
+
     # Optional but recommended configuration
     SQLALCHEMY_TRACK_MODIFICATIONS = False  # Disables event system for performance
     DEBUG = os.getenv("FLASK_DEBUG", "True").lower() == "true"  # Enable debug mode based on env
 
+    # Background tasks
+    BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", 2))
+    BACKGROUND_TASKS_EAGER = os.getenv("BACKGROUND_TASKS_EAGER", "False").lower() == "true"  # Run tasks inline
+
+    # Post deletion: threads above the threshold are purged in background batches
+    POST_PURGE_INLINE_THRESHOLD = int(os.getenv("POST_PURGE_INLINE_THRESHOLD", 1000))
+    POST_PURGE_BATCH_SIZE = int(os.getenv("POST_PURGE_BATCH_SIZE", 1000))
+
+    # Idempotency-Key support for create endpoints
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", 24 * 60 * 60))
+    IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", 10))     # Seconds a duplicate waits
+    IDEMPOTENCY_POLL_INTERVAL = float(os.getenv("IDEMPOTENCY_POLL_INTERVAL", 0.05))  # Cross-worker poll interval
+    # Seconds before an in-flight key whose request never finished (worker killed) can be reclaimed
+    IDEMPOTENCY_LEASE_SECONDS = float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", 6 * IDEMPOTENCY_WAIT_TIMEOUT))
+
+    # Group commit for comment inserts (opt-in)
+    COMMENT_GROUP_COMMIT_ENABLED = os.getenv("COMMENT_GROUP_COMMIT_ENABLED", "False").lower() == "true"
+    COMMENT_GROUP_COMMIT_MAX_BATCH = int(os.getenv("COMMENT_GROUP_COMMIT_MAX_BATCH", 100))
+    COMMENT_GROUP_COMMIT_MAX_WAIT_MS = float(os.getenv("COMMENT_GROUP_COMMIT_MAX_WAIT_MS", 5))
+
+    # Admission control: concurrent requests per endpoint class before shedding with 503
+    ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "True").lower() == "true"
+    ADMISSION_AUTH_LIMIT = int(os.getenv("ADMISSION_AUTH_LIMIT", 8))      # Password hashing is CPU-bound
+    ADMISSION_READ_LIMIT = int(os.getenv("ADMISSION_READ_LIMIT", 32))
+    ADMISSION_WRITE_LIMIT = int(os.getenv("ADMISSION_WRITE_LIMIT", 16))
+    ADMISSION_MIN_LIMIT = int(os.getenv("ADMISSION_MIN_LIMIT", 2))        # Floor when the DB is slow
+    ADMISSION_TARGET_DB_LATENCY_MS = float(os.getenv("ADMISSION_TARGET_DB_LATENCY_MS", 100))
+    ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", 1))    # Seconds, sent as Retry-After
+
+    # Rate limiting: token buckets per route policy ("<count>/<period>")
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # "memory" (per worker) or "sqlite" (per host)
+    RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", "/tmp/blog-api-ratelimit.sqlite3")
+    RATE_LIMIT_LOGIN = os.getenv("RATE_LIMIT_LOGIN", "10/minute")        # Per client IP
+    RATE_LIMIT_REGISTER = os.getenv("RATE_LIMIT_REGISTER", "5/hour")     # Per client IP
+    RATE_LIMIT_AVAILABILITY = os.getenv("RATE_LIMIT_AVAILABILITY", "60/minute")  # Per client IP; bursts cover typing
+    RATE_LIMIT_WRITES = os.getenv("RATE_LIMIT_WRITES", "60/minute")      # Per user
+
+    # Reverse proxies in front of the app whose X-Forwarded-For/-Proto are trusted (0 = none).
+    # Client IPs (rate limit buckets, logs) come from the connection unless this is set.
+    TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", 0))
+
+    # Threaded comments: upper bounds for a single thread/subtree fetch
+    COMMENT_THREAD_MAX_DEPTH = int(os.getenv("COMMENT_THREAD_MAX_DEPTH", 50))
+    COMMENT_THREAD_MAX_CHILDREN = int(os.getenv("COMMENT_THREAD_MAX_CHILDREN", 1000))  # Replies per comment
+    COMMENT_THREAD_MAX_NODES = int(os.getenv("COMMENT_THREAD_MAX_NODES", 10000))
+
+    # Comment streaming (Server-Sent Events); switched off in sync Gunicorn workers, see gunicorn.conf.py
+    COMMENT_STREAM_ENABLED = os.getenv("COMMENT_STREAM_ENABLED", "True").lower() == "true"
+    COMMENT_STREAM_BUFFER = int(os.getenv("COMMENT_STREAM_BUFFER", 100))            # Recent events kept per post
+    COMMENT_STREAM_BACKLOG = int(os.getenv("COMMENT_STREAM_BACKLOG", 500))          # Max comments replayed on resume
+    COMMENT_STREAM_POLL_INTERVAL = float(os.getenv("COMMENT_STREAM_POLL_INTERVAL", 1.0))  # Seconds
+    COMMENT_STREAM_HEARTBEAT = float(os.getenv("COMMENT_STREAM_HEARTBEAT", 15))     # Seconds
+    COMMENT_STREAM_RETRY_MS = int(os.getenv("COMMENT_STREAM_RETRY_MS", 3000))       # Client reconnect delay
+
+    # Bulk export: rows fetched per round trip from the server-side cursor
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+    # Bulk import: NDJSON lines inserted per transaction by `flask import`
+    IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 5000))
+
+    # Comment archival: comments of posts idle this long move to comments_archive
+    COMMENT_ARCHIVE_AFTER_DAYS = int(os.getenv("COMMENT_ARCHIVE_AFTER_DAYS", 180))
+    COMMENT_ARCHIVE_BATCH_SIZE = int(os.getenv("COMMENT_ARCHIVE_BATCH_SIZE", 1000))
+    COMMENTS_MAX_PAGE_SIZE = int(os.getenv("COMMENTS_MAX_PAGE_SIZE", 1000))
+
+    # Change feed: page size, how long a hole in the sequence blocks the feed, and retention
+    CHANGE_FEED_PAGE_SIZE = int(os.getenv("CHANGE_FEED_PAGE_SIZE", 500))
+    CHANGE_FEED_GAP_TIMEOUT = float(os.getenv("CHANGE_FEED_GAP_TIMEOUT", 5))       # Seconds
+    CHANGE_FEED_RETENTION_DAYS = int(os.getenv("CHANGE_FEED_RETENTION_DAYS", 30))
+
+    # Token revocation: how often (seconds) each worker pulls revocations made by other workers
+    TOKEN_REVOCATION_SYNC_INTERVAL = float(os.getenv("TOKEN_REVOCATION_SYNC_INTERVAL", 1.0))
+
+    # Username/email availability: in-memory Bloom filter size, false positive rate and sync interval (seconds)
+    AVAILABILITY_FILTER_CAPACITY = int(os.getenv("AVAILABILITY_FILTER_CAPACITY", 100000))
+    AVAILABILITY_FILTER_ERROR_RATE = float(os.getenv("AVAILABILITY_FILTER_ERROR_RATE", 0.01))
+    AVAILABILITY_SYNC_INTERVAL = float(os.getenv("AVAILABILITY_SYNC_INTERVAL", 1.0))
+
+    # Micro-cache of anonymous hot GETs (a post, comment lists), per worker process
+    MICRO_CACHE_ENABLED = os.getenv("MICRO_CACHE_ENABLED", "True").lower() == "true"
+    MICRO_CACHE_TTL = float(os.getenv("MICRO_CACHE_TTL", 0.5))              # Seconds a response is fresh
+    MICRO_CACHE_STALE_TTL = float(os.getenv("MICRO_CACHE_STALE_TTL", 2))    # Seconds served stale while refreshing
+    MICRO_CACHE_MAX_ENTRIES = int(os.getenv("MICRO_CACHE_MAX_ENTRIES", 10000))
+    MICRO_CACHE_WAIT_TIMEOUT = float(os.getenv("MICRO_CACHE_WAIT_TIMEOUT", 5))  # Seconds a coalesced request waits
+
+    # On-demand request profiling: sampled stacks of profiled requests, written as collapsed stacks
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False").lower() == "true"
+    PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 0.01))  # Fraction of requests when enabled
+    PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")               # X-Profile header value profiling one request
+    PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", 5))
+    PROFILING_DIR = os.getenv("PROFILING_DIR", "logs/profiles")
+
+    # Sharding of posts and comments by author: extra databases as "name=url,name=url".
+    # The main database stays shard 'default' and keeps users, the change feed and the shard directory.
+    SHARD_BINDS = os.getenv("SHARD_BINDS", "")
+    SHARD_REBALANCE_BATCH_SIZE = int(os.getenv("SHARD_REBALANCE_BATCH_SIZE", 100))  # Posts moved per transaction
+
+    # Trending posts: decayed comment activity, materialized every few seconds
+    TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", 6))
+    TRENDING_MATERIALIZE_INTERVAL = float(os.getenv("TRENDING_MATERIALIZE_INTERVAL", 10))  # Seconds
+    TRENDING_SIZE = int(os.getenv("TRENDING_SIZE", 50))               # Posts kept in the snapshot
+    TRENDING_MIN_SCORE = float(os.getenv("TRENDING_MIN_SCORE", 0.01))  # Scores below this are pruned
+
     logger.info(f"DEBUG mode set to: {DEBUG}")
     logger.info("Configuration loaded successfully.")
@@ -3,6 +3,7 @@ from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_marshmallow import Marshmallow
 from app.logger import setup_logger  # Adjust the import path as necessary
+from app.utils.sharding import ShardedSession
 
 # Set up module-level logger
 logger = setup_logger(__name__)
@@ -10,8 +11,8 @@ logger.info("Starting Flask extension initialization.")
 
 # Initialize Flask extensions with error handling
 try:
-    # SQLAlchemy: ORM for database interactions
-    db = SQLAlchemy()
+    # SQLAlchemy: ORM for database interactions; posts and comments can be routed to shards
+    db = SQLAlchemy(session_options={"class_": ShardedSession})
     logger.info("SQLAlchemy initialized successfully.")
 except Exception as e:
     logger.error(f"Failed to initialize SQLAlchemy: {e}")
@@ -33,6 +34,12 @@ except Exception as e:
     logger.error(f"Failed to initialize JWTManager: {e}")
     raise
 
+# Reject revoked tokens using the in-memory revocation list (no DB hit per request)
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header, jwt_payload):
+    from app.services.token_revocation import is_token_revoked  # Imported lazily to avoid a circular import
+    return is_token_revoked(jwt_payload["jti"])
+
 try:
     # Marshmallow: Used for serialization and validation
     ma = Marshmallow()
@@ -5,8 +5,17 @@
 from app.models.user import User
 from app.models.post import Post
 from app.models.comment import Comment
+from app.models.comment_archive import CommentArchive
+from app.models.idempotency_key import IdempotencyKey
+from app.models.revoked_token import RevokedToken
+from app.models.trending_score import TrendingScore
+from app.models.change import Change
+from app.models.row_counter import RowCounter
+from app.models.import_state import ImportIdMap, ImportCheckpoint
+from app.models.shard_directory import PostShard, CommentShard
 
 # Optional: Log successful model registration
 from app.logger import setup_logger
 logger = setup_logger(__name__)
-logger.info("All model classes imported: User, Post, Comment")
+logger.info("All model classes imported: User, Post, Comment, CommentArchive, IdempotencyKey, RevokedToken, TrendingScore, Change, RowCounter, "
+            "ImportIdMap, ImportCheckpoint, PostShard, CommentShard")
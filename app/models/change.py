@@ -0,0 +1,27 @@
+from app.extensions import db
+from app.logger import setup_logger
+
+# Initialize logger for the Change model
+logger = setup_logger(__name__)
+
+class Change(db.Model):
+    """
+    Append-only log of post and comment writes, read by the change feed.
+
+    Rows are inserted in the same transaction as the write they describe.
+    A row with op 'delete' is the tombstone of a row that no longer exists.
+    """
+
+    __tablename__ = 'changes'
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)  # Feed cursor
+    entity = db.Column(db.String(16), nullable=False)     # 'post' or 'comment'
+    entity_id = db.Column(db.Integer, nullable=False)     # ID of the changed row
+    op = db.Column(db.String(8), nullable=False)          # 'upsert' or 'delete'
+    created_at = db.Column(db.DateTime, server_default=db.func.now(), index=True)
+
+    def __repr__(self):
+        return f"<Change {self.id}: {self.op} {self.entity} {self.entity_id}>"
+
+# Log that the Change model was loaded
+logger.info("Change model loaded and mapped to table 'changes'")
@@ -11,10 +11,16 @@ class Comment(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)  # Unique ID for the comment
     content = db.Column(db.Text, nullable=False)  # Comment text content
-    post_id = db.Column(db.Integer, db.ForeignKey('posts.id'), nullable=False)  # Associated post
+    post_id = db.Column(db.Integer, db.ForeignKey('posts.id', ondelete='CASCADE'),
+                        nullable=False, index=True)  # Associated post
     author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)  # Commenting user
+    parent_id = db.Column(db.Integer, db.ForeignKey('comments.id', ondelete='CASCADE'),
+                          nullable=True, index=True)  # Comment being replied to (None for top-level)
     created_at = db.Column(db.DateTime, server_default=db.func.now())  # Timestamp of creation
 
+    # Fetch server defaults (created_at) during the INSERT instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
     def __repr__(self):
         return f"<Comment {self.id} on Post {self.post_id}>"
 
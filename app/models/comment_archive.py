@@ -0,0 +1,31 @@
+from app.extensions import db
+from app.logger import setup_logger
+
+# Initialize logger for the CommentArchive model
+logger = setup_logger(__name__)
+
+class CommentArchive(db.Model):
+    """
+    Comments moved out of the hot `comments` table by the archival job.
+
+    Rows keep their original id, so cursors and links stay valid. A post's
+    comments are archived together, once the post has had no new comment for
+    COMMENT_ARCHIVE_AFTER_DAYS, and are moved back when it becomes active again.
+    """
+
+    __tablename__ = 'comments_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Original comment id
+    content = db.Column(db.Text, nullable=False)
+    post_id = db.Column(db.Integer, db.ForeignKey('posts.id', ondelete='CASCADE'),
+                        nullable=False, index=True)
+    author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    parent_id = db.Column(db.Integer, nullable=True, index=True)  # Parent is archived along with it
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    def __repr__(self):
+        return f"<CommentArchive {self.id} on Post {self.post_id}>"
+
+# Log that the CommentArchive model was loaded
+logger.info("CommentArchive model loaded and mapped to table 'comments_archive'")
@@ -0,0 +1,26 @@
+from app.extensions import db
+from app.logger import setup_logger
+
+# Initialize logger for the IdempotencyKey model
+logger = setup_logger(__name__)
+
+class IdempotencyKey(db.Model):
+    """Model storing the response of a create request keyed by its Idempotency-Key header."""
+
+    __tablename__ = 'idempotency_keys'
+
+    # Composite primary key: keys are scoped per user
+    key = db.Column(db.String(255), primary_key=True)                  # Client supplied Idempotency-Key
+    user_id = db.Column(db.Integer, primary_key=True)                  # Owner of the key
+
+    request_fingerprint = db.Column(db.String(255), nullable=False)    # "<METHOD> <path> <body sha256>" of the original request
+    status_code = db.Column(db.Integer, nullable=True)                 # NULL while the original request is in flight
+    response_body = db.Column(db.Text, nullable=True)                  # Stored JSON response body
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)    # Replay window end
+    claimed_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())  # Start of the in-flight lease
+
+    def __repr__(self):
+        return f"<IdempotencyKey {self.key} for User {self.user_id}>"
+
+# Log that the IdempotencyKey model was loaded
+logger.info("IdempotencyKey model loaded and mapped to table 'idempotency_keys'")
@@ -0,0 +1,42 @@
+from app.extensions import db
+from app.logger import setup_logger
+
+# Initialize logger for the import bookkeeping models
+logger = setup_logger(__name__)
+
+class ImportIdMap(db.Model):
+    """
+    Maps ids from an imported dataset to the ids the rows received here, so
+    later files (and resumed runs) can translate their foreign keys.
+    """
+
+    __tablename__ = 'import_id_map'
+
+    entity = db.Column(db.String(16), primary_key=True)       # 'users', 'posts' or 'comments'
+    source_id = db.Column(db.String(64), primary_key=True)    # ID in the source dataset
+    target_id = db.Column(db.Integer, nullable=False)         # ID of the inserted row
+
+    def __repr__(self):
+        return f"<ImportIdMap {self.entity} {self.source_id} -> {self.target_id}>"
+
+
+class ImportCheckpoint(db.Model):
+    """
+    Progress of one import file, committed together with each batch so an
+    interrupted import resumes after the last committed row.
+    """
+
+    __tablename__ = 'import_checkpoints'
+
+    source = db.Column(db.String(512), primary_key=True)      # Absolute path of the NDJSON file
+    entity = db.Column(db.String(16), nullable=False)
+    offset = db.Column(db.BigInteger, nullable=False, default=0)  # Byte offset after the last committed line
+    imported = db.Column(db.Integer, nullable=False, default=0)
+    skipped = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
+
+    def __repr__(self):
+        return f"<ImportCheckpoint {self.source} @ {self.offset}>"
+
+# Log that the import models were loaded
+logger.info("Import models loaded and mapped to tables 'import_id_map', 'import_checkpoints'")
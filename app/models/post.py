@@ -22,9 +22,16 @@ class Post(db.Model):
     # Timestamps
     created_at = db.Column(db.DateTime, server_default=db.func.now())  # Created timestamp
     updated_at = db.Column(db.DateTime, onupdate=db.func.now())        # Auto-updated on edit
+    deleted_at = db.Column(db.DateTime, nullable=True)                 # Set while comments are purged in background
 
-    # One-to-Many: A post can have multiple comments
-    comments = db.relationship('Comment', backref='post', lazy=True)
+    # Denormalized comment statistics, maintained on every comment write
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    last_comment_at = db.Column(db.DateTime, nullable=True)
+
+    # One-to-Many: A post can have multiple comments.
+    # passive_deletes leaves comment removal to the database instead of loading every row.
+    comments = db.relationship('Comment', backref='post', lazy=True,
+                               cascade='all, delete-orphan', passive_deletes=True)
 
     def __repr__(self):
         return f"<Post {self.title}>"
@@ -0,0 +1,20 @@
+from app.extensions import db
+from app.logger import setup_logger
+
+# Initialize logger for the RevokedToken model
+logger = setup_logger(__name__)
+
+class RevokedToken(db.Model):
+    """Model representing a JWT that was revoked (e.g. on logout) before it expired."""
+
+    __tablename__ = 'revoked_tokens'
+
+    id = db.Column(db.Integer, primary_key=True)                        # Monotonic cursor for incremental sync
+    jti = db.Column(db.String(36), unique=True, nullable=False)         # Unique token identifier
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)     # Token expiry; row can be purged after this
+
+    def __repr__(self):
+        return f"<RevokedToken {self.jti}>"
+
+# Log that the RevokedToken model was loaded
+logger.info("RevokedToken model loaded and mapped to table 'revoked_tokens'")
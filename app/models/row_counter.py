@@ -0,0 +1,25 @@
+from app.extensions import db
+from app.logger import setup_logger
+
+# Initialize logger for the RowCounter model
+logger = setup_logger(__name__)
+
+class RowCounter(db.Model):
+    """
+    Maintained row counts, split over several slots per counter.
+
+    Writers add their delta to a random slot, so concurrent inserts rarely
+    wait on the same row; readers sum the slots of a counter.
+    """
+
+    __tablename__ = 'row_counters'
+
+    name = db.Column(db.String(32), primary_key=True)                  # e.g. 'posts'
+    slot = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<RowCounter {self.name}[{self.slot}]: {self.value}>"
+
+# Log that the RowCounter model was loaded
+logger.info("RowCounter model loaded and mapped to table 'row_counters'")
@@ -0,0 +1,40 @@
+from app.extensions import db
+from app.logger import setup_logger
+
+# Initialize logger for the shard directory models
+logger = setup_logger(__name__)
+
+class PostShard(db.Model):
+    """
+    Shard directory entry of a post, kept on the main database.
+
+    Only written while sharding is enabled. Its autoincrement key also hands
+    out post ids, so they stay unique (and ordered) across shards.
+    """
+
+    __tablename__ = 'post_shards'
+
+    post_id = db.Column(db.Integer, primary_key=True)
+    author_id = db.Column(db.Integer, nullable=False, index=True)  # Placement key
+    shard = db.Column(db.String(64), nullable=False, index=True)   # Shard holding the post and its comments
+
+    def __repr__(self):
+        return f"<PostShard {self.post_id} on {self.shard}>"
+
+
+class CommentShard(db.Model):
+    """
+    Shard directory entry of a comment: its post, whose entry names the shard.
+    Hands out comment ids the same way PostShard does for posts.
+    """
+
+    __tablename__ = 'comment_shards'
+
+    comment_id = db.Column(db.Integer, primary_key=True)
+    post_id = db.Column(db.Integer, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<CommentShard {self.comment_id} of post {self.post_id}>"
+
+# Log that the shard directory models were loaded
+logger.info("Shard directory models loaded and mapped to tables 'post_shards', 'comment_shards'")
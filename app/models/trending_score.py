@@ -0,0 +1,24 @@
+from app.extensions import db
+from app.logger import setup_logger
+
+# Initialize logger for the TrendingScore model
+logger = setup_logger(__name__)
+
+class TrendingScore(db.Model):
+    """
+    Materialized, time-decayed comment activity per post.
+
+    score_key is the natural log of the decayed score normalized to a fixed
+    epoch, so ordering by it equals ordering by the current score.
+    """
+
+    __tablename__ = 'trending_scores'
+
+    post_id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Post the activity belongs to
+    score_key = db.Column(db.Float, nullable=False, index=True)         # log(score) + decay_rate * (t - epoch)
+
+    def __repr__(self):
+        return f"<TrendingScore Post {self.post_id}: {self.score_key:.3f}>"
+
+# Log that the TrendingScore model was loaded
+logger.info("TrendingScore model loaded and mapped to table 'trending_scores'")
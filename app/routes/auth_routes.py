@@ -1,6 +1,10 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token
-from app.services.auth_service import register_user, authenticate_user
+from datetime import datetime, timezone
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt, get_jwt_identity
+from app.services.auth_service import register_user, authenticate_user, REGISTRATION_CONFLICT
+from app.services.availability import check_availability
+from app.services.token_revocation import revoke_token
+from app.utils.rate_limit import rate_limit
 from app.logger import setup_logger
 from flasgger import swag_from
 import re
@@ -11,10 +15,15 @@ logger = setup_logger(__name__)
 # Define blueprint for authentication routes
 auth_bp = Blueprint('auth', __name__)
 
+# Validation patterns, compiled once at import
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+UPPERCASE_PATTERN = re.compile(r'[A-Z]')
+LOWERCASE_PATTERN = re.compile(r'[a-z]')
+DIGIT_PATTERN = re.compile(r'[0-9]')
+
 # Utility: Validate email using regex
 def validate_email(email):
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return EMAIL_PATTERN.match(email) is not None
 
 # Utility: Validate password strength
 def validate_password(password):
@@ -27,15 +36,25 @@ def validate_password(password):
     """
     if len(password) < 8:
         return False
-    if not re.search(r'[A-Z]', password):
+    if not UPPERCASE_PATTERN.search(password):
         return False
-    if not re.search(r'[a-z]', password):
+    if not LOWERCASE_PATTERN.search(password):
         return False
-    if not re.search(r'[0-9]', password):
+    if not DIGIT_PATTERN.search(password):
         return False
     return True
 
+# Utility: Username/email query parameters of an availability check, normalized like registration
+def availability_values(args):
+    values = {}
+    if args.get('username', '').strip():
+        values['username'] = args['username'].strip()
+    if args.get('email', '').strip():
+        values['email'] = args['email'].strip().lower()
+    return values
+
 @auth_bp.route('/register', methods=['POST'])
+@rate_limit('register')
 @swag_from({
     'tags': ['Auth'],
     'summary': 'Register a new user',
@@ -91,9 +110,11 @@ def register():
 
         # Attempt registration
         user, error = register_user(username, email, password)
-        if error:
+        if error == REGISTRATION_CONFLICT:
             logger.warning(f"Registration conflict: {error}")
             return jsonify({"error": error}), 409
+        if error:
+            return jsonify({"error": error}), 500
 
         logger.info(f"User registered: {username} (ID: {user.id})")
         return jsonify({
@@ -110,11 +131,45 @@ def register():
         return jsonify({"error": "Registration failed", "details": str(e)}), 500
 
 
+@auth_bp.route('/available', methods=['GET'])
+@rate_limit('availability')
+@swag_from({
+    'tags': ['Auth'],
+    'summary': 'Check username/email availability',
+    'description': 'Tells whether a username and/or email can still be registered. Answered from an in-memory '
+                   'filter; the database is only queried for values that may be taken.',
+    'parameters': [
+        {'name': 'username', 'in': 'query', 'type': 'string', 'required': False},
+        {'name': 'email', 'in': 'query', 'type': 'string', 'required': False}
+    ],
+    'responses': {
+        200: {'description': 'Availability of each value given, e.g. {"available": {"username": true}}'},
+        400: {'description': 'Neither username nor email given'},
+        429: {'description': 'Too many checks from this client'}
+    }
+})
+def available():
+    """
+    Checks whether a username and/or email is still free.
+    """
+    values = availability_values(request.args)
+    if not values:
+        return jsonify({"error": "Give a username and/or email to check"}), 400
+
+    try:
+        return jsonify({"available": check_availability(**values)}), 200
+
+    except Exception as e:
+        logger.error(f"Error checking availability: {e}")
+        return jsonify({"error": "Availability check failed", "details": str(e)}), 500
+
+
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit('login')
 @swag_from({
     'tags': ['Auth'],
     'summary': 'Log in a user',
-    'description': 'Authenticates a user and returns a JWT access token.',
+    'description': 'Authenticates a user and returns a JWT access token and a refresh token.',
     'parameters': [{
         'name': 'body',
         'in': 'body',
@@ -129,7 +184,7 @@ def register():
         }
     }],
     'responses': {
-        200: {'description': 'Login successful, JWT token returned'},
+        200: {'description': 'Login successful, access and refresh tokens returned'},
         400: {'description': 'Missing credentials'},
         401: {'description': 'Invalid credentials'}
     }
@@ -158,12 +213,14 @@ def login():
             logger.warning(f"Authentication failed for user: {username}")
             return jsonify({"error": error}), 401
 
-        # Generate JWT token
+        # Generate JWT tokens; the refresh token lets clients renew without re-sending the password
         access_token = create_access_token(identity=user.id)
+        refresh_token = create_refresh_token(identity=user.id)
 
         logger.info(f"User logged in: {username} (ID: {user.id})")
         return jsonify({
             "access_token": access_token,
+            "refresh_token": refresh_token,
             "token_type": "bearer",
             "user": {
                 "id": user.id,
@@ -174,3 +231,64 @@ def login():
     except Exception as e:
         logger.error(f"Unexpected error during login: {e}")
         return jsonify({"error": "Login failed", "details": str(e)}), 500
+
+
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+@swag_from({
+    'tags': ['Auth'],
+    'summary': 'Refresh the access token',
+    'description': 'Issues a new access token from a refresh token sent as "Authorization: Bearer <refresh_token>". '
+                   'No password verification is performed.',
+    'responses': {
+        200: {'description': 'New access token returned'},
+        401: {'description': 'Missing, invalid, expired or revoked refresh token'},
+        422: {'description': 'An access token was sent instead of a refresh token'}
+    }
+})
+def refresh():
+    """
+    Issues a new access token for the identity of a valid refresh token.
+    """
+    try:
+        identity = get_jwt_identity()
+        access_token = create_access_token(identity=identity)
+
+        logger.info(f"Access token refreshed for user ID {identity}")
+        return jsonify({
+            "access_token": access_token,
+            "token_type": "bearer"
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Unexpected error during token refresh: {e}")
+        return jsonify({"error": "Token refresh failed", "details": str(e)}), 500
+
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+@swag_from({
+    'tags': ['Auth'],
+    'summary': 'Log out',
+    'description': 'Revokes the access or refresh token used for this request until it expires. '
+                   'Call it with both tokens to end the session completely.',
+    'responses': {
+        200: {'description': 'Token revoked'},
+        401: {'description': 'Missing, invalid or already revoked token'}
+    }
+})
+def logout():
+    """
+    Revokes the token (access or refresh) used for this request.
+    """
+    try:
+        claims = get_jwt()
+        expires_at = datetime.fromtimestamp(claims['exp'], timezone.utc).replace(tzinfo=None)
+        revoke_token(claims['jti'], expires_at)
+
+        logger.info(f"User logged out: ID {claims['sub']}")
+        return jsonify({"message": "Successfully logged out."}), 200
+
+    except Exception as e:
+        logger.error(f"Unexpected error during logout: {e}")
+        return jsonify({"error": "Logout failed", "details": str(e)}), 500
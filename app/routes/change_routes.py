@@ -0,0 +1,64 @@
+from flask import Blueprint, request, jsonify, current_app
+from app.services.change_feed import get_changes
+from app.logger import setup_logger
+from flasgger import swag_from
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# Define blueprint for the change feed
+change_bp = Blueprint('changes', __name__)
+
+
+@change_bp.route('/changes', methods=['GET'])
+@swag_from({
+    'tags': ['Changes'],
+    'summary': 'Get post and comment changes since a cursor',
+    'description': 'Returns created, updated and deleted posts and comments in commit order. '
+                   'Pass the returned cursor as `since` on the next call. A deleted post '
+                   'implies that all of its comments were deleted as well.',
+    'parameters': [{
+        'name': 'since',
+        'in': 'query',
+        'type': 'integer',
+        'required': False,
+        'description': 'Cursor from the previous response (0 or omitted for a full sync)'
+    }, {
+        'name': 'limit',
+        'in': 'query',
+        'type': 'integer',
+        'required': False,
+        'description': 'Maximum number of changes to scan'
+    }],
+    'responses': {
+        200: {'description': 'Changes retrieved successfully'},
+        400: {'description': 'Invalid cursor or limit'},
+        410: {'description': 'Cursor too old; a full resync is required'},
+        500: {'description': 'Internal server error'}
+    }
+})
+def list_changes():
+    try:
+        page_size = current_app.config['CHANGE_FEED_PAGE_SIZE']
+        since = request.args.get('since', type=int)
+        limit = request.args.get('limit', type=int)
+
+        # A malformed value parses as None; reject it rather than fall back to a full resync
+        if 'since' in request.args and (since is None or since < 0):
+            return jsonify({"error": "since must be a non-negative integer."}), 400
+        if 'limit' in request.args and (limit is None or not 1 <= limit <= page_size):
+            return jsonify({"error": f"limit must be between 1 and {page_size}."}), 400
+        since = since or 0
+        limit = limit or page_size
+
+        page = get_changes(since, limit, current_app.config['CHANGE_FEED_GAP_TIMEOUT'])
+        if page is None:
+            logger.info(f"Change feed cursor {since} expired; client must resync.")
+            return jsonify({"error": "Cursor expired; resync required."}), 410
+
+        logger.info(f"Fetched {len(page['changes'])} changes since {since}.")
+        return jsonify(page), 200
+
+    except Exception as e:
+        logger.error(f"Error fetching changes since {request.args.get('since')}: {e}")
+        return jsonify({"error": "Failed to retrieve changes"}), 500
@@ -1,8 +1,31 @@
-from flask import Blueprint, request, jsonify
+import threading
+from flask import Blueprint, Response, request, jsonify, current_app
+from sqlalchemy import select
 from app.models.comment import Comment
+from app.models.comment_archive import CommentArchive
+from app.models.post import Post
 from app.extensions import db
-from app.schemas.comment_schema import comment_schema, comments_schema
-from app.utils.decorators import jwt_required_with_user
+from app.schemas.comment_schema import comment_schema
+from app.services.group_commit import create_comment_grouped
+from app.services.trending_service import record_comment_activity
+from app.services.post_stats import record_comment_added
+from app.services.change_feed import record_change
+from app.services.comment_stream import (
+    get_comment_hub, publish_comment, start_poller, catch_up_query, encode_catch_up, stream_events
+)
+from app.services.comment_threads import get_thread, delete_subtree, parse_thread_limits
+from app.services.comment_archive import (
+    list_comments, list_all_comments, get_comment_any, restore_comment_thread, restore_post_comments,
+    comments_list_query
+)
+from app.services.count_service import count_comments, set_total_count
+from app.services.read_path import comment_rows
+from app.services.owned_writes import comment_insert_stmt, comment_update_stmt, comment_owner_query, refusal
+from app.services.shard_service import post_shard, use_shard, allocate_comment
+from app.utils.decorators import jwt_required_with_user, idempotent, sharded_by
+from app.utils.sharding import DEFAULT_SHARD, sharding_enabled
+from app.utils.rate_limit import rate_limit
+from app.utils.micro_cache import micro_cached
 from app.logger import setup_logger
 from flasgger import swag_from
 
@@ -15,11 +38,19 @@ comment_bp = Blueprint('comments', __name__)
 
 @comment_bp.route('/comments', methods=['POST'])
 @jwt_required_with_user
+@rate_limit('writes')
+@idempotent
 @swag_from({
     'tags': ['Comments'],
     'summary': 'Create a comment',
     'description': 'Authenticated users can create a comment on a post.',
     'parameters': [{
+        'name': 'Idempotency-Key',
+        'in': 'header',
+        'type': 'string',
+        'required': False,
+        'description': 'Unique key that makes retries of this request safe'
+    }, {
         'in': 'body',
         'name': 'body',
         'required': True,
@@ -27,18 +58,22 @@ comment_bp = Blueprint('comments', __name__)
             'type': 'object',
             'properties': {
                 'content': {'type': 'string'},
-                'post_id': {'type': 'integer'}
+                'post_id': {'type': 'integer'},
+                'parent_id': {'type': 'integer', 'description': 'Comment being replied to'}
             },
             'required': ['content', 'post_id']
         }
     }],
     'responses': {
         201: {'description': 'Comment created successfully'},
-        400: {'description': 'Invalid input'},
+        400: {'description': 'Invalid input or parent comment'},
+        409: {'description': 'Request with the same Idempotency-Key still in progress'},
+        422: {'description': 'Idempotency-Key reused for a different request'},
         500: {'description': 'Internal server error'}
     }
 })
 def create_comment(current_user):
+    user_id = current_user.id  # Read once; the instance expires on commit
     if not request.is_json:
         logger.warning("Create comment failed: Invalid JSON")
         return jsonify({"error": "Missing or invalid JSON"}), 400
@@ -52,12 +87,47 @@ def create_comment(current_user):
             logger.warning("Create comment failed: Missing fields.")
             return jsonify({"error": "Content and post_id are required."}), 400
 
-        comment = Comment(content=content, post_id=post_id, author_id=current_user.id)
-        db.session.add(comment)
-        db.session.commit()
+        # Comments live on the shard of their post
+        shard = post_shard(int(post_id), for_write=True)
+        if shard is None:
+            logger.warning(f"Create comment failed: unknown post_id={post_id}")
+            return jsonify({"error": "Post not found."}), 404
+
+        with use_shard(shard):
+            # A post that becomes active again gets its archived thread back first
+            if restore_post_comments(int(post_id)):
+                db.session.commit()
+
+            parent_id = data.get('parent_id')
+            if parent_id is not None:
+                parent_post_id = db.session.execute(
+                    select(Comment.post_id).where(Comment.id == parent_id)
+                ).scalar()
+                if parent_post_id is None or parent_post_id != int(post_id):
+                    logger.warning(f"Create comment failed: invalid parent_id={parent_id}")
+                    return jsonify({"error": "parent_id must be a comment on the same post."}), 400
+
+            if current_app.config['COMMENT_GROUP_COMMIT_ENABLED'] and not sharding_enabled():
+                # Share one transaction with other concurrent inserts
+                payload = create_comment_grouped(content, post_id, user_id, parent_id)
+                publish_comment(payload)
+                record_comment_activity(post_id)
+                logger.info(f"Comment created by user {user_id} on post {post_id} (group commit)")
+                return jsonify(payload), 201
+
+            # INSERT ... RETURNING hands back the dumped columns; no refresh query after commit
+            comment_id = allocate_comment(post_id)
+            row = db.session.execute(comment_insert_stmt(content, post_id, user_id, parent_id, comment_id)).one()
+            record_comment_added(post_id)  # Same transaction as the insert
+            record_change('comment', row.id)
+            db.session.commit()
+
+            payload = comment_rows.dump_row(row)
+            publish_comment(payload)
+            record_comment_activity(post_id)
 
-        logger.info(f"Comment created by user {current_user.id} on post {post_id}")
-        return jsonify(comment_schema.dump(comment)), 201
+            logger.info(f"Comment created by user {user_id} on post {post_id}")
+            return jsonify(payload), 201
 
     except Exception as e:
         logger.error(f"Error while creating comment: {e}")
@@ -65,41 +135,276 @@ def create_comment(current_user):
 
 
 @comment_bp.route('/comments', methods=['GET'])
+@micro_cached
 @swag_from({
     'tags': ['Comments'],
     'summary': 'Get all comments (optionally by post)',
+    'description': 'Without limit or before, returns every comment in id order. With them, '
+                   'returns a page newest first; pass X-Next-Cursor as before for the next page. '
+                   'Archived comments are included. X-Total-Count holds the number of matching '
+                   'comments; X-Total-Count-Type says whether it is exact or estimated. '
+                   'Anonymous requests are served from a per-worker micro-cache; X-Cache says how.',
     'parameters': [{
         'name': 'post_id',
         'in': 'query',
         'type': 'integer',
         'required': False,
         'description': 'Filter comments by post ID'
+    }, {
+        'name': 'limit',
+        'in': 'query',
+        'type': 'integer',
+        'required': False,
+        'description': 'Page size (default and maximum COMMENTS_MAX_PAGE_SIZE)'
+    }, {
+        'name': 'before',
+        'in': 'query',
+        'type': 'integer',
+        'required': False,
+        'description': 'Cursor: only comments with a lower id'
     }],
     'responses': {
         200: {'description': 'Comments retrieved successfully'},
+        400: {'description': 'Invalid limit or cursor'},
         500: {'description': 'Internal server error'}
     }
 })
 def get_comments():
     try:
-        post_id = request.args.get('post_id')
-        query = Comment.query
+        post_id = request.args.get('post_id', type=int)
+        before = request.args.get('before', type=int)
+        limit = request.args.get('limit', type=int)
+        max_page = current_app.config['COMMENTS_MAX_PAGE_SIZE']
+
+        if 'before' in request.args and before is None:
+            return jsonify({"error": "before must be a comment id."}), 400
+        if limit is None and before is not None:
+            limit = max_page
+        if 'limit' in request.args and (limit is None or not 1 <= limit <= max_page):
+            return jsonify({"error": f"limit must be between 1 and {max_page}."}), 400
 
         if post_id:
-            query = query.filter_by(post_id=post_id)
             logger.info(f"Fetching comments for post_id={post_id}")
         else:
             logger.info("Fetching all comments")
 
-        comments = query.all()
-        return jsonify(comments_schema.dump(comments)), 200
+        post_id = post_id or None
+        if post_id is None:
+            # Pages of every shard, merged by id
+            comments, next_cursor = list_all_comments(before=before, limit=limit)
+            # A planner estimate per shard
+            count, kind = count_comments(queries=(
+                comments_list_query(Comment), comments_list_query(CommentArchive)
+            ))
+        else:
+            # A post's comments share its shard; an unknown post reads as empty
+            with use_shard(post_shard(post_id) or DEFAULT_SHARD):
+                comments, next_cursor = list_comments(post_id=post_id, before=before, limit=limit)
+                # Maintained on the post
+                count, kind = count_comments(post_id)
+
+        response = set_total_count(jsonify(comment_rows.dump(comments)), count, kind)
+        if next_cursor is not None:
+            response.headers['X-Next-Cursor'] = str(next_cursor)
+        return response, 200
 
     except Exception as e:
         logger.error(f"Error retrieving comments: {e}")
         return jsonify({"error": "Failed to retrieve comments"}), 500
 
 
+@comment_bp.route('/comments/stream', methods=['GET'])
+@swag_from({
+    'tags': ['Comments'],
+    'summary': 'Stream new comments of a post (Server-Sent Events)',
+    'description': 'Keeps the connection open and pushes each new comment as an SSE event '
+                   'whose id is the comment id. Reconnecting clients send Last-Event-ID '
+                   'to receive the comments they missed.',
+    'produces': ['text/event-stream'],
+    'parameters': [{
+        'name': 'post_id',
+        'in': 'query',
+        'type': 'integer',
+        'required': True,
+        'description': 'ID of the post'
+    }, {
+        'name': 'Last-Event-ID',
+        'in': 'header',
+        'type': 'integer',
+        'required': False,
+        'description': 'Id of the last comment received; missed comments are replayed first'
+    }],
+    'responses': {
+        200: {'description': 'Event stream'},
+        400: {'description': 'Invalid parameters'},
+        404: {'description': 'Post not found'},
+        500: {'description': 'Internal server error'},
+        503: {'description': 'Streaming not available on this server'}
+    }
+})
+def stream_comments():
+    config = current_app.config
+    if not config['COMMENT_STREAM_ENABLED']:
+        # A stream would hold a single-threaded worker for as long as it stays open
+        return jsonify({"error": "Comment streaming is not available on this server."}), 503
+
+    post_id = request.args.get('post_id', type=int)
+    if post_id is None:
+        return jsonify({"error": "post_id is required."}), 400
+
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    try:
+        last_event_id = int(last_event_id) if last_event_id is not None else None
+    except ValueError:
+        return jsonify({"error": "Last-Event-ID must be a comment id."}), 400
+
+    hub = get_comment_hub()
+    subscription = None
+
+    try:
+        # The post and its comments share a shard; an unknown post is not found there either
+        with use_shard(post_shard(post_id) or DEFAULT_SHARD):
+            if Post.query.filter_by(id=post_id, deleted_at=None).first() is None:
+                return jsonify({"error": "Post not found."}), 404
+
+            if not config.get('BACKGROUND_TASKS_EAGER') and hub.claim_poller():
+                start_poller(hub, current_app._get_current_object())
+
+            # Subscribe before reading the backlog so nothing committed in between is lost
+            woken = threading.Event()
+            subscription = hub.subscribe(post_id, woken.set)
+
+            backlog = []
+            if last_event_id is not None:
+                backlog = encode_catch_up(db.session.execute(
+                    catch_up_query(post_id, last_event_id, config['COMMENT_STREAM_BACKLOG'])
+                ).scalars().all())
+
+            # The stream itself never touches the database; give the connection back now
+            db.session.close()
+
+    except Exception as e:
+        if subscription is not None:
+            hub.unsubscribe(post_id, subscription)
+        logger.error(f"Error opening comment stream for post {post_id}: {e}")
+        return jsonify({"error": "Failed to open comment stream"}), 500
+
+    def wait(timeout):
+        fired = woken.wait(timeout)
+        woken.clear()
+        return fired
+
+    logger.info(f"Comment stream opened for post_id={post_id} (resume from {last_event_id})")
+    return Response(
+        stream_events(hub, post_id, subscription, wait, backlog,
+                      config['COMMENT_STREAM_RETRY_MS'], config['COMMENT_STREAM_HEARTBEAT']),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@comment_bp.route('/comments/thread', methods=['GET'])
+@swag_from({
+    'tags': ['Comments'],
+    'summary': 'Get the threaded comments of a post',
+    'description': 'Returns nested comments of a post, fetched in a single query.',
+    'parameters': [{
+        'name': 'post_id',
+        'in': 'query',
+        'type': 'integer',
+        'required': True,
+        'description': 'ID of the post'
+    }, {
+        'name': 'max_depth',
+        'in': 'query',
+        'type': 'integer',
+        'required': False,
+        'description': 'Deepest reply level to return (0 = top-level comments only)'
+    }, {
+        'name': 'max_children',
+        'in': 'query',
+        'type': 'integer',
+        'required': False,
+        'description': 'Maximum replies returned per comment'
+    }],
+    'responses': {
+        200: {'description': 'Thread retrieved successfully'},
+        400: {'description': 'Invalid parameters'},
+        500: {'description': 'Internal server error'}
+    }
+})
+def get_post_thread():
+    try:
+        post_id = request.args.get('post_id', type=int)
+        if post_id is None:
+            return jsonify({"error": "post_id is required."}), 400
+
+        limits, error = parse_thread_limits(request.args, current_app.config)
+        if error:
+            return jsonify({"error": error}), 400
+
+        with use_shard(post_shard(post_id) or DEFAULT_SHARD):
+            thread = get_thread(post_id=post_id, **limits)
+        logger.info(f"Fetched comment thread for post_id={post_id}")
+        return jsonify(thread), 200
+
+    except Exception as e:
+        logger.error(f"Error retrieving thread for post {request.args.get('post_id')}: {e}")
+        return jsonify({"error": "Failed to retrieve comment thread"}), 500
+
+
+@comment_bp.route('/comments/<int:comment_id>/replies', methods=['GET'])
+@sharded_by('comment_id', 'Comment')
+@swag_from({
+    'tags': ['Comments'],
+    'summary': 'Get a comment with its nested replies',
+    'description': 'Returns the subtree below a comment, fetched in a single query.',
+    'parameters': [{
+        'name': 'comment_id',
+        'in': 'path',
+        'type': 'integer',
+        'required': True,
+        'description': 'ID of the root comment'
+    }, {
+        'name': 'max_depth',
+        'in': 'query',
+        'type': 'integer',
+        'required': False,
+        'description': 'Deepest reply level to return, relative to the comment'
+    }, {
+        'name': 'max_children',
+        'in': 'query',
+        'type': 'integer',
+        'required': False,
+        'description': 'Maximum replies returned per comment'
+    }],
+    'responses': {
+        200: {'description': 'Subtree retrieved successfully'},
+        400: {'description': 'Invalid parameters'},
+        404: {'description': 'Comment not found'},
+        500: {'description': 'Internal server error'}
+    }
+})
+def get_comment_replies(comment_id):
+    try:
+        limits, error = parse_thread_limits(request.args, current_app.config)
+        if error:
+            return jsonify({"error": error}), 400
+
+        subtree = get_thread(root_id=comment_id, **limits)
+        if not subtree:
+            return jsonify({"error": "Comment not found."}), 404
+
+        logger.info(f"Fetched reply subtree of comment ID: {comment_id}")
+        return jsonify(subtree[0]), 200
+
+    except Exception as e:
+        logger.error(f"Error retrieving replies of comment {comment_id}: {e}")
+        return jsonify({"error": "Failed to retrieve replies"}), 500
+
+
 @comment_bp.route('/comments/<int:comment_id>', methods=['GET'])
+@sharded_by('comment_id', 'Comment')
 @swag_from({
     'tags': ['Comments'],
     'summary': 'Get a specific comment',
@@ -118,7 +423,10 @@ def get_comments():
 })
 def get_comment(comment_id):
     try:
-        comment = Comment.query.get_or_404(comment_id)
+        comment = get_comment_any(comment_id)
+        if comment is None:
+            return jsonify({"error": "Comment not found."}), 404
+
         logger.info(f"Fetched comment ID: {comment_id}")
         return jsonify(comment_schema.dump(comment)), 200
 
@@ -129,6 +437,8 @@ def get_comment(comment_id):
 
 @comment_bp.route('/comments/<int:comment_id>', methods=['PUT'])
 @jwt_required_with_user
+@rate_limit('writes')
+@sharded_by('comment_id', 'Comment', for_write=True)
 @swag_from({
     'tags': ['Comments'],
     'summary': 'Update a comment',
@@ -160,22 +470,30 @@ def get_comment(comment_id):
     }
 })
 def update_comment(current_user, comment_id):
-    comment = Comment.query.get_or_404(comment_id)
-    
-    if comment.author_id != current_user.id:
-        logger.warning(f"User {current_user.id} unauthorized to update comment {comment_id}")
-        return jsonify({"error": "Unauthorized."}), 403
-
+    user_id = current_user.id  # Read once; the instance expires on commit
     if not request.is_json:
         return jsonify({"error": "Missing or invalid JSON"}), 400
 
     try:
         data = request.get_json()
-        comment.content = data.get('content', comment.content)
+        # One conditional UPDATE ... RETURNING; the owner is only looked up if it matches nothing
+        row = db.session.execute(comment_update_stmt(comment_id, user_id, data)).first()
+        if row is None:
+            owner_id = db.session.execute(comment_owner_query(comment_id)).scalar()
+            if owner_id == user_id and restore_comment_thread(comment_id):
+                # The author's comment is archived: bring its thread back, then write
+                row = db.session.execute(comment_update_stmt(comment_id, user_id, data)).first()
+        if row is None:
+            db.session.rollback()
+            logger.warning(f"Update of comment {comment_id} by user {user_id} refused")
+            error, status = refusal(owner_id, 'Comment')
+            return jsonify(error), status
+
+        record_change('comment', comment_id)
         db.session.commit()
 
-        logger.info(f"Comment {comment_id} updated by user {current_user.id}")
-        return jsonify(comment_schema.dump(comment)), 200
+        logger.info(f"Comment {comment_id} updated by user {user_id}")
+        return jsonify(comment_rows.dump_row(row)), 200
 
     except Exception as e:
         logger.error(f"Error updating comment {comment_id}: {e}")
@@ -184,6 +502,8 @@ def update_comment(current_user, comment_id):
 
 @comment_bp.route('/comments/<int:comment_id>', methods=['DELETE'])
 @jwt_required_with_user
+@rate_limit('writes')
+@sharded_by('comment_id', 'Comment', for_write=True)
 @swag_from({
     'tags': ['Comments'],
     'summary': 'Delete a comment',
@@ -202,17 +522,25 @@ def update_comment(current_user, comment_id):
     }
 })
 def delete_comment(current_user, comment_id):
-    comment = Comment.query.get_or_404(comment_id)
-
-    if comment.author_id != current_user.id:
-        logger.warning(f"User {current_user.id} unauthorized to delete comment {comment_id}")
-        return jsonify({"error": "Unauthorized."}), 403
-
+    user_id = current_user.id  # Read once; the instance expires on commit
     try:
-        db.session.delete(comment)
+        # Replies go with the comment; post stats are updated in the same transaction
+        count, post_id = delete_subtree(comment_id, user_id)
+        if not count:
+            owner_id = db.session.execute(comment_owner_query(comment_id)).scalar()
+            if owner_id == user_id and restore_comment_thread(comment_id):
+                # The author's comment is archived: bring its thread back, then delete
+                count, post_id = delete_subtree(comment_id, user_id)
+        if not count:
+            db.session.rollback()
+            logger.warning(f"Delete of comment {comment_id} by user {user_id} refused")
+            error, status = refusal(owner_id, 'Comment')
+            return jsonify(error), status
+
         db.session.commit()
+        record_comment_activity(post_id, weight=-count)
 
-        logger.info(f"Comment {comment_id} deleted by user {current_user.id}")
+        logger.info(f"Comment {comment_id} and {count - 1} replies deleted by user {user_id}")
         return jsonify({"message": "Comment deleted."}), 200
 
     except Exception as e:
@@ -0,0 +1,76 @@
+from datetime import datetime, timezone
+from flask import Blueprint, Response, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from app.services.export_service import EXPORT_FORMATS, parse_since, stream_export
+from app.services.shard_service import all_shard_engines
+from app.logger import setup_logger
+from flasgger import swag_from
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# Define blueprint for bulk exports
+export_bp = Blueprint('export', __name__)
+
+_MIMETYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+_EXPORT_SPEC = {
+    'tags': ['Export'],
+    'description': 'Streams every row as CSV or NDJSON in constant server memory.',
+    'parameters': [{
+        'name': 'format',
+        'in': 'query',
+        'type': 'string',
+        'enum': list(EXPORT_FORMATS),
+        'required': False,
+        'description': 'Output format (default ndjson)'
+    }, {
+        'name': 'since',
+        'in': 'query',
+        'type': 'string',
+        'format': 'date-time',
+        'required': False,
+        'description': 'Only rows created (posts: or updated) at or after this ISO 8601 time'
+    }],
+    'responses': {
+        200: {'description': 'Export stream'},
+        400: {'description': 'Invalid format or since'},
+        401: {'description': 'Missing or invalid token'}
+    }
+}
+
+
+def _export(entity):
+    fmt = request.args.get('format', 'ndjson').lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(EXPORT_FORMATS)}."}), 400
+
+    since = request.args.get('since')
+    try:
+        since = parse_since(since) if since else None
+    except ValueError:
+        return jsonify({"error": "since must be an ISO 8601 timestamp."}), 400
+
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    logger.info(f"Starting {fmt} export of {entity} (since={since})")
+
+    # The generator opens its own connection, so it outlives the request context safely
+    return Response(
+        stream_export(all_shard_engines(), entity, fmt, since, current_app.config['EXPORT_BATCH_SIZE']),
+        mimetype=_MIMETYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{entity}-{stamp}.{fmt}"'}
+    )
+
+
+@export_bp.route('/export/posts', methods=['GET'])
+@jwt_required()
+@swag_from(dict(_EXPORT_SPEC, summary='Export all posts'))
+def export_posts():
+    return _export('posts')
+
+
+@export_bp.route('/export/comments', methods=['GET'])
+@jwt_required()
+@swag_from(dict(_EXPORT_SPEC, summary='Export all comments'))
+def export_comments():
+    return _export('comments')
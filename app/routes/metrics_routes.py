@@ -0,0 +1,37 @@
+import os
+from flask import Blueprint, jsonify, current_app
+from app.utils.admission import get_admission_controller
+from app.utils.micro_cache import get_micro_cache
+from app.logger import setup_logger
+from flasgger import swag_from
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# Define blueprint for operational metrics
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+@swag_from({
+    'tags': ['Metrics'],
+    'summary': 'Get admission control metrics of this worker',
+    'description': 'Current concurrency limits, in-flight requests, admitted and shed counts '
+                   'per endpoint class, the smoothed DB latency, and micro-cache hit counters. '
+                   'Values are per process.',
+    'responses': {
+        200: {'description': 'Metrics retrieved successfully'},
+        500: {'description': 'Internal server error'}
+    }
+})
+def get_metrics():
+    try:
+        controller = get_admission_controller(current_app)
+        return jsonify({
+            'pid': os.getpid(),
+            'admission': controller.snapshot() if controller else None,
+            'micro_cache': get_micro_cache().snapshot() if current_app.config['MICRO_CACHE_ENABLED'] else None
+        }), 200
+    except Exception as e:
+        logger.error(f"Error collecting metrics: {e}")
+        return jsonify({"error": "Failed to collect metrics"}), 500
@@ -1,8 +1,17 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app.models.post import Post
 from app.extensions import db
-from app.schemas.post_schema import post_schema, posts_schema
-from app.utils.decorators import jwt_required_with_user
+from app.schemas.post_schema import post_schema
+from app.services.post_service import delete_post as delete_post_with_comments
+from app.services.change_feed import record_change
+from app.services.trending_service import get_trending_posts
+from app.services.count_service import record_count_change, count_posts, set_total_count, POSTS
+from app.services.read_path import post_list_query, post_rows, read_rows
+from app.services.owned_writes import post_insert_stmt, post_update_stmt, post_owner_query, refusal
+from app.services.shard_service import allocate_post, use_shard, on_each_shard, merge_rows
+from app.utils.decorators import jwt_required_with_user, idempotent, sharded_by
+from app.utils.rate_limit import rate_limit
+from app.utils.micro_cache import micro_cached
 from app.logger import setup_logger
 from flasgger import swag_from
 
@@ -15,11 +24,19 @@ post_bp = Blueprint('posts', __name__)
 
 @post_bp.route('/posts', methods=['POST'])
 @jwt_required_with_user
+@rate_limit('writes')
+@idempotent
 @swag_from({
     'tags': ['Posts'],
     'summary': 'Create a new blog post',
     'description': 'Allows an authenticated user to create a blog post.',
     'parameters': [{
+        'name': 'Idempotency-Key',
+        'in': 'header',
+        'type': 'string',
+        'required': False,
+        'description': 'Unique key that makes retries of this request safe'
+    }, {
         'in': 'body',
         'name': 'body',
         'required': True,
@@ -35,10 +52,13 @@ post_bp = Blueprint('posts', __name__)
     'responses': {
         201: {'description': 'Post created successfully'},
         400: {'description': 'Missing required fields or invalid input'},
+        409: {'description': 'Request with the same Idempotency-Key still in progress'},
+        422: {'description': 'Idempotency-Key reused for a different request'},
         500: {'description': 'Internal server error'}
     }
 })
 def create_post(current_user):
+    user_id = current_user.id  # Read once; the instance expires on commit
     if not request.is_json:
         logger.warning("Create post failed: Missing or invalid JSON.")
         return jsonify({"error": "Missing or invalid JSON"}), 400
@@ -52,12 +72,17 @@ def create_post(current_user):
             logger.warning("Create post failed: Title or content missing.")
             return jsonify({"error": "Title and content are required."}), 400
 
-        new_post = Post(title=title, content=content, author_id=current_user.id)
-        db.session.add(new_post)
-        db.session.commit()
+        # The author's shard; with sharding the directory also hands out the post id
+        post_id, shard = allocate_post(user_id)
+        with use_shard(shard):
+            # INSERT ... RETURNING hands back the dumped columns; no refresh query after commit
+            row = db.session.execute(post_insert_stmt(title, content, user_id, post_id)).one()
+            record_change('post', row.id)
+            record_count_change(POSTS, 1)
+            db.session.commit()
 
-        logger.info(f"Post created by user {current_user.id}: Post ID {new_post.id}")
-        return jsonify(post_schema.dump(new_post)), 201
+        logger.info(f"Post created by user {user_id}: Post ID {row.id}")
+        return jsonify(post_rows.dump_row(row)), 201
 
     except Exception as e:
         logger.error(f"Error creating post: {e}")
@@ -68,6 +93,8 @@ def create_post(current_user):
 @swag_from({
     'tags': ['Posts'],
     'summary': 'Get all blog posts',
+    'description': 'X-Total-Count holds the number of posts; X-Total-Count-Type says whether '
+                   'it is exact or estimated. With sharding, posts of every shard are merged in id order.',
     'responses': {
         200: {'description': 'List of posts retrieved successfully'},
         500: {'description': 'Internal server error'}
@@ -75,18 +102,58 @@ def create_post(current_user):
 })
 def get_posts():
     try:
-        posts = Post.query.all()
+        # Core rows straight to JSON; a list needs no ORM instances. Every shard holds some posts
+        posts = merge_rows(on_each_shard(read_rows, post_list_query()))
+        count, kind = count_posts()
         logger.info("Fetched all posts.")
-        return jsonify(posts_schema.dump(posts)), 200
+        return set_total_count(jsonify(post_rows.dump(posts)), count, kind), 200
     except Exception as e:
         logger.error(f"Error fetching posts: {e}")
         return jsonify({"error": "Failed to retrieve posts"}), 500
 
 
+@post_bp.route('/posts/trending', methods=['GET'])
+@swag_from({
+    'tags': ['Posts'],
+    'summary': 'Get trending posts',
+    'description': 'Posts ranked by time-decayed comment activity. Served from an in-memory '
+                   'snapshot that is refreshed periodically.',
+    'parameters': [{
+        'name': 'limit',
+        'in': 'query',
+        'type': 'integer',
+        'required': False,
+        'description': 'Maximum number of posts to return (default 10)'
+    }],
+    'responses': {
+        200: {'description': 'Trending posts retrieved successfully'},
+        400: {'description': 'Invalid limit'},
+        500: {'description': 'Internal server error'}
+    }
+})
+def get_trending():
+    try:
+        limit = request.args.get('limit', 10, type=int)
+        if limit < 1 or limit > current_app.config['TRENDING_SIZE']:
+            return jsonify({"error": f"limit must be between 1 and {current_app.config['TRENDING_SIZE']}."}), 400
+
+        posts = get_trending_posts(limit)
+        logger.info(f"Fetched {len(posts)} trending posts.")
+        return jsonify(posts), 200
+    except Exception as e:
+        logger.error(f"Error fetching trending posts: {e}")
+        return jsonify({"error": "Failed to retrieve trending posts"}), 500
+
+
 @post_bp.route('/posts/<int:post_id>', methods=['GET'])
+@micro_cached
+@sharded_by('post_id', 'Post')
 @swag_from({
     'tags': ['Posts'],
     'summary': 'Get a specific post by ID',
+    'description': 'Anonymous requests are served from a per-worker micro-cache for up to '
+                   'MICRO_CACHE_TTL seconds (plus MICRO_CACHE_STALE_TTL while it refreshes); '
+                   'X-Cache says how.',
     'parameters': [{
         'name': 'post_id',
         'in': 'path',
@@ -102,7 +169,7 @@ def get_posts():
 })
 def get_post(post_id):
     try:
-        post = Post.query.get_or_404(post_id)
+        post = Post.query.filter_by(id=post_id, deleted_at=None).first_or_404()
         logger.info(f"Fetched post ID: {post_id}")
         return jsonify(post_schema.dump(post)), 200
     except Exception as e:
@@ -112,6 +179,8 @@ def get_post(post_id):
 
 @post_bp.route('/posts/<int:post_id>', methods=['PUT'])
 @jwt_required_with_user
+@rate_limit('writes')
+@sharded_by('post_id', 'Post', for_write=True)
 @swag_from({
     'tags': ['Posts'],
     'summary': 'Update a blog post',
@@ -145,23 +214,23 @@ def get_post(post_id):
     }
 })
 def update_post(current_user, post_id):
-    post = Post.query.get_or_404(post_id)
-
-    if post.author_id != current_user.id:
-        logger.warning(f"Unauthorized update attempt by user {current_user.id} on post {post_id}")
-        return jsonify({"error": "Unauthorized."}), 403
-
+    user_id = current_user.id  # Read once; the instance expires on commit
     if not request.is_json:
         return jsonify({"error": "Missing or invalid JSON"}), 400
 
     try:
-        data = request.get_json()
-        post.title = data.get('title', post.title)
-        post.content = data.get('content', post.content)
+        # One conditional UPDATE ... RETURNING; the owner is only looked up if it matches nothing
+        row = db.session.execute(post_update_stmt(post_id, user_id, request.get_json())).first()
+        if row is None:
+            db.session.rollback()
+            logger.warning(f"Update of post {post_id} by user {user_id} refused")
+            error, status = refusal(db.session.execute(post_owner_query(post_id)).scalar(), 'Post')
+            return jsonify(error), status
 
+        record_change('post', post_id)
         db.session.commit()
-        logger.info(f"Post {post_id} updated by user {current_user.id}")
-        return jsonify(post_schema.dump(post)), 200
+        logger.info(f"Post {post_id} updated by user {user_id}")
+        return jsonify(post_rows.dump_row(row)), 200
 
     except Exception as e:
         logger.error(f"Error updating post {post_id}: {e}")
@@ -170,10 +239,13 @@ def update_post(current_user, post_id):
 
 @post_bp.route('/posts/<int:post_id>', methods=['DELETE'])
 @jwt_required_with_user
+@rate_limit('writes')
+@sharded_by('post_id', 'Post', for_write=True)
 @swag_from({
     'tags': ['Posts'],
     'summary': 'Delete a blog post',
-    'description': 'Only the author can delete their post.',
+    'description': 'Only the author can delete their post. Posts with very large comment '
+                   'threads are hidden immediately and purged in the background.',
     'parameters': [{
         'name': 'post_id',
         'in': 'path',
@@ -183,22 +255,25 @@ def update_post(current_user, post_id):
     }],
     'responses': {
         200: {'description': 'Post deleted successfully'},
+        202: {'description': 'Post hidden; comment purge scheduled'},
         403: {'description': 'Unauthorized access'},
         404: {'description': 'Post not found'},
         500: {'description': 'Internal server error'}
     }
 })
 def delete_post(current_user, post_id):
-    post = Post.query.get_or_404(post_id)
+    user_id = current_user.id  # Read once; the instance expires on commit
+    try:
+        scheduled = delete_post_with_comments(post_id, user_id)
+        if scheduled is None:
+            logger.warning(f"Delete of post {post_id} by user {user_id} refused")
+            error, status = refusal(db.session.execute(post_owner_query(post_id)).scalar(), 'Post')
+            return jsonify(error), status
 
-    if post.author_id != current_user.id:
-        logger.warning(f"Unauthorized delete attempt by user {current_user.id} on post {post_id}")
-        return jsonify({"error": "Unauthorized."}), 403
+        logger.info(f"Post {post_id} deleted by user {user_id}")
 
-    try:
-        db.session.delete(post)
-        db.session.commit()
-        logger.info(f"Post {post_id} deleted by user {current_user.id}")
+        if scheduled:
+            return jsonify({"message": "Post deletion scheduled."}), 202
         return jsonify({"message": "Post deleted."}), 200
 
     except Exception as e:
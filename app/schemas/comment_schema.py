@@ -28,6 +28,7 @@ class CommentSchema(SQLAlchemyAutoSchema):
     content = fields.Str(required=True)        # Required text content
     post_id = fields.Int(required=True)        # FK to associated post
     author_id = fields.Int(required=True)      # FK to comment's author
+    parent_id = fields.Int(allow_none=True)    # FK to the parent comment, if a reply
     created_at = fields.DateTime(dump_only=True)  # Timestamp, read-only
 
 try:
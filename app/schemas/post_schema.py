@@ -16,6 +16,7 @@ class PostSchema(SQLAlchemyAutoSchema):
     - Validates required fields on load
     - Maintains field order for consistent API responses
     - Includes foreign keys (author_id)
+    - Exposes denormalized comment stats without extra queries
     """
     class Meta:
         model = Post                # The associated SQLAlchemy model
@@ -29,6 +30,8 @@ class PostSchema(SQLAlchemyAutoSchema):
     content = fields.Str(required=True)         # Post body content (required)
     author_id = fields.Int(required=True)       # Foreign key to User model
     created_at = fields.DateTime(dump_only=True)  # Timestamp of creation (read-only)
+    comment_count = fields.Int(dump_only=True)    # Denormalized number of comments (read-only)
+    last_comment_at = fields.DateTime(dump_only=True)  # Time of the latest comment (read-only)
 
 # Attempt to create schema instances with logging
 try:
@@ -1,48 +1,67 @@
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from werkzeug.security import generate_password_hash, check_password_hash
 from app.models.user import User
+from app.services.availability import get_availability_index
 from app.extensions import db
 from app.logger import setup_logger
 
 # Initialize logger
 logger = setup_logger(__name__)
 
+# Error returned by register_user when the username or email is taken
+REGISTRATION_CONFLICT = "Username or email already exists."
+
+
+def user_insert_stmt(username, email, hashed_password):
+    """
+    INSERT ... RETURNING the columns a signup responds with, so nothing is
+    read back after committing. Shared by the sync and async code paths.
+    """
+    return (
+        insert(User)
+        .values(username=username, email=email, password=hashed_password)
+        .returning(User.id, User.username, User.email)
+    )
+
 
 def register_user(username, email, password):
     """
     Registers a new user if the username and email are unique.
 
+    The row is inserted optimistically and the unique constraints on username
+    and email decide conflicts, so a signup costs one INSERT and concurrent
+    signups for the same name cannot both succeed. The new row's columns come
+    back from the INSERT itself.
+
     Parameters:
         username (str): Desired username
         email (str): User's email address
         password (str): Plain-text password
 
     Returns:
-        tuple: (User object, None) on success
+        tuple: (row of id, username and email, None) on success
                (None, str error message) on failure
     """
     logger.info(f"Attempting to register user: {username} ({email})")
 
     try:
-        # Check for existing username or email
-        existing_user = User.query.filter(
-            (User.username == username) | (User.email == email)
-        ).first()
-
-        if existing_user:
-            logger.warning(f"Registration failed: Username or email already exists for {username}")
-            return None, "Username or email already exists."
-
         # Hash the password and create new user
         hashed_password = generate_password_hash(password)
-        user = User(username=username, email=email, password=hashed_password)
-
-        db.session.add(user)
+        user = db.session.execute(user_insert_stmt(username, email, hashed_password)).one()
         db.session.commit()
+        get_availability_index().add(username, email)
         logger.info(f"User registered successfully: {username} (ID: {user.id})")
 
         return user, None
 
+    except IntegrityError:
+        db.session.rollback()
+        logger.warning(f"Registration failed: Username or email already exists for {username}")
+        return None, REGISTRATION_CONFLICT
+
     except Exception as e:
+        db.session.rollback()
         logger.error(f"Error during user registration for {username}: {e}")
         return None, "An error occurred during registration."
 
@@ -56,7 +75,7 @@ def authenticate_user(username, password):
         password (str): Plain-text password
 
     Returns:
-        tuple: (User object, None) on successful authentication
+        tuple: (row of id, username and email, None) on successful authentication
                (None, str error message) on failure
     """
     logger.info(f"Authenticating user: {username}")
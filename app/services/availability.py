@@ -0,0 +1,176 @@
+import hashlib
+import math
+import threading
+import time
+from flask import current_app
+from sqlalchemy import select
+from app.models.user import User
+from app.extensions import db
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# Rows re-read on every sync, covering ids whose transactions committed out of order
+SYNC_OVERLAP_ROWS = 100
+
+# Columns that can be checked, and their key prefixes in the filter
+FIELDS = {'username': 'u:', 'email': 'e:'}
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter. Membership tests can return false positives (at
+    about `error_rate` once `capacity` values are added) but never false
+    negatives.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class AvailabilityIndex:
+    """
+    In-memory Bloom filter of the usernames and emails in the users table.
+
+    A value missing from the filter was free as of the last sync, so most
+    availability checks need no query; only possible matches are confirmed in
+    the database. The index loads every user on first use, then pulls new
+    users (created by other workers or imports) incrementally (WHERE id > last
+    seen id) at most once per `sync_interval` seconds. Answers are therefore
+    eventually consistent: a user registered on another worker within the
+    last interval is reported as available. Registration itself is still
+    guarded by the unique constraints. When the index outgrows its capacity
+    it is rebuilt at twice the size on the next sync.
+    """
+
+    def __init__(self, capacity, error_rate, sync_interval):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self._filter = None             # Built by load()
+        self._count = 0                 # Users added to the filter
+        self._last_id = 0               # Highest users.id applied
+        self._next_sync = 0.0           # time.monotonic() deadline for the next sync
+        self._lock = threading.Lock()
+
+    def needs_load(self):
+        return self._filter is None or self._count > self._filter.capacity
+
+    def needs_sync(self):
+        return time.monotonic() >= self._next_sync
+
+    def load_query(self):
+        return select(User.id, User.username, User.email)
+
+    def sync_query(self):
+        """Statement returning users created since the last sync."""
+        return (
+            select(User.id, User.username, User.email)
+            .where(User.id > self._last_id - SYNC_OVERLAP_ROWS)
+            .order_by(User.id)
+        )
+
+    def load(self, rows):
+        """Replaces the filter with one built from load_query() rows."""
+        rows = list(rows)
+        capacity = max(self.capacity, 2 * len(rows))
+        bloom = BloomFilter(capacity, self.error_rate)
+        last_id = 0
+        for row in rows:
+            bloom.add(FIELDS['username'] + row.username)
+            bloom.add(FIELDS['email'] + row.email)
+            last_id = max(last_id, row.id)
+
+        with self._lock:
+            self._filter, self._count, self._last_id = bloom, len(rows), last_id
+            self._next_sync = time.monotonic() + self.sync_interval
+        logger.info(f"Availability index loaded: {len(rows)} user(s), capacity {capacity}.")
+
+    def apply(self, rows):
+        """Merges rows returned by sync_query() into the filter."""
+        with self._lock:
+            for row in rows:
+                if row.id > self._last_id:
+                    self._count += 1
+                self._filter.add(FIELDS['username'] + row.username)
+                self._filter.add(FIELDS['email'] + row.email)
+                self._last_id = max(self._last_id, row.id)
+            self._next_sync = time.monotonic() + self.sync_interval
+
+    def add(self, username, email):
+        """Adds a user registered by this worker, visible immediately."""
+        with self._lock:
+            if self._filter is None:
+                return
+            self._filter.add(FIELDS['username'] + username)
+            self._filter.add(FIELDS['email'] + email)
+
+    def might_exist(self, field, value):
+        return FIELDS[field] + value in self._filter
+
+
+def get_availability_index(app=None):
+    """
+    Returns the availability index of the given (or current) app, creating it on first use.
+    """
+    app = app or current_app._get_current_object()
+    index = app.extensions.get('availability_index')
+
+    if index is None:
+        index = AvailabilityIndex(
+            capacity=app.config['AVAILABILITY_FILTER_CAPACITY'],
+            error_rate=app.config['AVAILABILITY_FILTER_ERROR_RATE'],
+            sync_interval=app.config['AVAILABILITY_SYNC_INTERVAL']
+        )
+        app.extensions['availability_index'] = index
+
+    return index
+
+
+def taken_query(field, value):
+    """Index probe confirming that a username or email is in use."""
+    return select(User.id).where(getattr(User, field) == value).limit(1)
+
+
+def check_availability(**values):
+    """
+    Checks whether usernames and/or emails are free to register.
+
+    Parameters:
+        username (str): Username to check (optional)
+        email (str): Email to check (optional)
+
+    Returns:
+        dict: field -> True if available
+    """
+    index = get_availability_index()
+
+    if index.needs_load():
+        index.load(db.session.execute(index.load_query()))
+    elif index.needs_sync():
+        index.apply(db.session.execute(index.sync_query()))
+
+    result = {}
+    for field, value in values.items():
+        if not index.might_exist(field, value):
+            result[field] = True
+        else:
+            result[field] = db.session.execute(taken_query(field, value)).first() is None
+    return result
@@ -0,0 +1,202 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, insert, delete, func, union_all
+from app.models.change import Change
+from app.models.post import Post
+from app.models.comment import Comment
+from app.models.comment_archive import CommentArchive
+from app.extensions import db
+from app.schemas.post_schema import posts_schema
+from app.schemas.comment_schema import comments_schema
+from app.services.shard_service import on_each_shard, merge_rows
+from app.services.read_path import comment_columns
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+UPSERT = 'upsert'
+DELETE = 'delete'
+
+
+def _utcnow():
+    """Naive UTC timestamp, matching the DateTime columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def change_rows(entity, entity_ids, op=UPSERT):
+    """Parameter sets of one change per id, for executemany INSERTs of many ids."""
+    if isinstance(entity_ids, int):
+        entity_ids = [entity_ids]
+    return [{'entity': entity, 'entity_id': entity_id, 'op': op} for entity_id in entity_ids]
+
+
+def change_stmt(entity, entity_ids, op=UPSERT):
+    """
+    INSERT appending one change per id. Statement builders are shared by the
+    sync and async code paths; execute them in the transaction of the write.
+    """
+    return insert(Change).values(change_rows(entity, entity_ids, op))
+
+
+def record_change(entity, entity_ids, op=UPSERT):
+    """
+    Appends changes for the given post or comment ids to the feed inside the
+    current transaction. Call after flushing the write and before committing.
+    """
+    if entity_ids:
+        db.session.execute(change_stmt(entity, entity_ids, op))
+
+
+def changes_query(since, limit):
+    """Statement returning the next page of changes after the cursor."""
+    return (
+        select(Change.id, Change.entity, Change.entity_id, Change.op, Change.created_at)
+        .where(Change.id > since)
+        .order_by(Change.id)
+        .limit(limit)
+    )
+
+
+def oldest_change_query():
+    return select(func.min(Change.id))
+
+
+def cursor_expired(since, oldest_id):
+    """True if changes after `since` may already have been purged."""
+    return since > 0 and oldest_id is not None and since < oldest_id - 1
+
+
+def committed_prefix(rows, since, gap_timeout):
+    """
+    Returns the rows that can be handed out without skipping a change.
+
+    Change ids are assigned at insert time, so a transaction that commits
+    later may hold a lower id than rows that are already visible. A hole in
+    the id sequence is therefore treated as in-flight, and the page stops
+    before it, until the row after it is older than `gap_timeout` seconds;
+    by then the hole is assumed to come from a rolled-back transaction.
+    """
+    settled_before = _utcnow() - timedelta(seconds=gap_timeout)
+    previous = since
+    committed = []
+
+    for row in rows:
+        if row.id != previous + 1 and row.created_at and row.created_at > settled_before:
+            return committed, True
+        committed.append(row)
+        previous = row.id
+
+    return committed, False
+
+
+def changed_ids(rows):
+    """Latest op per entity; earlier changes to the same row are superseded."""
+    latest = {}
+    for row in rows:
+        latest[(row.entity, row.entity_id)] = row
+    return sorted(latest.values(), key=lambda row: row.id)
+
+
+def assemble_changes(rows, posts, comments):
+    """
+    Builds the feed entries for compacted rows. Upserts carry the current row;
+    an upsert whose row is gone is dropped, since its tombstone follows.
+    """
+    current = {
+        'post': {post['id']: post for post in posts},
+        'comment': {comment['id']: comment for comment in comments}
+    }
+    entries = []
+
+    for row in rows:
+        entry = {'seq': row.id, 'type': row.entity, 'op': row.op, 'id': row.entity_id}
+        if row.op == UPSERT:
+            data = current[row.entity].get(row.entity_id)
+            if data is None:
+                continue
+            entry['data'] = data
+        entries.append(entry)
+
+    return entries
+
+
+def upserted_ids(rows, entity):
+    return [row.entity_id for row in rows if row.entity == entity and row.op == UPSERT]
+
+
+def get_changes(since, limit, gap_timeout):
+    """
+    Returns post and comment changes after a cursor, in commit order.
+
+    Parameters:
+        since (int): Cursor returned by the previous call (0 for a full sync)
+        limit (int): Maximum number of change rows to scan
+        gap_timeout (float): Seconds after which a hole in the sequence is skipped
+
+    Returns:
+        dict: {"changes": [...], "cursor": int, "has_more": bool},
+              or None if the cursor is older than the retained history
+    """
+    if cursor_expired(since, db.session.execute(oldest_change_query()).scalar()):
+        return None
+
+    rows = db.session.execute(changes_query(since, limit)).all()
+    committed, blocked = committed_prefix(rows, since, gap_timeout)
+    compacted = changed_ids(committed)
+
+    # Every shard answers for the ids it holds; the others match nothing
+    posts_stmt, comments_stmt = current_rows_queries(compacted)
+    posts = _rows_on_every_shard(posts_stmt, lambda result: result.scalars().all())
+    comments = _rows_on_every_shard(comments_stmt, lambda result: result.all())
+
+    return build_page(since, limit, rows, committed, blocked, compacted, posts, comments)
+
+
+def _rows_on_every_shard(statement, fetch):
+    if statement is None:
+        return []
+    return merge_rows(on_each_shard(lambda: fetch(db.session.execute(statement))))
+
+
+def current_rows_queries(compacted):
+    """
+    SELECTs for the current state of upserted posts and comments (None if not
+    needed). Posts come back as instances; comments as rows of the dumped
+    columns, read from the hot table and the archive, since archiving a
+    comment moves it without recording a change.
+    """
+    post_ids = upserted_ids(compacted, 'post')
+    comment_ids = upserted_ids(compacted, 'comment')
+    posts_stmt = select(Post).where(Post.id.in_(post_ids), Post.deleted_at.is_(None)) if post_ids else None
+    comments_stmt = None
+    if comment_ids:
+        comments_stmt = union_all(*(
+            select(*comment_columns(model)).where(model.id.in_(comment_ids))
+            for model in (Comment, CommentArchive)
+        ))
+    return posts_stmt, comments_stmt
+
+
+def build_page(since, limit, rows, committed, blocked, compacted, posts, comments):
+    return {
+        'changes': assemble_changes(compacted, posts_schema.dump(posts), comments_schema.dump(comments)),
+        'cursor': committed[-1].id if committed else since,
+        # A page cut short by an in-flight change is retried on the next poll, not immediately
+        'has_more': not blocked and len(rows) == limit
+    }
+
+
+def purge_old_changes(retention_days):
+    """
+    Deletes feed entries older than the retention window. Clients whose cursor
+    falls before the oldest remaining entry must resync.
+
+    Returns:
+        int: Number of rows deleted
+    """
+    result = db.session.execute(
+        delete(Change).where(Change.created_at < _utcnow() - timedelta(days=retention_days))
+    )
+    db.session.commit()
+    logger.info(f"Purged {result.rowcount} change feed entries.")
+    return result.rowcount
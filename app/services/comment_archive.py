@@ -0,0 +1,258 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, insert, delete, func
+from app.models.comment import Comment
+from app.models.comment_archive import CommentArchive
+from app.models.post import Post
+from app.services.read_path import comment_columns, read_rows
+from app.services.shard_service import each_shard, on_each_shard, merge_rows
+from app.extensions import db
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# Columns copied between the hot table and the archive
+ARCHIVE_COLUMNS = ('id', 'content', 'post_id', 'author_id', 'parent_id', 'created_at')
+
+
+def _utcnow():
+    """Naive UTC timestamp, matching the DateTime columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _columns(model):
+    return [getattr(model, name) for name in ARCHIVE_COLUMNS]
+
+
+def archivable_posts_query(cutoff, after, limit):
+    """
+    Next posts whose comments can be archived: posts without a new comment
+    since `cutoff` that still have comments in the hot table, after the
+    `after` post id. Their comment counts size the batches.
+    """
+    has_hot_comments = select(Comment.id).where(Comment.post_id == Post.id).exists()
+    return (
+        select(Post.id, Post.comment_count)
+        .where(
+            Post.id > after,
+            Post.last_comment_at < cutoff,
+            Post.deleted_at.is_(None),
+            has_hot_comments
+        )
+        .order_by(Post.id)
+        .limit(limit)
+    )
+
+
+def archive_comments(older_than_days, batch_size):
+    """
+    Moves the comments of posts idle for `older_than_days` into the archive,
+    about `batch_size` comments per transaction.
+
+    A post's whole thread moves in one transaction (a thread larger than
+    `batch_size` gets a transaction of its own), so readers never see a post
+    with part of its comments archived. The posts of a batch are locked and
+    re-checked before moving, so a comment written meanwhile either makes
+    its post ineligible or waits for the batch to commit (and then moves the
+    post's comments back).
+
+    Returns:
+        int: Number of comments archived
+    """
+    cutoff = _utcnow() - timedelta(days=older_than_days)
+    total = sum(_archive_shard_comments(cutoff, batch_size) for _ in each_shard())
+
+    logger.info(f"Archived {total} comment(s) older than {older_than_days} days.")
+    return total
+
+
+def _archive_shard_comments(cutoff, batch_size):
+    total, after = 0, 0
+    while True:
+        candidates = db.session.execute(archivable_posts_query(cutoff, after, batch_size)).all()
+        if not candidates:
+            break
+
+        # Whole posts until the batch is full; always at least one
+        post_ids, size = [], 0
+        for post_id, comment_count in candidates:
+            if post_ids and size + comment_count > batch_size:
+                break
+            post_ids.append(post_id)
+            size += comment_count
+        after = post_ids[-1]
+
+        post_ids = db.session.execute(
+            select(Post.id)
+            .where(Post.id.in_(post_ids), Post.last_comment_at < cutoff)
+            .with_for_update()
+        ).scalars().all()
+
+        batch = select(*_columns(Comment)).where(Comment.post_id.in_(post_ids))
+        db.session.execute(insert(CommentArchive).from_select(ARCHIVE_COLUMNS, batch))
+        result = db.session.execute(
+            delete(Comment).where(Comment.post_id.in_(post_ids)),
+            execution_options={"synchronize_session": False}
+        )
+        db.session.commit()
+
+        total += result.rowcount
+        logger.debug(f"Archived {result.rowcount} comment(s) of {len(post_ids)} post(s).")
+
+    return total
+
+
+def archived_probe_query(post_id):
+    """Index probe telling whether a post has archived comments."""
+    return select(CommentArchive.id).where(CommentArchive.post_id == post_id).limit(1)
+
+
+def post_lock_query(post_id):
+    return select(Post.id).where(Post.id == post_id).with_for_update()
+
+
+def restore_post_stmts(post_id):
+    """INSERT ... SELECT moving a post's archived comments back, and the DELETE clearing them."""
+    archived = select(*_columns(CommentArchive)).where(CommentArchive.post_id == post_id)
+    return (
+        insert(Comment).from_select(ARCHIVE_COLUMNS, archived),
+        delete(CommentArchive).where(CommentArchive.post_id == post_id)
+    )
+
+
+def restore_post_comments(post_id):
+    """
+    Moves a post's archived comments back into the hot table before it is
+    written to again. Costs one index probe when nothing is archived.
+    Does not commit.
+
+    Returns:
+        int: Number of comments restored
+    """
+    if db.session.execute(archived_probe_query(post_id)).first() is None:
+        return 0
+
+    # Serializes concurrent restores of the same post
+    db.session.execute(post_lock_query(post_id))
+    copy, clear = restore_post_stmts(post_id)
+    count = db.session.execute(copy).rowcount
+    db.session.execute(clear)
+
+    logger.info(f"Restored {count} archived comment(s) of post {post_id}.")
+    return count
+
+
+def archived_post_query(comment_id):
+    """Post of an archived comment; no row if the comment is not archived."""
+    return select(CommentArchive.post_id).where(CommentArchive.id == comment_id)
+
+
+def restore_comment_thread(comment_id):
+    """
+    Moves the thread of an archived comment back into the hot table so the
+    comment can be written. Does not commit.
+
+    Returns:
+        bool: True if the comment was archived and has been restored
+    """
+    post_id = db.session.execute(archived_post_query(comment_id)).scalar()
+    if post_id is None:
+        return False
+
+    restore_post_comments(post_id)
+    return True
+
+
+def get_comment_any(comment_id):
+    """Looks a comment up in the hot table, then in the archive."""
+    return db.session.get(Comment, comment_id) or db.session.get(CommentArchive, comment_id)
+
+
+def comments_list_query(model, post_id=None, before=None, limit=None):
+    """
+    Comments from the hot table or the archive, as rows of the columns
+    CommentSchema dumps: all of them in id order, or a page of `limit` below
+    the `before` cursor, newest first.
+    """
+    query = select(*comment_columns(model))
+    if post_id is not None:
+        query = query.where(model.post_id == post_id)
+    if before is not None:
+        query = query.where(model.id < before)
+    if limit is None:
+        return query.order_by(model.id)
+    return query.order_by(model.id.desc()).limit(limit)
+
+
+def archive_watermark_query():
+    """Highest archived comment id (a single index probe)."""
+    return select(func.max(CommentArchive.id))
+
+
+def archive_needed(hot, post_id, limit):
+    """
+    Whether a list request has to read the archive too. Returns True, False,
+    or None if that depends on the archive watermark.
+
+    A post's comments are archived together in one transaction, so for one
+    post the archive only matters once no hot rows are left. Across all
+    posts, a full page only needs the archive if archived ids reach into it
+    (see watermark).
+    """
+    if post_id is not None:
+        return not hot
+    if limit is None or len(hot) < limit:
+        return True
+    return None
+
+
+def watermark_reached(hot, watermark):
+    return watermark is not None and watermark > hot[-1].id
+
+
+def merge_comment_pages(hot, archived, limit):
+    """
+    Merges hot and archived comments into one result.
+
+    Returns:
+        tuple: (comments, next cursor or None)
+    """
+    if limit is None:
+        return sorted(hot + archived, key=lambda comment: comment.id), None
+
+    page = sorted(hot + archived, key=lambda comment: comment.id, reverse=True)[:limit]
+    return page, page[-1].id if len(page) == limit else None
+
+
+def list_comments(post_id=None, before=None, limit=None):
+    """
+    Lists comments, reading the archive only when the request reaches
+    archived ranges. Comments are returned as Core rows (see read_path).
+
+    Parameters:
+        post_id (int): Only comments of this post
+        before (int): Cursor; only comments with a lower id
+        limit (int): Page size; None returns every comment in id order
+
+    Returns:
+        tuple: (comments, next cursor or None)
+    """
+    hot = read_rows(comments_list_query(Comment, post_id, before, limit))
+
+    needed = archive_needed(hot, post_id, limit)
+    if needed is None:
+        needed = watermark_reached(hot, db.session.execute(archive_watermark_query()).scalar())
+    if not needed:
+        return merge_comment_pages(hot, [], limit)
+
+    archived = read_rows(comments_list_query(CommentArchive, post_id, before, limit))
+    return merge_comment_pages(hot, archived, limit)
+
+
+def list_all_comments(before=None, limit=None):
+    """
+    Lists the comments of every post: list_comments() on each shard, with
+    the pages merged by id. Returns (comments, next cursor or None).
+    """
+    pages = on_each_shard(list_comments, None, before, limit)
+    return merge_comment_pages(merge_rows([comments for comments, _ in pages]), [], limit)
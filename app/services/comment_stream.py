@@ -0,0 +1,277 @@
+import json
+import threading
+import time
+from collections import deque
+from flask import current_app
+from sqlalchemy import select, func, and_
+from app.models.comment import Comment
+from app.extensions import db
+from app.schemas.comment_schema import comment_schema
+from app.services.shard_service import on_each_shard
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# Rows re-read on every poll, covering comment ids whose transactions committed out of order
+POLL_OVERLAP_ROWS = 100
+
+
+def format_event(comment_id, data):
+    """Encodes one Server-Sent Event; `data` is already JSON."""
+    return f"id: {comment_id}\nevent: comment\ndata: {data}\n\n"
+
+
+class Subscription:
+    """
+    One client's position in a post's event buffer. Holds no thread or queue of
+    its own; `wake` is called (from any thread) whenever new events arrive.
+    """
+
+    __slots__ = ('channel', 'wake', 'position')
+
+    def __init__(self, channel, wake):
+        self.channel = channel
+        self.wake = wake
+        self.position = channel.seq
+
+    def drain(self):
+        """Returns the encoded events published since the last call."""
+        return self.channel.read_after(self)
+
+
+class PostChannel:
+    """
+    Bounded buffer of recent comment events for one post, shared by its
+    subscribers. Polled comments at or below `floor` (the hub's watermark when
+    the channel opened) predate every subscriber and are not delivered.
+    """
+
+    def __init__(self, buffer_size, floor=None):
+        self.events = deque(maxlen=buffer_size)   # (seq, comment_id, encoded event)
+        self.floor = floor
+        self.seq = 0
+        self.subscribers = set()
+        self.lock = threading.Lock()
+
+    def append(self, comment_id, encoded):
+        with self.lock:
+            self.seq += 1
+            self.events.append((self.seq, comment_id, encoded))
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            subscription.wake()
+
+    def read_after(self, subscription):
+        with self.lock:
+            pending = [(cid, encoded) for seq, cid, encoded in self.events if seq > subscription.position]
+            subscription.position = self.seq
+        return pending
+
+
+class CommentHub:
+    """
+    Per-process fan-out of newly created comments to Server-Sent Event clients.
+
+    Comments created by this worker are published right after their commit.
+    Comments created by other workers are picked up by one query per
+    `poll_interval` covering every subscribed post (WHERE id > last seen id).
+    The same query returns the newest comment id overall, so the watermark
+    keeps moving while subscribed posts are quiet. Each event is serialized
+    once, no matter how many clients receive it.
+    """
+
+    def __init__(self, buffer_size, poll_interval):
+        self.buffer_size = buffer_size
+        self.poll_interval = poll_interval
+        self._channels = {}             # post_id -> PostChannel
+        self._published = set()         # Comment ids inside the poll overlap window
+        self._last_id = None            # Highest comment id seen on any post; None until the poller starts
+        self._start_id = None           # Highest comment id when the poller started; never replayed
+        self._poller_started = False
+        self._lock = threading.Lock()
+
+    def subscribe(self, post_id, wake):
+        with self._lock:
+            channel = self._channels.get(post_id)
+            if channel is None:
+                channel = self._channels[post_id] = PostChannel(self.buffer_size, self._last_id)
+            subscription = Subscription(channel, wake)
+            channel.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, post_id, subscription):
+        with self._lock:
+            channel = self._channels.get(post_id)
+            if channel is None:
+                return
+            channel.subscribers.discard(subscription)
+            if not channel.subscribers:
+                del self._channels[post_id]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(channel.subscribers) for channel in self._channels.values())
+
+    def publish(self, payload, polled=False):
+        """
+        Delivers a serialized comment to the subscribers of its post (once per
+        comment id). `polled` comments older than the channel are dropped.
+        """
+        comment_id, post_id = payload['id'], payload['post_id']
+
+        with self._lock:
+            if comment_id in self._published:
+                return
+            self._published.add(comment_id)
+            if self._last_id is not None and comment_id > self._last_id:
+                self._last_id = comment_id
+            if len(self._published) > 4 * POLL_OVERLAP_ROWS:
+                # Ids below the overlap window are never polled again
+                horizon = max(self._last_id or 0, comment_id) - 2 * POLL_OVERLAP_ROWS
+                self._published = {cid for cid in self._published if cid > horizon}
+            channel = self._channels.get(post_id)
+
+        if channel is not None and not (polled and channel.floor is not None and comment_id <= channel.floor):
+            channel.append(comment_id, format_event(comment_id, json.dumps(payload)))
+
+    def claim_poller(self):
+        """True exactly once per hub, for the caller that should start the poller."""
+        with self._lock:
+            if self._poller_started:
+                return False
+            self._poller_started = True
+            return True
+
+    def poll_query(self):
+        """
+        Statement returning the newest comment id overall, joined with the
+        recent comments on subscribed posts (none if nobody is subscribed).
+        On the first poll, only the current maximum comment id.
+        """
+        if self._last_id is None:
+            return select(func.max(Comment.id))
+
+        with self._lock:
+            post_ids = list(self._channels)
+
+        newest = select(func.max(Comment.id).label('newest_id')).subquery()
+        return (
+            select(newest.c.newest_id, Comment)
+            .select_from(newest)
+            .outerjoin(Comment, and_(
+                Comment.id > max(self._last_id - POLL_OVERLAP_ROWS, self._start_id),
+                Comment.post_id.in_(post_ids)
+            ))
+            .order_by(Comment.id)
+        )
+
+    def apply_poll(self, *results):
+        """Publishes the rows returned by poll_query(), one result per shard it ran on."""
+        if self._last_id is None:
+            self._last_id = self._start_id = max((result.scalar() or 0 for result in results), default=0)
+            return
+
+        rows = [row for result in results for row in result.all()]
+        comments = sorted((comment for _, comment in rows if comment is not None), key=lambda comment: comment.id)
+        for comment in comments:
+            self.publish(comment_schema.dump(comment), polled=True)
+
+        newest = max((newest_id or 0 for newest_id, _ in rows), default=0)
+        with self._lock:
+            self._last_id = max(self._last_id, newest)
+
+
+def get_comment_hub(app=None):
+    """
+    Returns the comment hub of the given (or current) app, creating it on first use.
+    """
+    app = app or current_app._get_current_object()
+    hub = app.extensions.get('comment_stream')
+
+    if hub is None:
+        hub = CommentHub(
+            buffer_size=app.config['COMMENT_STREAM_BUFFER'],
+            poll_interval=app.config['COMMENT_STREAM_POLL_INTERVAL']
+        )
+        app.extensions['comment_stream'] = hub
+
+    return hub
+
+
+def publish_comment(payload):
+    """
+    Pushes a committed comment to stream subscribers in this worker.
+
+    Parameters:
+        payload (dict): Serialized comment (as returned by comment_schema.dump)
+    """
+    get_comment_hub().publish(payload)
+
+
+def poll_once(hub):
+    """
+    Runs one poll: the same statement on every shard, merged into a single
+    apply_poll() so the id window only advances once all shards are read.
+    """
+    hub.apply_poll(*on_each_shard(db.session.execute, hub.poll_query()))
+
+
+def start_poller(hub, app):
+    """Starts the background thread that pulls comments committed by other workers."""
+    def run():
+        while True:
+            time.sleep(hub.poll_interval)
+            with app.app_context():
+                try:
+                    poll_once(hub)
+                except Exception as e:
+                    logger.error(f"Comment stream poll failed: {e}")
+                finally:
+                    db.session.remove()
+
+    threading.Thread(target=run, name='comment-stream-poller', daemon=True).start()
+    logger.info(f"Comment stream poller started (interval={hub.poll_interval}s).")
+
+
+def catch_up_query(post_id, last_event_id, limit):
+    """Comments a reconnecting client missed, oldest first."""
+    return (
+        select(Comment)
+        .where(Comment.post_id == post_id, Comment.id > last_event_id)
+        .order_by(Comment.id)
+        .limit(limit)
+    )
+
+
+def encode_catch_up(comments):
+    return [(comment.id, format_event(comment.id, json.dumps(comment_schema.dump(comment))))
+            for comment in comments]
+
+
+def stream_events(hub, post_id, subscription, wait, backlog, retry_ms, heartbeat):
+    """
+    Generator yielding the SSE body for one client: the catch-up backlog, then
+    live events as they are published, with a comment line every `heartbeat`
+    seconds to keep proxies from closing idle connections.
+
+    `wait(timeout)` blocks until the subscription is woken or the timeout passes.
+    """
+    try:
+        yield f"retry: {retry_ms}\n\n"
+
+        # Comments committed while subscribing can arrive both ways; send them once
+        sent = set()
+        for comment_id, encoded in backlog:
+            sent.add(comment_id)
+            yield encoded
+
+        while True:
+            for comment_id, encoded in subscription.drain():
+                if comment_id not in sent:
+                    yield encoded
+
+            if not wait(heartbeat):
+                yield ": keepalive\n\n"
+    finally:
+        hub.unsubscribe(post_id, subscription)
@@ -0,0 +1,214 @@
+from sqlalchemy import select, insert, delete, func, literal_column
+from app.models.comment import Comment
+from app.models.comment_archive import CommentArchive
+from app.extensions import db
+from app.services.post_stats import record_comment_removed
+from app.models.change import Change
+from app.services.change_feed import change_rows, DELETE
+from app.services.shard_service import forget_comments
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# Columns returned for every node; plain rows instead of ORM instances keep large threads cheap
+NODE_COLUMNS = ('id', 'content', 'post_id', 'author_id', 'parent_id', 'created_at')
+
+
+def subtree_cte(post_id=None, root_id=None, max_depth=None, model=Comment, author_id=None, max_children=None):
+    """
+    Recursive CTE walking a comment tree top-down.
+
+    Anchored either at the top-level comments of a post (post_id) or at a
+    single comment (root_id), optionally only if `author_id` wrote it. Each
+    row carries its depth relative to the anchor; recursion stops at
+    `max_depth`, so a level costs no extra query. With `max_children`, only
+    the oldest replies of each comment are followed, so pruned branches are
+    never expanded. `model` is Comment or CommentArchive.
+    """
+    anchor = select(*(getattr(model, name) for name in NODE_COLUMNS), literal_column("0").label('depth'))
+    if author_id is not None:
+        anchor = anchor.where(model.author_id == author_id)
+    if root_id is not None:
+        anchor = anchor.where(model.id == root_id)
+    else:
+        anchor = anchor.where(model.post_id == post_id, model.parent_id.is_(None))
+
+    tree = anchor.cte('comment_tree', recursive=True)
+
+    source = model.__table__
+    if max_children is not None:
+        # Replies ranked among their siblings once per post (window functions
+        # are not allowed inside the recursive step); materialized so that
+        # PostgreSQL does not recompute the ranking at every level
+        thread_post = post_id if root_id is None else (
+            select(model.post_id).where(model.id == root_id).scalar_subquery()
+        )
+        source = (
+            select(*(getattr(model, name) for name in NODE_COLUMNS),
+                   func.row_number().over(partition_by=model.parent_id, order_by=model.id).label('sibling_rank'))
+            .where(model.post_id == thread_post)
+            .cte('siblings')
+            .prefix_with('MATERIALIZED', dialect='postgresql')
+        )
+
+    children = (
+        select(*(source.c[name] for name in NODE_COLUMNS), (tree.c.depth + 1).label('depth'))
+        .join(tree, source.c.parent_id == tree.c.id)
+    )
+    if max_depth is not None:
+        children = children.where(tree.c.depth < max_depth)
+    if max_children is not None:
+        children = children.where(source.c.sibling_rank <= max_children)
+
+    return tree.union_all(children)
+
+
+def thread_query(post_id=None, root_id=None, max_depth=None, max_children=None, max_nodes=None,
+                 model=Comment):
+    """
+    Single SELECT returning a thread or subtree, shallowest nodes first.
+
+    At most `max_children` replies are kept per comment (oldest first; the
+    top-level comments of a post are not limited) and at most `max_nodes`
+    rows overall. Statement builders are shared by the sync and async code
+    paths.
+    """
+    tree = subtree_cte(post_id=post_id, root_id=root_id, max_depth=max_depth, model=model,
+                       max_children=max_children)
+
+    query = select(tree).order_by(tree.c.depth, tree.c.id)
+    if max_nodes is not None:
+        query = query.limit(max_nodes)
+
+    return query
+
+
+def build_thread(rows):
+    """
+    Nests flat rows (parents before children) into a list of root nodes in O(n).
+    Rows whose parent was cut by the breadth or size limits are dropped.
+    """
+    nodes = {}
+    roots = []
+
+    for row in rows:
+        node = {
+            'id': row.id,
+            'content': row.content,
+            'post_id': row.post_id,
+            'author_id': row.author_id,
+            'parent_id': row.parent_id,
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'replies': []
+        }
+
+        if row.depth == 0:
+            roots.append(node)
+        else:
+            parent = nodes.get(row.parent_id)
+            if parent is None:
+                continue
+            parent['replies'].append(node)
+
+        nodes[row.id] = node
+
+    return roots
+
+
+def get_thread(post_id=None, root_id=None, max_depth=None, max_children=None, max_nodes=None):
+    """
+    Fetches a whole post thread or a comment subtree in one round trip.
+
+    Parameters:
+        post_id (int): Post whose full thread is returned (ignored if root_id is set)
+        root_id (int): Comment whose subtree is returned
+        max_depth (int): Deepest reply level returned, relative to the root(s)
+        max_children (int): Maximum replies returned per comment
+        max_nodes (int): Maximum comments returned overall
+
+    Returns:
+        list: Nested comment dicts, each with a "replies" list
+    """
+    limits = dict(max_depth=max_depth, max_children=max_children, max_nodes=max_nodes)
+    rows = db.session.execute(thread_query(post_id=post_id, root_id=root_id, **limits)).all()
+    if not rows:
+        # Threads of long-idle posts are archived as a whole
+        rows = db.session.execute(
+            thread_query(post_id=post_id, root_id=root_id, model=CommentArchive, **limits)
+        ).all()
+
+    logger.debug(f"Thread query returned {len(rows)} comment(s).")
+    return build_thread(rows)
+
+
+def subtree_delete_stmt(root_id, author_id=None):
+    """
+    Set-based DELETE of a comment together with all of its replies, only if
+    `author_id` (when given) wrote the comment. Returns the id, post_id and
+    created_at of every deleted row.
+    """
+    tree = subtree_cte(root_id=root_id, author_id=author_id)
+    return (
+        delete(Comment)
+        .where(Comment.id.in_(select(tree.c.id)))
+        .returning(Comment.id, Comment.post_id, Comment.created_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def subtree_summary(rows):
+    """
+    Post id, number of comments and newest timestamp of the rows returned by
+    subtree_delete_stmt(), as needed for the post's comment stats.
+    """
+    latest = max((row.created_at for row in rows if row.created_at is not None), default=None)
+    return rows[0].post_id, len(rows), latest
+
+
+def tombstone_rows(rows):
+    """Change feed parameter sets for the rows returned by subtree_delete_stmt()."""
+    return change_rows('comment', [row.id for row in rows], DELETE)
+
+
+def delete_subtree(comment_id, author_id):
+    """
+    Deletes a comment written by `author_id` and every reply below it in one
+    statement, keeping the post's comment stats and the change feed in step.
+    Does not commit.
+
+    Returns:
+        tuple: (number of comments deleted, post id); (0, None) if no comment
+        with that id by that author is in the hot table
+    """
+    rows = db.session.execute(subtree_delete_stmt(comment_id, author_id)).all()
+    if not rows:
+        return 0, None
+
+    post_id, count, latest = subtree_summary(rows)
+    # executemany form: a subtree can be too large for one VALUES clause
+    db.session.execute(insert(Change), tombstone_rows(rows))
+    record_comment_removed(post_id, latest, count)
+    forget_comments([row.id for row in rows])
+    return count, post_id
+
+
+def parse_thread_limits(args, config):
+    """
+    Reads max_depth and max_children from query args, defaulting to and capped
+    by the configured maximums.
+
+    Returns:
+        tuple: (limits dict for get_thread, None) or (None, error message)
+    """
+    limits = {'max_nodes': config['COMMENT_THREAD_MAX_NODES']}
+
+    for name, setting in (('max_depth', 'COMMENT_THREAD_MAX_DEPTH'),
+                          ('max_children', 'COMMENT_THREAD_MAX_CHILDREN')):
+        maximum = config[setting]
+        value = args.get(name, maximum, type=int)
+        if value is None or value < (0 if name == 'max_depth' else 1) or value > maximum:
+            return None, f"{name} must be an integer up to {maximum}."
+        limits[name] = value
+
+    return limits, None
@@ -0,0 +1,147 @@
+import json
+import random
+from sqlalchemy import select, delete, insert, func
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.row_counter import RowCounter
+from app.models.post import Post
+from app.extensions import db
+from app.services.shard_service import each_shard
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+EXACT = 'exact'
+ESTIMATED = 'estimated'
+
+# Slots per counter; more slots mean less write contention and a slightly larger sum on read
+COUNTER_SLOTS = 16
+
+# Counter of live (not deleted) posts
+POSTS = 'posts'
+
+_UPSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+
+def counter_delta_stmt(dialect_name, name, delta):
+    """
+    Upsert adding `delta` to a random slot of a counter. Execute it in the
+    transaction of the write being counted.
+    """
+    upsert = _UPSERTS[dialect_name](RowCounter).values(
+        name=name, slot=random.randrange(COUNTER_SLOTS), value=delta
+    )
+    return upsert.on_conflict_do_update(
+        index_elements=[RowCounter.name, RowCounter.slot],
+        set_={'value': RowCounter.value + delta}
+    )
+
+
+def record_count_change(name, delta):
+    """Adds `delta` to a maintained counter inside the current transaction."""
+    if delta:
+        db.session.execute(counter_delta_stmt(db.session.get_bind().dialect.name, name, delta))
+
+
+def counter_query(name):
+    return select(func.coalesce(func.sum(RowCounter.value), 0)).where(RowCounter.name == name)
+
+
+def post_comment_count_query(post_id):
+    """The denormalized comment count of a post (archived comments included)."""
+    return select(Post.comment_count).where(Post.id == post_id, Post.deleted_at.is_(None))
+
+
+def exact_count_query(query):
+    return select(func.count()).select_from(query.order_by(None).subquery())
+
+
+def estimate_statement(query, dialect):
+    """
+    EXPLAIN statement and parameters for a planner estimate of the rows a
+    query returns, for Connection.exec_driver_sql(). None where the dialect
+    has no row estimates.
+    """
+    if dialect.name != 'postgresql':
+        return None
+
+    compiled = query.order_by(None).compile(dialect=dialect)
+    if compiled.positional:
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+    else:
+        params = compiled.params
+    return f"EXPLAIN (FORMAT JSON) {compiled}", params
+
+
+def parse_estimate(plan):
+    """Row estimate from EXPLAIN (FORMAT JSON) output."""
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def estimate_count(query):
+    """
+    Planner-estimated number of rows a query returns, without running it.
+    Falls back to an exact COUNT(*) on databases without estimates (SQLite).
+
+    Returns:
+        tuple: (count, EXACT or ESTIMATED)
+    """
+    statement = estimate_statement(query, db.session.get_bind(clause=query).dialect)
+    if statement is None:
+        return db.session.execute(exact_count_query(query)).scalar(), EXACT
+
+    sql, params = statement
+    plan = db.session.connection(bind_arguments={"clause": query}).exec_driver_sql(sql, params).scalar()
+    return parse_estimate(plan), ESTIMATED
+
+
+def count_posts():
+    """Number of live posts, from the maintained counter."""
+    return db.session.execute(counter_query(POSTS)).scalar(), EXACT
+
+
+def count_comments(post_id=None, queries=()):
+    """
+    Number of comments of a post (exact, from the post's comment_count), or
+    the estimated total of the given list queries for any other filter,
+    summed over every shard.
+
+    Returns:
+        tuple: (count, EXACT or ESTIMATED)
+    """
+    if post_id is not None:
+        return db.session.execute(post_comment_count_query(post_id)).scalar() or 0, EXACT
+
+    total, kind = 0, EXACT
+    for _ in each_shard():
+        for query in queries:
+            count, query_kind = estimate_count(query)
+            total += count
+            if query_kind == ESTIMATED:
+                kind = ESTIMATED
+    return total, kind
+
+
+def set_total_count(response, count, kind):
+    """Adds X-Total-Count and X-Total-Count-Type (exact or estimated) to a response."""
+    response.headers['X-Total-Count'] = str(count)
+    response.headers['X-Total-Count-Type'] = kind
+    return response
+
+
+def rebuild_counter(name, exact_query):
+    """
+    Resets a counter to the result of an exact COUNT query (summed over the
+    shards), e.g. after a restore or if it ever drifts. Does not commit.
+    """
+    count = sum(db.session.execute(exact_query).scalar() for _ in each_shard())
+    db.session.execute(delete(RowCounter).where(RowCounter.name == name))
+    db.session.execute(insert(RowCounter).values(name=name, slot=0, value=count))
+    logger.info(f"Counter '{name}' rebuilt: {count}.")
+    return count
+
+
+def live_posts_count_query():
+    return select(func.count()).select_from(Post).where(Post.deleted_at.is_(None))
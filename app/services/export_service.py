@@ -0,0 +1,138 @@
+import csv
+import heapq
+import io
+import json
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from sqlalchemy import select, or_, union_all
+from app.models.post import Post
+from app.models.comment import Comment
+from app.models.comment_archive import CommentArchive
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+# Rows joined into one chunk before it is handed to the client or file
+CHUNK_ROWS = 500
+
+
+def _post_columns():
+    return [Post.id, Post.title, Post.content, Post.author_id, Post.created_at, Post.updated_at,
+            Post.comment_count, Post.last_comment_at]
+
+
+def _comment_columns(model=Comment):
+    return [model.id, model.content, model.post_id, model.author_id, model.parent_id, model.created_at]
+
+
+def export_query(entity, since=None):
+    """
+    SELECT for one export, in primary key order.
+
+    Parameters:
+        entity (str): 'posts' or 'comments'
+        since (datetime): Only rows created (or, for posts, updated) at or after this time
+    """
+    if entity == 'posts':
+        query = select(*_post_columns()).where(Post.deleted_at.is_(None)).order_by(Post.id)
+        if since is not None:
+            query = query.where(or_(Post.created_at >= since, Post.updated_at >= since))
+        return query
+
+    # Archived comments are part of the export, merged in id order
+    parts = []
+    for model in (Comment, CommentArchive):
+        part = select(*_comment_columns(model))
+        if since is not None:
+            part = part.where(model.created_at >= since)
+        parts.append(part)
+    query = union_all(*parts)
+    return query.order_by(query.selected_columns.id)
+
+
+def parse_since(value):
+    """
+    Parses an ISO 8601 timestamp into naive UTC, matching the DateTime columns.
+
+    Raises:
+        ValueError: If the value is not a valid timestamp
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _csv_chunks(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(_json_value(value) for value in row)
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def _ndjson_chunks(columns, rows):
+    lines = []
+
+    for row in rows:
+        lines.append(json.dumps({column: _json_value(value) for column, value in zip(columns, row)}))
+        if len(lines) == CHUNK_ROWS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def stream_export(engines, entity, fmt, since=None, batch_size=1000):
+    """
+    Generator yielding an export as text chunks in constant memory.
+
+    Rows are fetched `batch_size` at a time on a dedicated connection with a
+    server-side cursor (where the driver supports it), so neither the ORM nor
+    the full result set is ever held in memory. With several shards, one
+    cursor per shard is merged in id order. The connections are released
+    when the generator finishes or is closed (e.g. the client disconnects).
+
+    Parameters:
+        engines (list): Engines to read from, one per shard
+        entity (str): 'posts' or 'comments'
+        fmt (str): 'csv' or 'ndjson'
+        since (datetime): Optional lower bound, see export_query()
+        batch_size (int): Rows fetched per round trip
+    """
+    query = export_query(entity, since)
+    columns = [column.name for column in query.selected_columns]
+    exported = 0
+
+    with ExitStack() as stack:
+        results = [
+            stack.enter_context(engine.connect()).execution_options(yield_per=batch_size).execute(query)
+            for engine in engines
+        ]
+        merged = results[0] if len(results) == 1 else heapq.merge(*results, key=lambda row: row.id)
+
+        def rows():
+            nonlocal exported
+            for row in merged:
+                exported += 1
+                yield row
+
+        chunks = _csv_chunks if fmt == 'csv' else _ndjson_chunks
+        yield from chunks(columns, rows())
+
+    logger.info(f"Exported {exported} {entity} as {fmt}.")
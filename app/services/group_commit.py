@@ -0,0 +1,179 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from flask import current_app
+from app.models.comment import Comment
+from app.extensions import db
+from app.schemas.comment_schema import comment_schema
+from app.services.post_stats import record_comment_added
+from app.services.change_feed import record_change
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# Upper bound on how long a request waits for its batch to be committed
+RESULT_TIMEOUT_SECONDS = 30
+
+
+class GroupCommitWriter:
+    """
+    Collects concurrent comment inserts and commits them in a single transaction.
+
+    A single writer thread takes the first queued insert, keeps gathering more
+    for up to `max_wait` seconds or until `max_batch` items are queued, and then
+    inserts and commits them together. Each caller receives either the dumped
+    comment (with its real id) or the exception raised for its own row.
+    """
+
+    def __init__(self, app, max_batch, max_wait):
+        self.app = app
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, values):
+        """
+        Queues a comment insert.
+
+        Parameters:
+            values (dict): Column values (content, post_id, author_id, parent_id)
+
+        Returns:
+            Future: Resolves to the serialized comment, or raises the insert error
+        """
+        future = Future()
+
+        if self.app.config.get('BACKGROUND_TASKS_EAGER'):
+            # Inline batch of one, on the caller's session
+            self._write_batch([(values, future)])
+            return future
+
+        self._ensure_started()
+        self._queue.put((values, future))
+        return future
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='comment-group-commit', daemon=True
+                )
+                self._thread.start()
+                logger.info(f"Group commit writer started (max_batch={self.max_batch}, "
+                            f"max_wait={self.max_wait * 1000:.1f}ms)")
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            with self.app.app_context():
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    logger.error(f"Group commit batch of {len(batch)} failed: {e}")
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                finally:
+                    db.session.remove()
+
+    def _write_batch(self, batch):
+        """
+        Inserts a batch in one transaction. If the combined flush fails, each
+        row is retried inside its own savepoint so only the offending rows fail.
+        """
+        session = db.session
+        outcomes = []
+
+        try:
+            with session.begin_nested():
+                comments = [Comment(**values) for values, _ in batch]
+                session.add_all(comments)
+            outcomes = [(future, comment, None) for (_, future), comment in zip(batch, comments)]
+        except Exception as e:
+            logger.warning(f"Batch insert of {len(batch)} comments failed ({e}); isolating rows.")
+            for values, future in batch:
+                try:
+                    with session.begin_nested():
+                        comment = Comment(**values)
+                        session.add(comment)
+                    outcomes.append((future, comment, None))
+                except Exception as row_error:
+                    outcomes.append((future, None, row_error))
+
+        # One stats UPDATE per post and one feed INSERT per batch, inside the same transaction
+        added_per_post = {}
+        for _, comment, error in outcomes:
+            if error is None:
+                added_per_post[comment.post_id] = added_per_post.get(comment.post_id, 0) + 1
+        for post_id, count in added_per_post.items():
+            record_comment_added(post_id, count)
+        record_change('comment', [comment.id for _, comment, error in outcomes if error is None])
+
+        # Serialize before commit so that expiring the instances costs no extra queries
+        payloads = [
+            (future, comment_schema.dump(comment) if comment is not None else None, error)
+            for future, comment, error in outcomes
+        ]
+
+        try:
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        for future, payload, error in payloads:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(payload)
+
+        logger.debug(f"Group commit wrote {len(batch)} comment(s) in one transaction.")
+
+
+def get_comment_writer():
+    """
+    Returns the group commit writer of the current app, creating it on first use.
+    """
+    app = current_app._get_current_object()
+    writer = app.extensions.get('comment_group_commit')
+
+    if writer is None:
+        writer = GroupCommitWriter(
+            app,
+            max_batch=app.config['COMMENT_GROUP_COMMIT_MAX_BATCH'],
+            max_wait=app.config['COMMENT_GROUP_COMMIT_MAX_WAIT_MS'] / 1000.0
+        )
+        app.extensions['comment_group_commit'] = writer
+
+    return writer
+
+
+def create_comment_grouped(content, post_id, author_id, parent_id=None):
+    """
+    Creates a comment through the group commit writer and waits for its batch.
+
+    Returns:
+        dict: Serialized comment including its database id
+    """
+    future = get_comment_writer().submit({
+        'content': content,
+        'post_id': post_id,
+        'author_id': author_id,
+        'parent_id': parent_id
+    })
+    return future.result(timeout=RESULT_TIMEOUT_SECONDS)
@@ -0,0 +1,152 @@
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from app.models.idempotency_key import IdempotencyKey
+from app.extensions import db
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+
+def _utcnow():
+    """Naive UTC timestamp, matching the DateTime columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def claim_key(user_id, key, fingerprint):
+    """
+    Claims an idempotency key by inserting an in-flight record.
+
+    An expired record, or an in-flight one whose lease ran out because its
+    request never finished (e.g. the worker was killed), is replaced.
+
+    Parameters:
+        user_id (int): ID of the requesting user
+        key (str): Idempotency-Key header value
+        fingerprint (str): See request_fingerprint()
+
+    Returns:
+        tuple: (True, None) if the key was claimed by this request
+               (False, IdempotencyKey) if a live record already exists
+    """
+    ttl = current_app.config['IDEMPOTENCY_TTL_SECONDS']
+    lease = current_app.config['IDEMPOTENCY_LEASE_SECONDS']
+
+    for _ in range(2):
+        now = _utcnow()
+        record = IdempotencyKey(
+            key=key,
+            user_id=user_id,
+            request_fingerprint=fingerprint,
+            expires_at=now + timedelta(seconds=ttl),
+            claimed_at=now
+        )
+        try:
+            db.session.add(record)
+            db.session.commit()
+            logger.debug(f"Idempotency key claimed: {key} (user {user_id})")
+            return True, None
+        except IntegrityError:
+            db.session.rollback()
+
+        existing = db.session.get(IdempotencyKey, (key, user_id), populate_existing=True)
+        if existing is None:
+            continue  # Released between our insert and lookup; try again
+
+        now = _utcnow()
+        abandoned = existing.status_code is None and existing.claimed_at <= now - timedelta(seconds=lease)
+        if existing.expires_at <= now or abandoned:
+            # Drop the stale record, unless someone else replaced it meanwhile, and claim afresh
+            db.session.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.user_id == user_id,
+                    IdempotencyKey.claimed_at == existing.claimed_at
+                )
+            )
+            db.session.commit()
+            reason = "Abandoned" if abandoned else "Expired"
+            logger.debug(f"{reason} idempotency key replaced: {key} (user {user_id})")
+            continue
+
+        return False, existing
+
+    # Lost two races in a row; report whatever is stored now
+    return False, db.session.get(IdempotencyKey, (key, user_id), populate_existing=True)
+
+
+def request_fingerprint(method, path, body):
+    """
+    "<METHOD> <path> <sha256 of the body>": a key reused for a different
+    endpoint or a different payload is told apart from a retry.
+    """
+    return f"{method} {path} {hashlib.sha256(body).hexdigest()}"
+
+
+def wait_for_key(user_id, key):
+    """
+    Polls until the in-flight request holding a key completes or the wait times out.
+
+    Returns:
+        IdempotencyKey or None: The completed record, or None on timeout/release
+    """
+    timeout = current_app.config['IDEMPOTENCY_WAIT_TIMEOUT']
+    interval = current_app.config['IDEMPOTENCY_POLL_INTERVAL']
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        record = db.session.get(IdempotencyKey, (key, user_id), populate_existing=True)
+        if record is None or record.status_code is not None:
+            return record
+        time.sleep(interval)
+
+    logger.warning(f"Timed out waiting for in-flight idempotency key {key} (user {user_id})")
+    return None
+
+
+def complete_key(user_id, key, status_code, response_body):
+    """
+    Stores the final response for a claimed key so retries can replay it.
+    """
+    record = db.session.get(IdempotencyKey, (key, user_id))
+    if record is None:
+        logger.warning(f"Idempotency key {key} vanished before completion (user {user_id})")
+        return
+
+    record.status_code = status_code
+    record.response_body = response_body
+    db.session.commit()
+    logger.debug(f"Idempotency key completed: {key} -> {status_code}")
+
+
+def release_key(user_id, key):
+    """
+    Deletes a claimed key so that a failed request can be retried.
+    """
+    db.session.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.key == key,
+            IdempotencyKey.user_id == user_id
+        )
+    )
+    db.session.commit()
+    logger.debug(f"Idempotency key released: {key} (user {user_id})")
+
+
+def purge_expired_keys():
+    """
+    Deletes all expired idempotency records.
+
+    Returns:
+        int: Number of records deleted
+    """
+    result = db.session.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.expires_at <= _utcnow())
+    )
+    db.session.commit()
+    logger.info(f"Purged {result.rowcount} expired idempotency key(s).")
+    return result.rowcount
@@ -0,0 +1,90 @@
+from sqlalchemy import select, insert, update, union_all
+from app.models.post import Post
+from app.models.comment import Comment
+from app.models.comment_archive import CommentArchive
+from app.services.read_path import post_columns, comment_columns
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# Single-statement post and comment writes that return the columns the
+# schemas dump, so no row is read back after committing. Updates and deletes
+# only match rows of the requesting user; one that matches nothing is
+# followed by an owner lookup telling a missing row (404) from someone
+# else's (403). Statement builders are shared by the sync and async paths.
+
+
+def post_insert_stmt(title, content, author_id, post_id=None):
+    """
+    INSERT ... RETURNING the dumped columns, server defaults included.
+    `post_id` is only given when the shard directory assigned the id.
+    """
+    values = dict(title=title, content=content, author_id=author_id)
+    if post_id is not None:
+        values['id'] = post_id
+    return insert(Post).values(**values).returning(*post_columns())
+
+
+def owned_post(post_id, author_id):
+    """WHERE criteria of a live post written by `author_id`."""
+    return (Post.id == post_id, Post.author_id == author_id, Post.deleted_at.is_(None))
+
+
+def post_update_stmt(post_id, author_id, data):
+    """UPDATE ... RETURNING the dumped columns; fields missing from `data` keep their value."""
+    return (
+        update(Post)
+        .where(*owned_post(post_id, author_id))
+        .values(title=data.get('title', Post.title), content=data.get('content', Post.content))
+        .returning(*post_columns())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def post_owner_query(post_id):
+    """Author of a live post; no row if there is no such post."""
+    return select(Post.author_id).where(Post.id == post_id, Post.deleted_at.is_(None))
+
+
+def comment_insert_stmt(content, post_id, author_id, parent_id=None, comment_id=None):
+    """INSERT ... RETURNING the dumped columns of a new comment; see post_insert_stmt for the id."""
+    values = dict(content=content, post_id=post_id, author_id=author_id, parent_id=parent_id)
+    if comment_id is not None:
+        values['id'] = comment_id
+    return insert(Comment).values(**values).returning(*comment_columns())
+
+
+def comment_update_stmt(comment_id, author_id, data):
+    """UPDATE ... RETURNING the dumped columns of a comment in the hot table."""
+    return (
+        update(Comment)
+        .where(Comment.id == comment_id, Comment.author_id == author_id)
+        .values(content=data.get('content', Comment.content))
+        .returning(*comment_columns())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def comment_owner_query(comment_id):
+    """Author of a comment, whether it is in the hot table or archived."""
+    return union_all(
+        select(Comment.author_id).where(Comment.id == comment_id),
+        select(CommentArchive.author_id).where(CommentArchive.id == comment_id)
+    )
+
+
+def refusal(owner_id, noun):
+    """
+    Error body and status for a conditional write that matched nothing.
+
+    Parameters:
+        owner_id (int): Result of the owner query, None if the row does not exist
+        noun (str): 'Post' or 'Comment'
+
+    Returns:
+        tuple: (error dict, 404 or 403)
+    """
+    if owner_id is None:
+        return {"error": f"{noun} not found."}, 404
+    return {"error": "Unauthorized."}, 403
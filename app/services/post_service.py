@@ -0,0 +1,178 @@
+from flask import current_app
+from sqlalchemy import select, update, delete, func
+from app.models.post import Post
+from app.models.comment import Comment
+from app.models.comment_archive import CommentArchive
+from app.extensions import db
+from app.utils.background import run_in_background
+from app.services.change_feed import record_change, DELETE
+from app.services.count_service import record_count_change, POSTS
+from app.services.owned_writes import owned_post
+from app.services.shard_service import use_shard, current_shard, each_shard, forget_post
+from app.utils.sharding import DEFAULT_SHARD
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+
+def owned_post_delete_stmt(post_id, author_id):
+    """DELETE of a live post, only if `author_id` wrote it. Returns the post id."""
+    return (
+        delete(Post)
+        .where(*owned_post(post_id, author_id))
+        .returning(Post.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def owned_post_hide_stmt(post_id, author_id):
+    """Marks a live post deleted, only if `author_id` wrote it. Returns the post id."""
+    return (
+        update(Post)
+        .where(*owned_post(post_id, author_id))
+        .values(deleted_at=func.now())
+        .returning(Post.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def comment_probe_query(post_id, threshold):
+    """At most threshold + 1 comment ids of a post: enough to tell a small thread from a large one."""
+    return select(Comment.id).where(Comment.post_id == post_id).limit(threshold + 1)
+
+
+def thread_delete_stmts(post_id):
+    """Set-based DELETEs of a post's hot and archived comments."""
+    return (
+        delete(Comment).where(Comment.post_id == post_id).execution_options(synchronize_session=False),
+        delete(CommentArchive).where(CommentArchive.post_id == post_id).execution_options(synchronize_session=False)
+    )
+
+
+def purge_batch_stmt(post_id, batch_size):
+    """DELETE of the next `batch_size` comments of a post being purged."""
+    batch_ids = (
+        select(Comment.id)
+        .where(Comment.post_id == post_id)
+        .limit(batch_size)
+        .scalar_subquery()
+    )
+    return delete(Comment).where(Comment.id.in_(batch_ids)).execution_options(synchronize_session=False)
+
+
+def purge_final_stmts(post_id):
+    """DELETEs finishing a purge once the hot comments are gone: the archive, then the post."""
+    return (
+        delete(CommentArchive).where(CommentArchive.post_id == post_id).execution_options(synchronize_session=False),
+        delete(Post).where(Post.id == post_id).execution_options(synchronize_session=False)
+    )
+
+
+def delete_post(post_id, author_id):
+    """
+    Deletes a post written by `author_id` and its comments without loading
+    any rows; the post itself is removed (or hidden) by one conditional
+    statement.
+
+    Small threads are removed inline with set-based DELETEs. Threads larger
+    than POST_PURGE_INLINE_THRESHOLD are hidden immediately (deleted_at is set)
+    and purged in bounded batches on a background thread. Runs on the shard
+    db.session is routed to.
+
+    Parameters:
+        post_id (int): ID of the post to delete
+        author_id (int): ID of the requesting user
+
+    Returns:
+        bool: True if the purge was scheduled in the background, False if done
+        inline, None if the user has no live post with that id (nothing changed)
+    """
+    threshold = current_app.config['POST_PURGE_INLINE_THRESHOLD']
+
+    # Probe at most threshold + 1 comment ids instead of counting the whole thread
+    probe = db.session.execute(comment_probe_query(post_id, threshold)).all()
+    inline = len(probe) <= threshold
+
+    statement = owned_post_delete_stmt if inline else owned_post_hide_stmt
+    if db.session.execute(statement(post_id, author_id)).first() is None:
+        db.session.rollback()
+        return None
+
+    # The post tombstone also stands for its comments in the change feed
+    record_change('post', post_id, DELETE)
+    record_count_change(POSTS, -1)  # The post leaves every listing right away
+
+    if inline:
+        for statement in thread_delete_stmts(post_id):
+            db.session.execute(statement)
+        forget_post(post_id)
+        db.session.commit()
+        logger.info(f"Post {post_id} and its comments deleted inline.")
+        return False
+
+    # Hidden right away; the heavy lifting happens in the background
+    db.session.commit()
+    logger.info(f"Post {post_id} marked deleted; scheduling background comment purge.")
+
+    run_in_background(purge_post, post_id, current_shard())
+    return True
+
+
+def purge_post(post_id, shard=DEFAULT_SHARD):
+    """
+    Deletes a post's comments in batches of POST_PURGE_BATCH_SIZE, committing
+    after each batch, and finally deletes the post row itself.
+
+    Parameters:
+        post_id (int): ID of the post to purge
+        shard (str): Shard holding the post
+
+    Returns:
+        int: Number of comments deleted
+    """
+    with use_shard(shard):
+        return _purge_post(post_id)
+
+
+def _purge_post(post_id):
+    batch_size = current_app.config['POST_PURGE_BATCH_SIZE']
+    total = 0
+
+    while True:
+        result = db.session.execute(purge_batch_stmt(post_id, batch_size))
+        db.session.commit()
+        total += result.rowcount
+        logger.debug(f"Purged {result.rowcount} comments from post {post_id}.")
+
+        if result.rowcount < batch_size:
+            break
+
+    for statement in purge_final_stmts(post_id):
+        db.session.execute(statement)
+    forget_post(post_id)
+    db.session.commit()
+    logger.info(f"Purge of post {post_id} completed: {total} comments deleted.")
+    return total
+
+
+def purge_deleted_posts():
+    """
+    Finishes purging every post still marked as deleted, on every shard,
+    e.g. after a worker was restarted in the middle of a background purge.
+
+    Returns:
+        int: Number of posts purged
+    """
+    total = 0
+    for shard in each_shard():
+        post_ids = db.session.execute(
+            select(Post.id).where(Post.deleted_at.is_not(None))
+        ).scalars().all()
+
+        for post_id in post_ids:
+            purge_post(post_id, shard)
+        total += len(post_ids)
+
+    logger.info(f"Purged {total} pending deleted post(s).")
+    return total
@@ -0,0 +1,109 @@
+from sqlalchemy import update, select, func, case
+from app.models.post import Post
+from app.models.comment import Comment
+from app.extensions import db
+from app.services.shard_service import each_shard
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+
+def comment_added_stmt(post_id, count=1):
+    """
+    UPDATE that accounts for `count` new comments on a post.
+    Statement builders are shared by the sync and async code paths. Stats
+    statements pin updated_at so its onupdate doesn't report a post edit.
+    """
+    return (
+        update(Post)
+        .where(Post.id == post_id)
+        .values(
+            comment_count=Post.comment_count + count,
+            last_comment_at=func.now(),
+            updated_at=Post.updated_at
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def comment_removed_stmt(post_id, deleted_created_at, count=1):
+    """
+    UPDATE that accounts for `count` deleted comments, the newest of which was
+    created at `deleted_created_at`. last_comment_at is only recomputed when
+    that was the latest comment of the post.
+    """
+    latest = (
+        select(func.max(Comment.created_at))
+        .where(Comment.post_id == post_id)
+        .scalar_subquery()
+    )
+    return (
+        update(Post)
+        .where(Post.id == post_id)
+        .values(
+            comment_count=case((Post.comment_count > count, Post.comment_count - count), else_=0),
+            last_comment_at=case(
+                (Post.last_comment_at <= deleted_created_at, latest),
+                else_=Post.last_comment_at
+            ),
+            updated_at=Post.updated_at
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def record_comment_added(post_id, count=1):
+    """
+    Increments a post's comment stats inside the current transaction.
+    Call before committing the comment insert so both land atomically.
+    """
+    db.session.execute(comment_added_stmt(post_id, count))
+
+
+def record_comment_removed(post_id, deleted_created_at, count=1):
+    """
+    Decrements a post's comment stats inside the current transaction.
+    Call after the comment DELETE and before committing.
+    """
+    db.session.execute(comment_removed_stmt(post_id, deleted_created_at, count))
+
+
+def repair_post_stats():
+    """
+    Recomputes comment_count and last_comment_at for every post in one
+    set-based UPDATE per shard.
+
+    Returns:
+        int: Number of posts updated
+    """
+    total = 0
+    for _ in each_shard():
+        total += _repair_shard_post_stats()
+
+    logger.info(f"Post stats repaired for {total} post(s).")
+    return total
+
+
+def _repair_shard_post_stats():
+    count_subquery = (
+        select(func.count(Comment.id))
+        .where(Comment.post_id == Post.id)
+        .scalar_subquery()
+    )
+    latest_subquery = (
+        select(func.max(Comment.created_at))
+        .where(Comment.post_id == Post.id)
+        .scalar_subquery()
+    )
+    result = db.session.execute(
+        update(Post)
+        .values(
+            comment_count=count_subquery,
+            last_comment_at=latest_subquery,
+            updated_at=Post.updated_at
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
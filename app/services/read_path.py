@@ -0,0 +1,69 @@
+from sqlalchemy import select, DateTime
+from app.models.post import Post
+from app.models.comment import Comment
+from app.schemas.post_schema import posts_schema
+from app.schemas.comment_schema import comments_schema
+from app.extensions import db
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+
+def schema_columns(schema, model):
+    """Columns of `model` for the fields a schema dumps, in the schema's order."""
+    return [model.__table__.c[name] for name in schema.dump_fields]
+
+
+class RowSerializer:
+    """
+    Dumps Core result rows to the same dicts as a marshmallow schema dumping
+    ORM instances, without building the instances: values are copied as they
+    come from the driver and only DateTime columns are converted (isoformat).
+    """
+
+    def __init__(self, columns):
+        self.keys = [column.key for column in columns]
+        self._datetimes = [i for i, column in enumerate(columns) if isinstance(column.type, DateTime)]
+
+    def dump(self, rows):
+        keys, datetimes = self.keys, self._datetimes
+        result = []
+        for row in rows:
+            values = list(row)
+            for i in datetimes:
+                if values[i] is not None:
+                    values[i] = values[i].isoformat()
+            result.append(dict(zip(keys, values)))
+        return result
+
+    def dump_row(self, row):
+        return self.dump([row])[0]
+
+
+post_rows = RowSerializer(schema_columns(posts_schema, Post))
+comment_rows = RowSerializer(schema_columns(comments_schema, Comment))
+
+
+def post_columns():
+    """Columns PostSchema dumps."""
+    return schema_columns(posts_schema, Post)
+
+
+def post_list_query():
+    """Live posts, as rows of the columns PostSchema dumps."""
+    return select(*post_columns()).where(Post.deleted_at.is_(None))
+
+
+def comment_columns(model=Comment):
+    """Columns CommentSchema dumps, from the hot table or the archive."""
+    return schema_columns(comments_schema, model)
+
+
+def read_rows(query):
+    """
+    Runs a SELECT on the session's connection as plain Core: rows come back
+    as tuples, with no ORM instances and no identity map bookkeeping. The
+    connection is the one of the shard the session is routed to.
+    """
+    return db.session.connection(bind_arguments={"clause": query}).execute(query).all()
@@ -0,0 +1,384 @@
+import hashlib
+from contextlib import contextmanager
+import sqlalchemy as sa
+from sqlalchemy import select, insert, update, delete, func, literal, union_all
+from sqlalchemy.schema import CreateTable, CreateIndex
+from app.models.post import Post
+from app.models.comment import Comment
+from app.models.comment_archive import CommentArchive
+from app.models.shard_directory import PostShard, CommentShard
+from app.extensions import db
+from app.utils.sharding import DEFAULT_SHARD, SHARDED_TABLES, get_shard_engines, shard_names, sharding_enabled
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# Sharded models in the order their rows are copied (parents first)
+SHARDED_MODELS = (Post, Comment, CommentArchive)
+
+# Moves the directory's id sequences past the ids already used on the main database (PostgreSQL)
+SEQUENCE_SYNC_SQL = {
+    'post_shards': "SELECT setval(pg_get_serial_sequence('post_shards', 'post_id'), GREATEST("
+                   "(SELECT COALESCE(MAX(post_id), 0) FROM post_shards), "
+                   "(SELECT COALESCE(MAX(id), 0) FROM posts)) + 1, false)",
+    'comment_shards': "SELECT setval(pg_get_serial_sequence('comment_shards', 'comment_id'), GREATEST("
+                      "(SELECT COALESCE(MAX(comment_id), 0) FROM comment_shards), "
+                      "(SELECT COALESCE(MAX(id), 0) FROM comments), "
+                      "(SELECT COALESCE(MAX(id), 0) FROM comments_archive)) + 1, false)",
+}
+
+
+@contextmanager
+def use_shard(shard):
+    """Routes the sharded tables of db.session to `shard` inside the block."""
+    info = db.session.info
+    previous = info.get('shard', DEFAULT_SHARD)
+    info['shard'] = shard
+    try:
+        yield shard
+    finally:
+        info['shard'] = previous
+
+
+def current_shard():
+    return db.session.info.get('shard', DEFAULT_SHARD)
+
+
+def shard_engine(shard):
+    return db.engine if shard == DEFAULT_SHARD else get_shard_engines()[shard]
+
+
+def all_shard_engines():
+    """Engines of every shard, the main database first."""
+    return [shard_engine(shard) for shard in shard_names()]
+
+
+def each_shard():
+    """Yields every shard name, with db.session routed to it while the caller's loop body runs."""
+    for shard in shard_names():
+        with use_shard(shard):
+            yield shard
+
+
+def on_each_shard(fn, *args, **kwargs):
+    """Calls `fn` once per shard with db.session routed to it; returns the results in shard order."""
+    return [fn(*args, **kwargs) for _ in each_shard()]
+
+
+def merge_rows(results, key=lambda row: row.id, reverse=False):
+    """
+    Merges per-shard result lists into one list ordered by `key`. A row
+    found on two shards (a post in the middle of a move) is returned once.
+    """
+    if len(results) == 1:
+        return results[0]
+
+    merged = {}
+    for rows in results:
+        for row in rows:
+            merged.setdefault(key(row), row)
+    return sorted(merged.values(), key=key, reverse=reverse)
+
+
+def place_author(author_id, shards=None):
+    """
+    Shard for an author's posts, by rendezvous hashing: the shard with the
+    highest hash of (shard, author) wins. Adding a shard only moves the
+    authors the new shard wins; removing one only moves its own authors.
+    """
+    shards = shards or shard_names()
+    return max(shards, key=lambda shard: hashlib.blake2b(f"{shard}:{author_id}".encode(), digest_size=8).digest())
+
+
+def allocate_post(author_id):
+    """
+    Picks the shard for a new post and reserves its id in the directory, in
+    the current transaction.
+
+    Returns:
+        tuple: (post id, shard); (None, DEFAULT_SHARD) without sharding, where
+        the posts table assigns the id as before
+    """
+    if not sharding_enabled():
+        return None, DEFAULT_SHARD
+
+    shard = place_author(author_id)
+    post_id = db.session.execute(
+        insert(PostShard).values(author_id=author_id, shard=shard).returning(PostShard.post_id)
+    ).scalar_one()
+    return post_id, shard
+
+
+def allocate_comment(post_id):
+    """Reserves the id of a new comment on `post_id`; None without sharding."""
+    if not sharding_enabled():
+        return None
+    return db.session.execute(
+        insert(CommentShard).values(post_id=post_id).returning(CommentShard.comment_id)
+    ).scalar_one()
+
+
+def post_shard_query(post_id):
+    return select(PostShard.shard).where(PostShard.post_id == post_id)
+
+
+def comment_shard_query(comment_id):
+    return (
+        select(PostShard.shard)
+        .join(CommentShard, CommentShard.post_id == PostShard.post_id)
+        .where(CommentShard.comment_id == comment_id)
+    )
+
+
+def _lookup_shard(query, for_write):
+    if not sharding_enabled():
+        return DEFAULT_SHARD
+    if for_write:
+        # Held until commit; a rebalance moving the post waits for this write and vice versa
+        query = query.with_for_update(read=True, of=PostShard)
+    return db.session.execute(query).scalar()
+
+
+def post_shard(post_id, for_write=False):
+    """Shard holding a post, or None if the directory does not know it."""
+    return _lookup_shard(post_shard_query(post_id), for_write)
+
+
+def comment_shard(comment_id, for_write=False):
+    """Shard holding a comment (the shard of its post), or None if unknown."""
+    return _lookup_shard(comment_shard_query(comment_id), for_write)
+
+
+def forget_post(post_id):
+    """Drops the directory entries of a deleted post and its comments. Does not commit."""
+    if sharding_enabled():
+        db.session.execute(delete(CommentShard).where(CommentShard.post_id == post_id))
+        db.session.execute(delete(PostShard).where(PostShard.post_id == post_id))
+
+
+def forget_comments(comment_ids):
+    """Drops the directory entries of deleted comments. Does not commit."""
+    if sharding_enabled() and comment_ids:
+        db.session.execute(delete(CommentShard).where(CommentShard.comment_id.in_(comment_ids)))
+
+
+def create_shard_tables(engine):
+    """
+    Creates the sharded tables on a shard database. Foreign keys to tables
+    that stay on the main database (users) are left out.
+    """
+    existing = set(sa.inspect(engine).get_table_names())
+    with engine.begin() as conn:
+        for model in SHARDED_MODELS:
+            table = model.__table__
+            if table.name in existing:
+                continue
+            local_keys = [key for key in table.foreign_key_constraints if key.referred_table.name in SHARDED_TABLES]
+            conn.execute(CreateTable(table, include_foreign_key_constraints=local_keys))
+            for index in table.indexes:
+                conn.execute(CreateIndex(index))
+            logger.info(f"Created table {table.name} on {engine.url.render_as_string(hide_password=True)}")
+
+
+def register_local_posts():
+    """
+    Adds directory entries for posts and comments on the main database that
+    have none yet (written before sharding was enabled, or imported).
+    Does not commit.
+
+    Returns:
+        tuple: (posts registered, comments registered)
+    """
+    unregistered_posts = (
+        select(Post.id, Post.author_id, literal(DEFAULT_SHARD))
+        .where(~select(PostShard.post_id).where(PostShard.post_id == Post.id).exists())
+    )
+    posts = db.session.execute(
+        insert(PostShard).from_select(['post_id', 'author_id', 'shard'], unregistered_posts)
+    ).rowcount
+
+    comments = union_all(*(
+        select(model.id, model.post_id)
+        .where(~select(CommentShard.comment_id).where(CommentShard.comment_id == model.id).exists())
+        for model in (Comment, CommentArchive)
+    ))
+    comment_count = db.session.execute(
+        insert(CommentShard).from_select(['comment_id', 'post_id'], comments)
+    ).rowcount
+
+    if db.session.get_bind().dialect.name == 'postgresql':
+        for sql in SEQUENCE_SYNC_SQL.values():
+            db.session.connection().exec_driver_sql(sql)
+
+    return posts, comment_count
+
+
+def init_shards():
+    """
+    Prepares sharding: creates the sharded tables on every extra shard and
+    registers the posts already on the main database in the directory.
+
+    Returns:
+        tuple: (posts registered, comments registered)
+    """
+    for engine in get_shard_engines().values():
+        create_shard_tables(engine)
+
+    with use_shard(DEFAULT_SHARD):
+        counts = register_local_posts()
+        db.session.commit()
+
+    logger.info(f"Shards ready: {', '.join(shard_names())}; registered {counts[0]} post(s), "
+                f"{counts[1]} comment(s) of the main database.")
+    return counts
+
+
+def shard_counts():
+    """Posts per shard, from the directory."""
+    counts = dict.fromkeys(shard_names(), 0)
+    counts.update(db.session.execute(
+        select(PostShard.shard, func.count()).group_by(PostShard.shard)
+    ).all())
+    return counts
+
+
+def _post_filter(model, post_ids):
+    column = model.__table__.c.id if model is Post else model.__table__.c.post_id
+    return column.in_(post_ids)
+
+
+def _delete_posts(conn, post_ids):
+    for model in reversed(SHARDED_MODELS):
+        conn.execute(delete(model.__table__).where(_post_filter(model, post_ids)))
+
+
+def move_posts(post_ids, source, target):
+    """
+    Moves posts and their comments from shard `source` to shard `target`:
+
+    1. lock the directory entries (writers of these posts wait, see post_shard),
+    2. copy the rows to the target and commit there,
+    3. point the entries at the target and commit,
+    4. delete the rows from the source.
+
+    A failure between steps leaves copies on one of the shards that
+    remove_strays() deletes; until then lists return them once (merge_rows).
+
+    Returns:
+        int: Number of posts moved
+    """
+    post_ids = db.session.execute(
+        select(PostShard.post_id)
+        .where(PostShard.post_id.in_(post_ids), PostShard.shard == source)
+        .with_for_update()
+    ).scalars().all()
+    if not post_ids:
+        db.session.rollback()
+        return 0
+
+    source_engine, target_engine = shard_engine(source), shard_engine(target)
+    with source_engine.connect() as src, target_engine.begin() as dst:
+        for model in SHARDED_MODELS:
+            table = model.__table__
+            rows = src.execute(select(table).where(_post_filter(model, post_ids)).order_by(table.c.id)).mappings().all()
+            if rows:
+                dst.execute(insert(table), [dict(row) for row in rows])
+
+    db.session.execute(update(PostShard).where(PostShard.post_id.in_(post_ids)).values(shard=target))
+    db.session.commit()
+
+    with source_engine.begin() as src:
+        _delete_posts(src, post_ids)
+
+    logger.info(f"Moved {len(post_ids)} post(s) from shard {source} to {target}.")
+    return len(post_ids)
+
+
+def remove_strays(batch_size):
+    """
+    Deletes posts (with their comments) found on a shard other than the one
+    their directory entry names: leftovers of an interrupted move. Posts
+    without an entry are kept.
+
+    Returns:
+        int: Number of posts removed
+    """
+    removed = 0
+    for shard in shard_names():
+        engine, after = shard_engine(shard), 0
+        while True:
+            with engine.connect() as conn:
+                post_ids = conn.execute(
+                    select(Post.__table__.c.id).where(Post.__table__.c.id > after)
+                    .order_by(Post.__table__.c.id).limit(batch_size)
+                ).scalars().all()
+            if not post_ids:
+                break
+            after = post_ids[-1]
+
+            owners = dict(db.session.execute(
+                select(PostShard.post_id, PostShard.shard).where(PostShard.post_id.in_(post_ids))
+            ).all())
+            db.session.rollback()
+
+            strays = [post_id for post_id in post_ids if owners.get(post_id, shard) != shard]
+            if strays:
+                with engine.begin() as conn:
+                    _delete_posts(conn, strays)
+                removed += len(strays)
+                logger.warning(f"Removed {len(strays)} stray post copies from shard {shard}.")
+
+    return removed
+
+
+def directory_page_query(after, limit):
+    return (
+        select(PostShard.post_id, PostShard.author_id, PostShard.shard)
+        .where(PostShard.post_id > after)
+        .order_by(PostShard.post_id)
+        .limit(limit)
+    )
+
+
+def plan_moves(rows, shards):
+    """Directory rows whose author is now placed elsewhere, as {(source, target): [post_id, ...]}."""
+    moves = {}
+    for post_id, author_id, shard in rows:
+        target = place_author(author_id, shards)
+        if target != shard:
+            moves.setdefault((shard, target), []).append(post_id)
+    return moves
+
+
+def rebalance(batch_size, dry_run=False):
+    """
+    Moves every post (with its comments) to the shard its author is placed
+    on, e.g. after SHARD_BINDS gained or lost a shard, `batch_size` posts per
+    move. Leftovers of interrupted moves are removed first. Run one
+    rebalance at a time.
+
+    Returns:
+        dict: {"source->target": posts moved (or to move, with dry_run)}
+    """
+    shards = shard_names()
+    if not dry_run:
+        remove_strays(batch_size)
+
+    moved, after = {}, 0
+    while True:
+        rows = db.session.execute(directory_page_query(after, batch_size)).all()
+        db.session.rollback()
+        if not rows:
+            break
+        after = rows[-1].post_id
+
+        for (source, target), post_ids in plan_moves(rows, shards).items():
+            if source not in shards:
+                logger.error(f"{len(post_ids)} post(s) are on unknown shard {source}; add it back to SHARD_BINDS.")
+                continue
+            count = len(post_ids) if dry_run else move_posts(post_ids, source, target)
+            moved[f"{source}->{target}"] = moved.get(f"{source}->{target}", 0) + count
+
+    logger.info(f"Rebalance {'planned' if dry_run else 'finished'}: {moved or 'nothing to move'}.")
+    return moved
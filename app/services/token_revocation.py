@@ -0,0 +1,146 @@
+import threading
+import time
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from app.models.revoked_token import RevokedToken
+from app.extensions import db
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# Rows re-read on every sync, covering ids whose transactions committed out of order
+SYNC_OVERLAP_ROWS = 100
+
+
+def _utcnow():
+    """Naive UTC timestamp, matching the DateTime columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class RevocationStore:
+    """
+    In-memory set of revoked token ids (jti) backed by the revoked_tokens table.
+
+    Membership checks are O(1) dictionary lookups. The store pulls rows revoked
+    by other workers incrementally (WHERE id > last seen id) at most once per
+    `sync_interval` seconds, and forgets entries once their tokens have expired.
+    """
+
+    def __init__(self, sync_interval):
+        self.sync_interval = sync_interval
+        self._revoked = {}              # jti -> expires_at
+        self._last_id = 0               # Highest revoked_tokens.id applied
+        self._next_sync = 0.0           # time.monotonic() deadline for the next sync
+        self._next_prune = 0.0
+        self._lock = threading.Lock()
+
+    def needs_sync(self):
+        return time.monotonic() >= self._next_sync
+
+    def sync_query(self):
+        """Statement returning rows revoked since the last sync that are still live."""
+        return (
+            select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+            .where(RevokedToken.id > self._last_id - SYNC_OVERLAP_ROWS,
+                   RevokedToken.expires_at > _utcnow())
+            .order_by(RevokedToken.id)
+        )
+
+    def apply(self, rows):
+        """Merges rows returned by sync_query() into the in-memory set."""
+        now = _utcnow()
+        with self._lock:
+            for row in rows:
+                if row.expires_at > now:
+                    self._revoked[row.jti] = row.expires_at
+                self._last_id = max(self._last_id, row.id)
+            self._next_sync = time.monotonic() + self.sync_interval
+
+            # Drop expired entries at most once per minute
+            if time.monotonic() >= self._next_prune:
+                expired = [jti for jti, expires_at in self._revoked.items() if expires_at <= now]
+                for jti in expired:
+                    del self._revoked[jti]
+                self._next_prune = time.monotonic() + 60
+                if expired:
+                    logger.debug(f"Pruned {len(expired)} expired revocation(s) from memory.")
+
+    def add(self, jti, expires_at):
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def __contains__(self, jti):
+        return jti in self._revoked
+
+    def __len__(self):
+        return len(self._revoked)
+
+
+def get_revocation_store(app=None):
+    """
+    Returns the revocation store of the given (or current) app, creating it on first use.
+    """
+    app = app or current_app._get_current_object()
+    store = app.extensions.get('token_revocation')
+
+    if store is None:
+        store = RevocationStore(sync_interval=app.config['TOKEN_REVOCATION_SYNC_INTERVAL'])
+        app.extensions['token_revocation'] = store
+
+    return store
+
+
+def is_token_revoked(jti):
+    """
+    Checks whether a token id has been revoked, syncing incrementally if due.
+
+    Parameters:
+        jti (str): JWT ID claim of the token
+
+    Returns:
+        bool: True if the token is revoked
+    """
+    store = get_revocation_store()
+
+    if store.needs_sync():
+        store.apply(db.session.execute(store.sync_query()).all())
+
+    return jti in store
+
+
+def revoke_token(jti, expires_at):
+    """
+    Revokes a token until it expires.
+
+    Parameters:
+        jti (str): JWT ID claim of the token
+        expires_at (datetime): Token expiry (naive UTC)
+    """
+    try:
+        db.session.add(RevokedToken(jti=jti, expires_at=expires_at))
+        db.session.commit()
+        logger.info(f"Token revoked: {jti}")
+    except IntegrityError:
+        db.session.rollback()
+        logger.debug(f"Token already revoked: {jti}")
+
+    # Visible to this worker immediately; others pick it up on their next sync
+    get_revocation_store().add(jti, expires_at)
+
+
+def purge_expired_revocations():
+    """
+    Deletes revocation rows whose tokens have expired.
+
+    Returns:
+        int: Number of rows deleted
+    """
+    result = db.session.execute(
+        delete(RevokedToken).where(RevokedToken.expires_at <= _utcnow())
+    )
+    db.session.commit()
+    logger.info(f"Purged {result.rowcount} expired token revocation(s).")
+    return result.rowcount
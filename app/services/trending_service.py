@@ -0,0 +1,341 @@
+import math
+import threading
+import time
+from flask import current_app
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from app.models.post import Post
+from app.models.trending_score import TrendingScore
+from app.extensions import db
+from app.schemas.post_schema import posts_schema
+from app.utils.background import run_in_background
+from app.utils.sharding import sharding_enabled
+from app.services.shard_service import on_each_shard, merge_rows
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# Fixed reference time for normalized score keys (2025-01-01T00:00:00Z)
+SCORE_EPOCH = 1735689600.0
+
+
+class TrendingAggregator:
+    """
+    Incremental, time-decayed comment activity aggregator for one worker.
+
+    Every comment adds weight 1 (a deletion subtracts 1) that decays with the
+    configured half-life. Because all scores decay at the same rate, a score
+    can be stored as key = log(score) + rate * (t - epoch), which never needs
+    a decay pass and sorts like the current score.
+
+    Deltas are buffered in memory and merged into the trending_scores table
+    every `interval` seconds, by a timer and by reads of the trending
+    endpoint, so a last burst of activity and the pruning of decayed rows do
+    not wait for the next comment. The top posts are then re-read into a
+    snapshot that the trending endpoint serves without touching the database.
+    """
+
+    def __init__(self, half_life_seconds, interval, size, min_score):
+        self.rate = math.log(2) / half_life_seconds
+        self.interval = interval
+        self.size = size
+        self.min_score = min_score
+        self._pending = {}              # post_id -> sum of weight * exp(rate * (t - base))
+        self._base = time.time()        # Time the pending weights are normalized to
+        self._snapshot = []             # Serialized top posts with scores
+        self._next_flush = 0.0
+        self._next_refresh = 0.0
+        self._flushing = False
+        self._flusher_started = False
+        self._lock = threading.Lock()
+
+    def key_at(self, linear_score, at):
+        """Converts a linear score at time `at` to a normalized key."""
+        return math.log(linear_score) + self.rate * (at - SCORE_EPOCH)
+
+    def score_at(self, key, at):
+        """Converts a normalized key back to the linear score at time `at`."""
+        return math.exp(key - self.rate * (at - SCORE_EPOCH))
+
+    def record(self, post_id, weight=1.0):
+        """
+        Records activity for a post. O(1); never touches the database.
+
+        Returns:
+            bool: True if a flush to the database is due (see claim_flush)
+        """
+        now = time.time()
+        with self._lock:
+            self._pending[post_id] = self._pending.get(post_id, 0.0) + weight * math.exp(self.rate * (now - self._base))
+        return self.claim_flush()
+
+    def claim_flush(self):
+        """
+        True for the one caller that should flush now: `interval` seconds have
+        passed since the last flush and none is running. A flush is due even
+        with nothing pending, since it also prunes decayed rows.
+        """
+        with self._lock:
+            if self._flushing or time.time() < self._next_flush:
+                return False
+            self._flushing = True
+            return True
+
+    def claim_flusher(self):
+        """True exactly once per aggregator, for the caller that should start the flush timer."""
+        with self._lock:
+            if self._flusher_started:
+                return False
+            self._flusher_started = True
+            return True
+
+    def has_pending(self):
+        with self._lock:
+            return bool(self._pending)
+
+    def take_pending(self):
+        """Swaps out the buffered deltas for flushing."""
+        with self._lock:
+            pending, base = self._pending, self._base
+            self._pending, self._base = {}, time.time()
+            return pending, base
+
+    def finish_flush(self):
+        with self._lock:
+            self._flushing = False
+            self._next_flush = time.time() + self.interval
+            self._next_refresh = 0.0  # Refresh the snapshot on the next read
+
+    def snapshot_due(self):
+        return time.monotonic() >= self._next_refresh
+
+    def set_snapshot(self, snapshot):
+        with self._lock:
+            self._snapshot = snapshot
+            self._next_refresh = time.monotonic() + self.interval
+
+    def snapshot(self, limit):
+        return self._snapshot[:limit]
+
+
+def get_trending_aggregator(app=None):
+    """
+    Returns the trending aggregator of the given (or current) app, creating it on first use.
+    """
+    app = app or current_app._get_current_object()
+    aggregator = app.extensions.get('trending')
+
+    if aggregator is None:
+        aggregator = TrendingAggregator(
+            half_life_seconds=app.config['TRENDING_HALF_LIFE_HOURS'] * 3600,
+            interval=app.config['TRENDING_MATERIALIZE_INTERVAL'],
+            size=app.config['TRENDING_SIZE'],
+            min_score=app.config['TRENDING_MIN_SCORE']
+        )
+        app.extensions['trending'] = aggregator
+
+    return aggregator
+
+
+def record_comment_activity(post_id, weight=1.0):
+    """
+    Feeds a comment creation (+1) or deletion (-1) into the aggregator and
+    schedules a materialization in the background when one is due.
+    """
+    app = current_app._get_current_object()
+    aggregator = get_trending_aggregator()
+
+    if not app.config.get('BACKGROUND_TASKS_EAGER') and aggregator.claim_flusher():
+        start_flusher(aggregator, app)
+    if aggregator.record(int(post_id), weight):
+        run_in_background(materialize_trending)
+
+
+def start_flusher(aggregator, app):
+    """
+    Starts the thread that materializes this worker's activity every interval,
+    so buffered deltas are written even if no further comment arrives.
+    """
+    def run():
+        while True:
+            time.sleep(max(aggregator.interval, 1.0))
+            if not aggregator.claim_flush():
+                continue
+            with app.app_context():
+                try:
+                    materialize_trending()
+                except Exception:
+                    pass  # Logged by materialize_trending; retried next interval
+                finally:
+                    db.session.remove()
+
+    threading.Thread(target=run, name='trending-flusher', daemon=True).start()
+    logger.info(f"Trending flusher started (interval={aggregator.interval}s).")
+
+
+def flush_trending(app):
+    """
+    Writes out the activity still buffered in this worker, e.g. before it exits.
+    """
+    aggregator = app.extensions.get('trending')
+    if aggregator is None or not aggregator.has_pending():
+        return
+
+    with app.app_context():
+        try:
+            materialize_trending()
+        except Exception:
+            pass  # Already logged; the deltas are lost with the worker
+        finally:
+            db.session.remove()
+
+
+def pending_scores_query(post_ids):
+    """Stored scores of the posts with buffered deltas, locked for the merge."""
+    return select(TrendingScore).where(TrendingScore.post_id.in_(post_ids)).with_for_update()
+
+
+def prune_stmt(aggregator):
+    """Deletes the rows whose current score fell below TRENDING_MIN_SCORE."""
+    cutoff = aggregator.key_at(aggregator.min_score, time.time())
+    return delete(TrendingScore).where(TrendingScore.score_key < cutoff)
+
+
+def merge_pending_rows(aggregator, rows, pending, base):
+    """
+    Adds buffered deltas to the stored score rows in place.
+
+    Returns:
+        tuple: (new TrendingScore rows to add, rows to delete)
+    """
+    existing = {row.post_id: row for row in rows}
+    added, removed = [], []
+
+    for post_id, delta in pending.items():
+        row = existing.get(post_id)
+        linear = delta + (aggregator.score_at(row.score_key, base) if row else 0.0)
+
+        if linear <= aggregator.min_score:
+            if row:
+                removed.append(row)
+            continue
+
+        key = aggregator.key_at(linear, base)
+        if row:
+            row.score_key = key
+        else:
+            added.append(TrendingScore(post_id=post_id, score_key=key))
+
+    return added, removed
+
+
+def materialize_trending():
+    """
+    Merges this worker's buffered activity into the trending_scores table and
+    prunes posts whose score has decayed below TRENDING_MIN_SCORE.
+
+    Returns:
+        int: Number of posts updated
+    """
+    aggregator = get_trending_aggregator()
+    pending, base = aggregator.take_pending()
+
+    try:
+        if pending:
+            for attempt in range(2):
+                try:
+                    _merge_pending(aggregator, pending, base)
+                    break
+                except IntegrityError:
+                    # Another worker inserted the same post concurrently; merge again
+                    db.session.rollback()
+                    if attempt:
+                        raise
+
+        db.session.execute(prune_stmt(aggregator))
+        db.session.commit()
+
+        logger.debug(f"Trending scores materialized for {len(pending)} post(s).")
+        return len(pending)
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to materialize trending scores: {e}")
+        raise
+    finally:
+        aggregator.finish_flush()
+
+
+def _merge_pending(aggregator, pending, base):
+    """Adds buffered deltas to the stored scores in one transaction."""
+    rows = db.session.execute(pending_scores_query(pending.keys())).scalars().all()
+    added, removed = merge_pending_rows(aggregator, rows, pending, base)
+
+    for row in removed:
+        db.session.delete(row)
+    db.session.add_all(added)
+    db.session.commit()
+
+
+def top_posts_query(size):
+    """(post, score key) rows of the top live posts, without sharding."""
+    return (
+        select(Post, TrendingScore.score_key)
+        .join(TrendingScore, TrendingScore.post_id == Post.id)
+        .where(Post.deleted_at.is_(None))
+        .order_by(TrendingScore.score_key.desc())
+        .limit(size)
+    )
+
+
+def build_snapshot(aggregator, rows):
+    """Serializes (post, score key) rows, each with its current "trending_score"."""
+    now = time.time()
+    posts = posts_schema.dump([post for post, _ in rows])
+    for post, (_, key) in zip(posts, rows):
+        post['trending_score'] = round(aggregator.score_at(key, now), 4)
+    return posts
+
+
+def get_trending_posts(limit):
+    """
+    Returns the top trending posts from the in-memory snapshot, re-reading the
+    materialized table at most once per TRENDING_MATERIALIZE_INTERVAL.
+
+    Parameters:
+        limit (int): Maximum number of posts to return
+
+    Returns:
+        list: Serialized posts, each with a "trending_score"
+    """
+    aggregator = get_trending_aggregator()
+
+    # Reads keep scores fresh on a quiet system: write out due deltas and prune decayed rows
+    if aggregator.claim_flush():
+        run_in_background(materialize_trending)
+
+    if aggregator.snapshot_due():
+        posts = build_snapshot(aggregator, _top_posts(aggregator.size))
+        aggregator.set_snapshot(posts)
+        logger.debug(f"Trending snapshot refreshed with {len(posts)} post(s).")
+
+    return aggregator.snapshot(limit)
+
+
+def _top_posts(size):
+    """
+    (post, score key) pairs of the top live posts. Scores stay on the main
+    database; with sharding the posts are then read by id from every shard.
+    """
+    if not sharding_enabled():
+        return db.session.execute(top_posts_query(size)).all()
+
+    scores = db.session.execute(
+        select(TrendingScore.post_id, TrendingScore.score_key)
+        .order_by(TrendingScore.score_key.desc())
+        .limit(size)
+    ).all()
+    live = select(Post).where(Post.id.in_([post_id for post_id, _ in scores]), Post.deleted_at.is_(None))
+    posts = {post.id: post for post in merge_rows(on_each_shard(lambda: db.session.execute(live).scalars().all()))}
+    return [(posts[post_id], key) for post_id, key in scores if post_id in posts]
@@ -0,0 +1,203 @@
+import threading
+import time
+from flask import request, jsonify, g
+from sqlalchemy import event
+from app.services.shard_service import all_shard_engines
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# Endpoints that must stay reachable under overload or hold their slot for a long time
+EXEMPT_ENDPOINTS = {'comments.stream_comments', 'metrics.get_metrics'}
+
+# Weight of the newest sample in the smoothed DB latency
+LATENCY_SMOOTHING = 0.2
+
+
+class AdmissionController:
+    """
+    Per-process concurrency limits for the auth, read and write endpoint classes.
+
+    A request that finds its class at the limit is rejected immediately
+    instead of queueing for a database connection. Limits adapt to the
+    smoothed DB latency, the larger of the time spent waiting for a pooled
+    connection (where saturation shows first) and the time spent executing
+    statements: above the target every limit is cut by 10%, below half the
+    target it grows back by one, at most once per `adjust_interval`, between
+    `min_limit` and the configured maximum.
+    """
+
+    def __init__(self, limits, min_limit, target_latency, retry_after, adjust_interval=1.0):
+        self.max_limits = dict(limits)
+        self.limits = dict(limits)
+        self.min_limit = min_limit
+        self.target_latency = target_latency
+        self.retry_after = retry_after
+        self.adjust_interval = adjust_interval
+        self.in_flight = {name: 0 for name in limits}
+        self.admitted = {name: 0 for name in limits}
+        self.shed = {name: 0 for name in limits}
+        self.db_latency = 0.0
+        self.checkout_wait = 0.0
+        self.decreases = 0
+        self._next_adjust = 0.0
+        self._lock = threading.Lock()
+
+    def classify(self, path, blueprint, endpoint, method):
+        """Endpoint class of a request, or None if it is not subject to admission control."""
+        if not path.startswith('/api/') or endpoint in EXEMPT_ENDPOINTS:
+            return None
+        if method in ('GET', 'HEAD', 'OPTIONS'):
+            return 'read'
+        return 'auth' if blueprint == 'auth' else 'write'
+
+    def try_acquire(self, name):
+        with self._lock:
+            if self.in_flight[name] >= self.limits[name]:
+                self.shed[name] += 1
+                return False
+            self.in_flight[name] += 1
+            self.admitted[name] += 1
+            return True
+
+    def release(self, name):
+        with self._lock:
+            self.in_flight[name] -= 1
+
+    def observe_db_latency(self, seconds):
+        """Feeds one statement's execution time into the smoothed latency."""
+        with self._lock:
+            self.db_latency += LATENCY_SMOOTHING * (seconds - self.db_latency)
+            self._adjust()
+
+    def observe_checkout_wait(self, seconds):
+        """Feeds the time one connection checkout waited on the pool into the smoothed wait."""
+        with self._lock:
+            self.checkout_wait += LATENCY_SMOOTHING * (seconds - self.checkout_wait)
+            self._adjust()
+
+    def _adjust(self):
+        """Moves the limits toward the target latency; called with the lock held."""
+        now = time.monotonic()
+        if now < self._next_adjust:
+            return
+        self._next_adjust = now + self.adjust_interval
+
+        latency = max(self.db_latency, self.checkout_wait)
+        if latency > self.target_latency:
+            for name, limit in self.limits.items():
+                self.limits[name] = max(self.min_limit, int(limit * 0.9))
+            self.decreases += 1
+            logger.warning(f"DB latency {latency * 1000:.1f}ms above target; "
+                           f"admission limits lowered to {self.limits}")
+        elif latency < self.target_latency / 2:
+            for name, limit in self.limits.items():
+                self.limits[name] = min(self.max_limits[name], limit + 1)
+
+    def snapshot(self):
+        """Current limits and shedding counters, for metrics."""
+        with self._lock:
+            return {
+                'db_latency_ms': round(self.db_latency * 1000, 3),
+                'checkout_wait_ms': round(self.checkout_wait * 1000, 3),
+                'target_db_latency_ms': self.target_latency * 1000,
+                'limit_decreases': self.decreases,
+                'classes': {
+                    name: {
+                        'limit': self.limits[name],
+                        'max_limit': self.max_limits[name],
+                        'in_flight': self.in_flight[name],
+                        'admitted': self.admitted[name],
+                        'shed': self.shed[name],
+                    }
+                    for name in self.limits
+                }
+            }
+
+
+def init_admission_control(app):
+    """
+    Registers admission control on a Flask app: request hooks that admit or
+    shed requests, and hooks on the engine of every shard that time
+    connection checkouts and statements.
+    """
+    controller = AdmissionController(
+        limits={
+            'auth': app.config['ADMISSION_AUTH_LIMIT'],
+            'read': app.config['ADMISSION_READ_LIMIT'],
+            'write': app.config['ADMISSION_WRITE_LIMIT'],
+        },
+        min_limit=app.config['ADMISSION_MIN_LIMIT'],
+        target_latency=app.config['ADMISSION_TARGET_DB_LATENCY_MS'] / 1000.0,
+        retry_after=app.config['ADMISSION_RETRY_AFTER']
+    )
+    app.extensions['admission'] = controller
+
+    @app.before_request
+    def admit_request():
+        name = controller.classify(request.path, request.blueprint, request.endpoint, request.method)
+        if name is None:
+            return None
+
+        if not controller.try_acquire(name):
+            logger.debug(f"Shedding {name} request {request.method} {request.path}")
+            response = jsonify({"error": "Server is busy, please retry later."})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(controller.retry_after)
+            return response
+
+        g.admission_class = name
+        return None
+
+    @app.teardown_request
+    def release_request(exc):
+        name = g.pop('admission_class', None)
+        if name is not None:
+            controller.release(name)
+
+    with app.app_context():
+        engines = all_shard_engines()
+    for engine in engines:
+        instrument_engine(engine, controller)
+
+    logger.info(f"Admission control enabled with limits {controller.limits}")
+    return controller
+
+
+def instrument_engine(engine, controller):
+    """
+    Times connection checkouts and statement execution on an engine.
+
+    The pool has no event before a checkout, so the engine's raw_connection()
+    is wrapped; the engine keeps the wrapper when dispose() replaces its pool.
+    Instrumenting an engine twice is a no-op.
+    """
+    checkout = engine.raw_connection
+    if getattr(checkout, 'admission_controller', None) is controller:
+        return
+
+    def timed_checkout():
+        started = time.perf_counter()
+        try:
+            return checkout()
+        finally:
+            controller.observe_checkout_wait(time.perf_counter() - started)
+
+    timed_checkout.admission_controller = controller
+    engine.raw_connection = timed_checkout
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info['admission_query_start'] = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop('admission_query_start', None)
+        if started is not None:
+            controller.observe_db_latency(time.perf_counter() - started)
+
+
+def get_admission_controller(app):
+    """Returns the app's admission controller, or None if admission control is disabled."""
+    return app.extensions.get('admission')
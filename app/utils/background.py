@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# Lazily created so that a preloading master process never owns worker threads
+_executor = None
+
+
+def _get_executor():
+    """
+    Returns the shared background executor, creating it on first use.
+    """
+    global _executor
+    if _executor is None:
+        max_workers = current_app.config.get('BACKGROUND_WORKERS', 2)
+        _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='background')
+        logger.info(f"Background executor started with {max_workers} worker(s).")
+    return _executor
+
+
+def run_in_background(fn, *args, **kwargs):
+    """
+    Runs `fn(*args, **kwargs)` on a background thread inside an application context.
+
+    When BACKGROUND_TASKS_EAGER is enabled (e.g. in tests), the task runs inline
+    and its result is returned directly.
+
+    Returns:
+        Future or task result: The submitted future, or the result when eager
+    """
+    app = current_app._get_current_object()
+
+    if app.config.get('BACKGROUND_TASKS_EAGER'):
+        logger.debug(f"Running background task {fn.__name__} eagerly.")
+        return fn(*args, **kwargs)
+
+    def task():
+        with app.app_context():
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Background task {fn.__name__} failed: {e}")
+                raise
+
+    logger.info(f"Submitting background task: {fn.__name__}")
+    return _get_executor().submit(task)
+
+
+def shutdown_background_executor(wait=True):
+    """
+    Stops the background executor so it can be recreated (e.g. after a fork).
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
+        logger.info("Background executor shut down.")
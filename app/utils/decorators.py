@@ -1,7 +1,13 @@
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from functools import wraps
-from flask import jsonify
+from flask import jsonify, request, make_response, current_app
+import threading
 from app.models.user import User
+from app.extensions import db
+from app.services.idempotency_service import (
+    claim_key, wait_for_key, complete_key, release_key, request_fingerprint
+)
+from app.services.shard_service import post_shard, comment_shard, use_shard
 from app.logger import setup_logger
 
 # Initialize logger
@@ -46,3 +52,132 @@ def jwt_required_with_user(fn):
             }), 401
 
     return wrapper
+
+
+# In-flight idempotent requests of this process: (user_id, key) -> threading.Event
+_inflight_requests = {}
+_inflight_lock = threading.Lock()
+
+
+def _replay(record):
+    """Builds a response from a stored idempotency record."""
+    response = current_app.response_class(
+        record.response_body, status=record.status_code, mimetype='application/json'
+    )
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(fn):
+    """
+    Decorator that makes a create endpoint safe to retry via the Idempotency-Key header.
+
+    Must be placed below @jwt_required_with_user, since keys are scoped per user.
+
+    Usage:
+        @jwt_required_with_user
+        @idempotent
+        def your_route(current_user):
+            ...
+
+    - A repeated key replays the stored response without re-running the handler.
+    - Duplicates arriving while the original is in flight wait for its result.
+    - Returns 422 if the key was used for a different endpoint or request body.
+    - Returns 409 if the original request is still running after the wait timeout;
+      one that never finishes frees the key after IDEMPOTENCY_LEASE_SECONDS.
+    - 5xx responses and handler exceptions are not stored, so the request can be retried.
+    """
+
+    @wraps(fn)
+    def wrapper(current_user, *args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return fn(current_user, *args, **kwargs)
+
+        if len(key) > 255:
+            return jsonify({"error": "Idempotency-Key must be at most 255 characters."}), 400
+
+        user_id = current_user.id
+        fingerprint = request_fingerprint(request.method, request.path, request.get_data(cache=True))
+        scope = (user_id, key)
+
+        # Wait cheaply on an in-process event before touching the database
+        with _inflight_lock:
+            event = _inflight_requests.get(scope)
+            is_owner = event is None
+            if is_owner:
+                event = _inflight_requests[scope] = threading.Event()
+
+        if not is_owner:
+            logger.info(f"Waiting for in-flight request with Idempotency-Key {key} (user {user_id})")
+            event.wait(current_app.config['IDEMPOTENCY_WAIT_TIMEOUT'])
+
+        try:
+            claimed, record = claim_key(user_id, key, fingerprint)
+
+            if not claimed:
+                if record is not None and record.request_fingerprint != fingerprint:
+                    logger.warning(f"Idempotency-Key {key} reused for a different request: {fingerprint}")
+                    return jsonify({"error": "Idempotency-Key was used for a different request."}), 422
+
+                if record is not None and record.status_code is None:
+                    record = wait_for_key(user_id, key)
+
+                if record is None or record.status_code is None:
+                    return jsonify({"error": "A request with this Idempotency-Key is still in progress."}), 409
+
+                logger.info(f"Replaying stored response for Idempotency-Key {key} (user {user_id})")
+                return _replay(record)
+
+            try:
+                response = make_response(fn(current_user, *args, **kwargs))
+            except Exception:
+                # Same as a 5xx: free the key so the client can retry it
+                db.session.rollback()
+                release_key(user_id, key)
+                raise
+
+            if response.status_code >= 500:
+                db.session.rollback()  # Handler may have left the session dirty
+                release_key(user_id, key)
+            else:
+                complete_key(user_id, key, response.status_code, response.get_data(as_text=True))
+
+            return response
+
+        finally:
+            if is_owner:
+                with _inflight_lock:
+                    _inflight_requests.pop(scope, None)
+                event.set()
+
+    return wrapper
+
+
+def sharded_by(param, noun, for_write=False):
+    """
+    Decorator running the view with db.session routed to the shard holding
+    the post or comment named by the URL parameter `param` ('post_id' or
+    'comment_id'). Returns 404 if the shard directory does not know it.
+
+    With for_write, the directory entry stays locked until the view commits,
+    so a rebalance cannot move the post in the middle of the write. Without
+    sharding the lookup costs nothing.
+
+    Usage:
+        @sharded_by('post_id', 'Post', for_write=True)
+        def update_post(current_user, post_id):
+            ...
+    """
+    lookup = post_shard if param == 'post_id' else comment_shard
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            shard = lookup(kwargs[param], for_write=for_write)
+            if shard is None:
+                return jsonify({"error": f"{noun} not found."}), 404
+            with use_shard(shard):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
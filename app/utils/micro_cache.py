@@ -0,0 +1,212 @@
+import threading
+import time
+from collections import namedtuple
+from functools import wraps
+from urllib.parse import urlencode
+from flask import request, current_app
+from app.utils.background import run_in_background
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# A stored response: what a hit needs to rebuild it, and when it goes stale and expires
+CachedResponse = namedtuple('CachedResponse', 'body status headers fresh_until stale_until')
+
+
+class Flight:
+    """One computation of a response that identical requests wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None   # CachedResponse, or None if the computation failed
+
+
+class MicroCache:
+    """
+    Per-process cache of whole responses for a fraction of a second, with
+    request coalescing.
+
+    Identical requests that miss share one computation: the first computes,
+    the others wait for its response (single flight). A response is fresh for
+    `ttl` seconds and may then be served stale for `stale_ttl` more while one
+    refresh runs in the background. Only 200 responses are stored; waiting
+    requests share whatever the computation returned.
+    """
+
+    def __init__(self, ttl, stale_ttl, max_entries, wait_timeout):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self.counters = dict.fromkeys(('hits', 'stale_hits', 'coalesced', 'misses', 'refreshes'), 0)
+        self._entries = {}    # key -> CachedResponse, oldest first
+        self._flights = {}    # key -> Flight in progress
+        self._lock = threading.Lock()
+
+    def lookup(self, key):
+        """
+        Decides how a request for `key` is served.
+
+        Returns:
+            tuple: (state, entry, flight) where state is 'hit' or 'stale'
+            (serve entry), 'refresh' (serve entry and complete flight in the
+            background), 'wait' (wait for flight) or 'compute' (compute and
+            complete flight)
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.fresh_until:
+                self.counters['hits'] += 1
+                return 'hit', entry, None
+
+            flight = self._flights.get(key)
+            if entry is not None and now < entry.stale_until:
+                self.counters['stale_hits'] += 1
+                if flight is not None:
+                    return 'stale', entry, None
+                self._flights[key] = flight = Flight()
+                self.counters['refreshes'] += 1
+                return 'refresh', entry, flight
+
+            if flight is not None:
+                self.counters['coalesced'] += 1
+                return 'wait', None, flight
+
+            self._flights[key] = flight = Flight()
+            self.counters['misses'] += 1
+            return 'compute', None, flight
+
+    def complete(self, key, flight, response):
+        """Stores the computed response (if cacheable) and wakes the requests waiting for it."""
+        result = None
+        if response is not None:
+            now = time.monotonic()
+            result = CachedResponse(
+                response.get_data(), response.status_code, list(response.headers.items()),
+                now + self.ttl, now + self.ttl + self.stale_ttl
+            )
+
+        with self._lock:
+            if result is not None and result.status == 200:
+                self._entries.pop(key, None)
+                self._entries[key] = result
+                if len(self._entries) > self.max_entries:
+                    self._prune(time.monotonic())
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+        flight.result = result
+        flight.done.set()
+
+    def _prune(self, now):
+        """Drops expired entries, then the oldest ones, down to max_entries. Caller holds the lock."""
+        for key in [key for key, entry in self._entries.items() if entry.stale_until <= now]:
+            del self._entries[key]
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+    def snapshot(self):
+        """Entry count and hit counters, for metrics."""
+        with self._lock:
+            return {'entries': len(self._entries), 'in_flight': len(self._flights), **self.counters}
+
+
+def get_micro_cache():
+    """
+    Returns the micro-cache of the current app, creating it on first use.
+    """
+    app = current_app._get_current_object()
+    cache = app.extensions.get('micro_cache')
+
+    if cache is None:
+        cache = MicroCache(
+            ttl=app.config['MICRO_CACHE_TTL'],
+            stale_ttl=app.config['MICRO_CACHE_STALE_TTL'],
+            max_entries=app.config['MICRO_CACHE_MAX_ENTRIES'],
+            wait_timeout=app.config['MICRO_CACHE_WAIT_TIMEOUT']
+        )
+        app.extensions['micro_cache'] = cache
+        logger.info(f"Micro-cache started with a {cache.ttl}s TTL.")
+
+    return cache
+
+
+def cache_key():
+    """Method, path and sorted query string of the current request."""
+    return f"{request.method} {request.path}?{urlencode(sorted(request.args.items(multi=True)))}"
+
+
+def _replay(entry, state):
+    response = current_app.response_class(entry.body, status=entry.status, headers=entry.headers)
+    response.headers['X-Cache'] = state.upper()
+    return response
+
+
+def _compute(cache, key, flight, fn, kwargs):
+    """Runs the view for a flight; the flight is completed even if the view raises."""
+    response = None
+    try:
+        response = current_app.make_response(fn(**kwargs))
+        return response
+    finally:
+        cache.complete(key, flight, None if response is None or response.is_streamed else response)
+
+
+def _refresh(cache, key, flight, fn, path, query_string, kwargs):
+    """Recomputes a stale response in a request context of its own."""
+    with current_app.test_request_context(path, query_string=query_string):
+        _compute(cache, key, flight, fn, kwargs)
+    logger.debug(f"Micro-cache refreshed {key}")
+
+
+def micro_cached(fn):
+    """
+    Decorator caching an anonymous GET view in the per-process micro-cache
+    (see MicroCache). Requests with an Authorization header bypass it.
+
+    Place it above decorators that only decide where or how to read (e.g.
+    sharded_by), so hits skip them too. Responses carry X-Cache: HIT, STALE,
+    COALESCED or MISS.
+
+    Usage:
+        @post_bp.route('/posts/<int:post_id>', methods=['GET'])
+        @micro_cached
+        def get_post(post_id):
+            ...
+    """
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        config = current_app.config
+        if not config['MICRO_CACHE_ENABLED'] or request.method != 'GET' or 'Authorization' in request.headers:
+            return fn(*args, **kwargs)
+
+        cache = get_micro_cache()
+        key = cache_key()
+        state, entry, flight = cache.lookup(key)
+
+        if state in ('hit', 'stale'):
+            return _replay(entry, state)
+
+        if state == 'refresh':
+            try:
+                run_in_background(_refresh, cache, key, flight, fn, request.path,
+                                  request.query_string, kwargs)
+            except Exception as e:
+                cache.complete(key, flight, None)
+                logger.error(f"Micro-cache refresh of {key} failed: {e}")
+            return _replay(entry, 'stale')
+
+        if state == 'wait':
+            if flight.done.wait(cache.wait_timeout) and flight.result is not None:
+                return _replay(flight.result, 'coalesced')
+            logger.warning(f"Coalesced request for {key} computes on its own")
+            return fn(*args, **kwargs)
+
+        response = _compute(cache, key, flight, fn, kwargs)
+        response.headers['X-Cache'] = 'MISS'
+        return response
+
+    return wrapper
@@ -0,0 +1,111 @@
+import gc
+import logging
+import os
+import resource
+from app.extensions import db
+from app.utils.background import shutdown_background_executor
+from app.utils.sharding import get_shard_engines
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# /proc/self/smaps_rollup fields reported by memory_usage(), in kB
+_SMAPS_FIELDS = {
+    'Rss': 'rss_kb',
+    'Pss': 'pss_kb',
+    'Shared_Clean': 'shared_clean_kb',
+    'Shared_Dirty': 'shared_dirty_kb',
+    'Private_Clean': 'private_clean_kb',
+    'Private_Dirty': 'private_dirty_kb',
+}
+
+
+def freeze_gc():
+    """
+    Collects garbage once and moves every surviving object into the permanent
+    generation, so later collections in forked workers do not touch (and copy)
+    the pages holding objects created during import.
+    """
+    gc.collect()
+    gc.freeze()
+    logger.info(f"GC frozen after import: {gc.get_freeze_count()} objects moved to permanent generation.")
+
+
+def reopen_log_handlers():
+    """
+    Reopens every file handler so each worker owns its log file descriptor
+    instead of sharing the one inherited from the master process.
+    """
+    reopened = 0
+    loggers = [logging.getLogger()] + [
+        entry for entry in logging.Logger.manager.loggerDict.values()
+        if isinstance(entry, logging.Logger)
+    ]
+
+    for log in loggers:
+        for handler in log.handlers:
+            if not isinstance(handler, logging.FileHandler):
+                continue
+            handler.acquire()
+            try:
+                if handler.stream:
+                    handler.stream.close()
+                handler.stream = handler._open()
+                reopened += 1
+            finally:
+                handler.release()
+
+    logger.debug(f"Reopened {reopened} log file handler(s) in process {os.getpid()}.")
+    return reopened
+
+
+def after_fork(app):
+    """
+    Makes a freshly forked worker safe to serve requests:
+    - Drops pooled DB connections inherited from the master (without closing them
+      on the server side, since the master still owns them)
+    - Reopens log file handles
+    - Resets the background executor so its threads are created in this process
+    """
+    with app.app_context():
+        for engine in [*db.engines.values(), *get_shard_engines(app).values()]:
+            engine.dispose(close=False)
+
+    reopen_log_handlers()
+    shutdown_background_executor(wait=False)
+    logger.info(f"Worker {os.getpid()} initialized after fork.")
+
+
+def memory_usage():
+    """
+    Reports memory usage of the current process.
+
+    Uses /proc/self/smaps_rollup on Linux, which separates pages still shared
+    with the master (copy-on-write) from private ones. Falls back to peak RSS.
+
+    Returns:
+        dict: Memory figures in kB (rss_kb, pss_kb, shared_*_kb, private_*_kb)
+    """
+    usage = {}
+
+    try:
+        with open('/proc/self/smaps_rollup') as smaps:
+            for line in smaps:
+                name, _, value = line.partition(':')
+                if name in _SMAPS_FIELDS:
+                    usage[_SMAPS_FIELDS[name]] = int(value.split()[0])
+    except OSError:
+        usage['rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return usage
+
+
+def log_memory_usage(label):
+    """
+    Logs the memory usage of the current process with a label (e.g. "worker").
+    """
+    usage = memory_usage()
+    details = ", ".join(f"{key}={value}" for key, value in usage.items())
+    logger.info(f"Memory usage of {label} {os.getpid()}: {details}")
+    return usage
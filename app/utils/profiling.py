@@ -0,0 +1,136 @@
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from flask import request, g
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# Endpoints that hold their request open for a long time; a profile would never be written
+EXEMPT_ENDPOINTS = {'comments.stream_comments'}
+
+# Header that profiles one request when it carries PROFILING_TOKEN
+PROFILE_HEADER = 'X-Profile'
+
+
+class StackSampler:
+    """
+    Samples the stack of one thread every `interval` seconds from a helper
+    thread, counting identical stacks. The result is in collapsed-stack
+    format ("root;caller;callee count" per line), which flamegraph.pl,
+    speedscope and inferno read directly.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.started = self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            self.stacks[collapse(frame)] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def collapse(frame):
+    """A frame's stack as "module:function;..." from the outermost call inwards."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+def profile_path(directory, endpoint):
+    """File for a new profile, tagged with the endpoint name, the time and the worker pid."""
+    tag = re.sub(r'[^A-Za-z0-9_.-]', '_', endpoint or 'unknown')
+    suffix = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{random.getrandbits(24):06x}"
+    return os.path.join(directory, f"{tag}-{suffix}.collapsed")
+
+
+def should_profile(config, header_value):
+    """Whether to profile the current request: a valid X-Profile header, or a sampling draw."""
+    token = config['PROFILING_TOKEN']
+    if header_value and token and hmac.compare_digest(header_value, token):
+        return True
+    rate = config['PROFILING_SAMPLE_RATE']
+    return config['PROFILING_ENABLED'] and rate > 0 and random.random() < rate
+
+
+def init_profiling(app):
+    """
+    Registers the request profiling hooks on a Flask app. Only called when
+    PROFILING_ENABLED or PROFILING_TOKEN is set, so requests pay nothing
+    otherwise.
+
+    A profiled request is sampled every PROFILING_INTERVAL_MS while its view
+    runs. The collapsed stacks go to PROFILING_DIR, one file per request, and
+    the file name is returned in the X-Profile-File header.
+    """
+    config = app.config
+    directory = config['PROFILING_DIR']
+    os.makedirs(directory, exist_ok=True)
+
+    @app.before_request
+    def start_profile():
+        if request.endpoint in EXEMPT_ENDPOINTS or not should_profile(config, request.headers.get(PROFILE_HEADER)):
+            return None
+        g.profiler = StackSampler(threading.get_ident(), config['PROFILING_INTERVAL_MS'] / 1000.0).start()
+        return None
+
+    @app.after_request
+    def write_profile(response):
+        sampler = g.pop('profiler', None)
+        if sampler is None:
+            return response
+
+        try:
+            sampler.stop()
+            path = profile_path(directory, request.endpoint)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(sampler.collapsed())
+            response.headers['X-Profile-File'] = os.path.basename(path)
+            logger.info(f"Profiled {request.method} {request.path} ({request.endpoint}): "
+                        f"{sampler.samples} sample(s) in {sampler.elapsed * 1000:.1f}ms -> {path}")
+        except Exception as e:
+            logger.error(f"Writing profile of {request.endpoint} failed: {e}")
+        return response
+
+    @app.teardown_request
+    def stop_profile(exc):
+        # The view raised past after_request; stop sampling without writing
+        sampler = g.pop('profiler', None)
+        if sampler is not None:
+            sampler.stop()
+
+    rate = config['PROFILING_SAMPLE_RATE'] if config['PROFILING_ENABLED'] else 0
+    logger.info(f"Request profiling enabled (sample rate {rate}, "
+                f"{PROFILE_HEADER} header {'on' if config['PROFILING_TOKEN'] else 'off'}), writing to {directory}")
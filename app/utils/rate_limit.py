@@ -0,0 +1,239 @@
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from functools import wraps
+from flask import request, jsonify, current_app
+from flask_jwt_extended import get_jwt_identity
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# Route policies: config entry holding "<count>/<period>" and what the bucket is keyed by
+POLICIES = {
+    'login': ('RATE_LIMIT_LOGIN', 'ip'),
+    'register': ('RATE_LIMIT_REGISTER', 'ip'),
+    'availability': ('RATE_LIMIT_AVAILABILITY', 'ip'),
+    'writes': ('RATE_LIMIT_WRITES', 'user'),
+}
+
+# Period units accepted after the optional multiplier, in seconds
+_UNITS = {
+    '': 1, 's': 1, 'sec': 1, 'second': 1, 'seconds': 1,
+    'm': 60, 'min': 60, 'minute': 60, 'minutes': 60,
+    'h': 3600, 'hr': 3600, 'hour': 3600, 'hours': 3600,
+    'd': 86400, 'day': 86400, 'days': 86400,
+}
+
+_RATE_RE = re.compile(r'^\s*(\d+)\s*/\s*(\d+(?:\.\d+)?)?\s*([a-z]*)\s*$')
+
+# How often idle buckets are dropped from a backend
+PRUNE_INTERVAL = 60
+
+
+def parse_rate(rate):
+    """
+    Parses "<count>/<period>" (e.g. "10/minute", "10/s" or "100/30s") into a
+    token bucket of `count` tokens refilled at count/period tokens per second.
+    The period is an optional number followed by an optional unit; a bare
+    number is in seconds.
+
+    Returns:
+        tuple: (capacity, refill rate per second, period in seconds)
+
+    Raises:
+        ValueError: If the rate is malformed or its unit unknown
+    """
+    match = _RATE_RE.match(rate.lower())
+    if match is None or match.group(3) not in _UNITS or not (match.group(2) or match.group(3)):
+        raise ValueError(f"Invalid rate limit {rate!r}; expected e.g. '10/minute' or '100/30s'")
+
+    count, multiplier, unit = match.groups()
+    seconds = float(multiplier or 1) * _UNITS[unit]
+    capacity = int(count)
+    if capacity < 1 or seconds <= 0:
+        raise ValueError(f"Invalid rate limit {rate!r}; count and period must be positive")
+    return capacity, capacity / seconds, seconds
+
+
+def take_token(tokens, updated, capacity, refill_rate, now):
+    """
+    Refills a bucket for the time since `updated` and tries to take one token.
+
+    Returns:
+        tuple: (tokens left, allowed, seconds until a token is available)
+    """
+    if tokens is None:
+        tokens = float(capacity)
+    else:
+        tokens = min(float(capacity), tokens + (now - updated) * refill_rate)
+
+    if tokens >= 1:
+        return tokens - 1, True, 0.0
+    return tokens, False, (1 - tokens) / refill_rate
+
+
+class MemoryBackend:
+    """Token buckets in a dict; limits are enforced per worker process."""
+
+    def __init__(self):
+        self._buckets = {}              # key -> (tokens, updated)
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_rate, now):
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (None, now))
+            tokens, allowed, retry_after = take_token(tokens, updated, capacity, refill_rate, now)
+            self._buckets[key] = (tokens, now)
+        return allowed, retry_after
+
+    def prune(self, older_than):
+        with self._lock:
+            stale = [key for key, (_, updated) in self._buckets.items() if updated < older_than]
+            for key in stale:
+                del self._buckets[key]
+        return len(stale)
+
+
+class SQLiteBackend:
+    """
+    Token buckets in a SQLite file, shared by every worker process on the host.
+
+    Each take runs in one short BEGIN IMMEDIATE transaction, which SQLite
+    serializes across processes. WAL mode keeps readers and writers from
+    blocking each other, and the file needs no server.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def _connection(self):
+        """One connection per thread, reopened after a fork."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def take(self, key, capacity, refill_rate, now):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (None, now)
+            tokens, allowed, retry_after = take_token(tokens, updated, capacity, refill_rate, now)
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                (key, tokens, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, retry_after
+
+    def prune(self, older_than):
+        cursor = self._connection().execute("DELETE FROM buckets WHERE updated < ?", (older_than,))
+        return cursor.rowcount
+
+
+class RateLimiter:
+    """Applies the configured route policies on top of a bucket backend."""
+
+    def __init__(self, backend, policies):
+        self.backend = backend
+        self.policies = policies        # name -> (capacity, refill rate, period, key type)
+        self._max_period = max(period for _, _, period, _ in policies.values())
+        self._next_prune = time.monotonic() + PRUNE_INTERVAL
+
+    def check(self, policy_name, identity):
+        """
+        Takes a token from the bucket of `identity` under a policy.
+
+        Returns:
+            tuple: (allowed, seconds until the next token)
+        """
+        capacity, refill_rate, _, _ = self.policies[policy_name]
+        now = time.time()
+        allowed, retry_after = self.backend.take(f"{policy_name}:{identity}", capacity, refill_rate, now)
+
+        # A bucket untouched for a whole period is full again, so dropping it changes nothing
+        if time.monotonic() >= self._next_prune:
+            self._next_prune = time.monotonic() + PRUNE_INTERVAL
+            pruned = self.backend.prune(now - self._max_period)
+            logger.debug(f"Pruned {pruned} idle rate limit bucket(s).")
+
+        return allowed, retry_after
+
+
+def get_rate_limiter():
+    """
+    Returns the rate limiter of the current app, creating it on first use.
+    """
+    app = current_app._get_current_object()
+    limiter = app.extensions.get('rate_limiter')
+
+    if limiter is None:
+        policies = {
+            name: parse_rate(app.config[setting]) + (key_type,)
+            for name, (setting, key_type) in POLICIES.items()
+        }
+        if app.config['RATE_LIMIT_BACKEND'] == 'sqlite':
+            backend = SQLiteBackend(app.config['RATE_LIMIT_SQLITE_PATH'])
+        else:
+            backend = MemoryBackend()
+        limiter = RateLimiter(backend, policies)
+        app.extensions['rate_limiter'] = limiter
+        logger.info(f"Rate limiter started with {type(backend).__name__}.")
+
+    return limiter
+
+
+def rate_limit(policy_name):
+    """
+    Decorator that throttles a route with a token bucket policy from POLICIES.
+
+    Buckets are keyed by client IP, or by JWT identity for 'user' policies
+    (place it below jwt_required_with_user). Returns 429 with Retry-After
+    when the bucket is empty. If the backend fails, requests are let through.
+    """
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not current_app.config['RATE_LIMIT_ENABLED']:
+                return fn(*args, **kwargs)
+
+            try:
+                limiter = get_rate_limiter()
+                key_type = limiter.policies[policy_name][3]
+                identity = get_jwt_identity() if key_type == 'user' else None
+                identity = f"user:{identity}" if identity is not None else f"ip:{request.remote_addr}"
+                allowed, retry_after = limiter.check(policy_name, identity)
+            except Exception as e:
+                logger.error(f"Rate limiter failed for policy '{policy_name}': {e}")
+                return fn(*args, **kwargs)
+
+            if not allowed:
+                logger.warning(f"Rate limit '{policy_name}' exceeded by {identity}")
+                response = jsonify({"error": "Too many requests. Please retry later."})
+                response.status_code = 429
+                response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+                return response
+
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
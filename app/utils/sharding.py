@@ -0,0 +1,96 @@
+import sqlalchemy as sa
+from sqlalchemy.sql.util import find_tables
+from flask import current_app
+from flask_sqlalchemy.session import Session
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+# The main database; it is always a shard, and the only one unless SHARD_BINDS is set
+DEFAULT_SHARD = 'default'
+
+# Tables that live on the shard of their post; everything else stays on the main database
+SHARDED_TABLES = frozenset({'posts', 'comments', 'comments_archive'})
+
+
+def parse_shard_binds(value):
+    """
+    Parses SHARD_BINDS ("name=url,name=url") into an ordered {name: url} dict.
+
+    Raises:
+        ValueError: On a malformed entry, a duplicate name or the reserved name 'default'
+    """
+    binds = {}
+    for entry in filter(None, (part.strip() for part in (value or '').split(','))):
+        name, sep, url = entry.partition('=')
+        name, url = name.strip(), url.strip()
+        if not sep or not name or not url:
+            raise ValueError(f"SHARD_BINDS entry must look like name=url: {entry!r}")
+        if name == DEFAULT_SHARD or name in binds:
+            raise ValueError(f"Duplicate or reserved shard name in SHARD_BINDS: {name!r}")
+        binds[name] = url
+    return binds
+
+
+def get_shard_engines(app=None):
+    """
+    Engines of the extra shards of the given (or current) app, by name.
+    Created on first use and again whenever SHARD_BINDS changes.
+    """
+    app = app or current_app._get_current_object()
+    binds = app.config.get('SHARD_BINDS', '')
+    cached = app.extensions.get('shard_engines')
+
+    if cached is None or cached[0] != binds:
+        if cached is not None:
+            for engine in cached[1].values():
+                engine.dispose()
+        engines = {name: sa.create_engine(url) for name, url in parse_shard_binds(binds).items()}
+        app.extensions['shard_engines'] = cached = (binds, engines)
+        controller = app.extensions.get('admission')
+        if controller is not None:
+            from app.utils.admission import instrument_engine  # Imports the shard service
+            for engine in engines.values():
+                instrument_engine(engine, controller)
+        if engines:
+            logger.info(f"Shard engines created: {', '.join(engines)}")
+
+    return cached[1]
+
+
+def shard_names(app=None):
+    """Every shard, the main database first."""
+    return [DEFAULT_SHARD, *get_shard_engines(app)]
+
+
+def sharding_enabled(app=None):
+    return bool(get_shard_engines(app))
+
+
+def touches_sharded_tables(mapper=None, clause=None):
+    """Whether a statement (or the mapper it targets) reads or writes a sharded table."""
+    if mapper is not None:
+        return sa.inspect(mapper).local_table.name in SHARDED_TABLES
+    if clause is None:
+        return False
+    tables = find_tables(clause, check_columns=True, include_aliases=True, include_joins=True,
+                         include_selects=True, include_crud=True)
+    return any(getattr(table, 'name', None) in SHARDED_TABLES for table in tables)
+
+
+class ShardedSession(Session):
+    """
+    db.session class routing sharded tables to the shard set with use_shard().
+
+    The shard is kept in session.info['shard']. Statements on the other
+    tables (users, the change feed, counters, the shard directory) always go
+    to the main database, so one transaction can span both; its commit is not
+    atomic across databases.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        shard = self.info.get('shard', DEFAULT_SHARD)
+        if bind is None and shard != DEFAULT_SHARD and touches_sharded_tables(mapper, clause):
+            return get_shard_engines()[shard]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -0,0 +1,16 @@
+"""ASGI entry point for the async deployment variant (e.g., Hypercorn or Uvicorn)."""
+
+from app.aio import create_async_app
+from app.logger import setup_logger
+
+# Initialize the logger
+logger = setup_logger(__name__)
+logger.info("Starting ASGI application setup...")
+
+# Create the Quart app instance using the async application factory
+app = create_async_app()
+logger.info("Quart application instance created successfully for ASGI deployment.")
+
+# Serve with e.g.:
+#   hypercorn asgi:app --workers 4 --bind 0.0.0.0:8000
+#   uvicorn asgi:app --workers 4 --port 8000
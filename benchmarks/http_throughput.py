@@ -0,0 +1,53 @@
+"""
+Simple HTTP throughput benchmark used to compare deployments, e.g. the WSGI
+entry point (wsgi.py) against the ASGI variant (asgi.py).
+
+Usage:
+    python benchmarks/http_throughput.py http://localhost:8000/api/posts --requests 5000 --concurrency 64
+"""
+import argparse
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def fetch(url):
+    """Issues one GET request and returns (status, latency in seconds)."""
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except Exception:
+        status = 0
+    return status, time.perf_counter() - start
+
+
+def run(url, total, concurrency):
+    """Runs the benchmark and prints throughput and latency percentiles."""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fetch, [url] * total))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for _, latency in results)
+    errors = sum(1 for status, _ in results if not 200 <= status < 400)
+
+    print(f"URL:          {url}")
+    print(f"Requests:     {total} (concurrency {concurrency})")
+    print(f"Errors:       {errors}")
+    print(f"Throughput:   {total / elapsed:.1f} req/s")
+    print(f"Latency p50:  {statistics.median(latencies) * 1000:.1f} ms")
+    print(f"Latency p99:  {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="HTTP GET throughput benchmark")
+    parser.add_argument('url')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    args = parser.parse_args()
+    run(args.url, args.requests, args.concurrency)
@@ -0,0 +1,111 @@
+"""
+Registration throughput benchmark: the previous SELECT-then-INSERT signup
+against the optimistic single INSERT used by register_user.
+
+Runs in-process against the database in DATABASE_URL (tables must exist) and
+creates users with a random prefix. Password hashing is identical in both
+variants and would dominate the timings, so it is replaced by a precomputed
+hash unless --with-hashing is given.
+
+Usage:
+    python benchmarks/registration_throughput.py --users 2000 --concurrency 8 --duplicates 0.1
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services import auth_service  # noqa: E402
+
+PASSWORD = 'Benchmark123'
+
+
+def select_then_insert(username, email, password):
+    """The previous registration: a lookup round trip before the INSERT."""
+    existing_user = User.query.filter(
+        (User.username == username) | (User.email == email)
+    ).first()
+    if existing_user:
+        return None, auth_service.REGISTRATION_CONFLICT
+
+    user = User(username=username, email=email, password=auth_service.generate_password_hash(password))
+    db.session.add(user)
+    db.session.commit()
+    return user, None
+
+
+VARIANTS = {'select-insert': select_then_insert, 'optimistic': auth_service.register_user}
+
+
+def signups(prefix, total, duplicates):
+    """(username, email) pairs; every 1/duplicates-th one repeats an earlier name."""
+    step = int(1 / duplicates) if duplicates else 0
+    pairs = []
+    for i in range(total):
+        n = i - 1 if step and i and i % step == 0 else i
+        pairs.append((f"{prefix}{n}", f"{prefix}{n}@example.com"))
+    return pairs
+
+
+def run_variant(app, name, pairs, concurrency):
+    """Registers every pair with one variant; returns (seconds, latencies, conflicts)."""
+    register = VARIANTS[name]
+
+    def attempt(pair):
+        with app.app_context():
+            start = time.perf_counter()
+            _, error = register(*pair, PASSWORD)
+            return time.perf_counter() - start, error
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(attempt, pairs))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in results)
+    conflicts = sum(1 for _, error in results if error)
+    return elapsed, latencies, conflicts
+
+
+def run(total, concurrency, duplicates, with_hashing):
+    app = create_app()
+    # Per-signup log lines would dominate the timings
+    logging.disable(logging.WARNING)
+
+    if not with_hashing:
+        precomputed = generate_password_hash(PASSWORD)
+        auth_service.generate_password_hash = lambda password: precomputed
+
+    print(f"Database:     {app.config['SQLALCHEMY_DATABASE_URI'].split('@')[-1]}")
+    print(f"Signups:      {total} per variant (concurrency {concurrency}, "
+          f"{duplicates:.0%} duplicates, hashing {'on' if with_hashing else 'off'})")
+
+    for name in VARIANTS:
+        prefix = f"bench_{uuid.uuid4().hex[:8]}_"
+        elapsed, latencies, conflicts = run_variant(app, name, signups(prefix, total, duplicates), concurrency)
+        print(f"\n{name}")
+        print(f"  Throughput:   {total / elapsed:.1f} signups/s")
+        print(f"  Latency p50:  {statistics.median(latencies) * 1000:.2f} ms")
+        print(f"  Latency p99:  {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f} ms")
+        print(f"  Conflicts:    {conflicts}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Registration throughput benchmark")
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duplicates', type=float, default=0.0,
+                        help="Fraction of signups reusing a taken username/email")
+    parser.add_argument('--with-hashing', action='store_true')
+    args = parser.parse_args()
+    run(args.users, args.concurrency, args.duplicates, args.with_hashing)
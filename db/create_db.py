@@ -99,6 +99,110 @@ def create_tables():
             FOREIGN KEY (post_id) REFERENCES posts(id) ON DELETE CASCADE,
             FOREIGN KEY (author_id) REFERENCES users(id) ON DELETE CASCADE
         );
+
+        -- Soft delete marker used while large comment threads are purged
+        ALTER TABLE posts ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP;
+        CREATE INDEX IF NOT EXISTS ix_comments_post_id ON comments (post_id);
+
+        -- Stored responses for Idempotency-Key retries
+        CREATE TABLE IF NOT EXISTS idempotency_keys (
+            key VARCHAR(255) NOT NULL,
+            user_id INTEGER NOT NULL,
+            request_fingerprint VARCHAR(255) NOT NULL,
+            status_code INTEGER,
+            response_body TEXT,
+            expires_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (key, user_id)
+        );
+        CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at ON idempotency_keys (expires_at);
+
+        -- Revoked JWTs, kept until the tokens expire
+        CREATE TABLE IF NOT EXISTS revoked_tokens (
+            id SERIAL PRIMARY KEY,
+            jti VARCHAR(36) NOT NULL UNIQUE,
+            expires_at TIMESTAMP NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS ix_revoked_tokens_expires_at ON revoked_tokens (expires_at);
+
+        -- Materialized time-decayed comment activity per post
+        CREATE TABLE IF NOT EXISTS trending_scores (
+            post_id INTEGER PRIMARY KEY,
+            score_key DOUBLE PRECISION NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS ix_trending_scores_score_key ON trending_scores (score_key);
+
+        -- Denormalized comment statistics on posts
+        ALTER TABLE posts ADD COLUMN IF NOT EXISTS comment_count INTEGER NOT NULL DEFAULT 0;
+        ALTER TABLE posts ADD COLUMN IF NOT EXISTS last_comment_at TIMESTAMP;
+
+        -- Threaded comments: replies point at their parent comment
+        ALTER TABLE comments ADD COLUMN IF NOT EXISTS parent_id INTEGER REFERENCES comments(id) ON DELETE CASCADE;
+        CREATE INDEX IF NOT EXISTS ix_comments_parent_id ON comments (parent_id);
+
+        -- Change feed: append-only log of post/comment writes, including tombstones
+        CREATE TABLE IF NOT EXISTS changes (
+            id BIGSERIAL PRIMARY KEY,
+            entity VARCHAR(16) NOT NULL,
+            entity_id INTEGER NOT NULL,
+            op VARCHAR(8) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS ix_changes_created_at ON changes (created_at);
+
+        -- Bulk import bookkeeping: source-to-local id map and per-file checkpoints
+        CREATE TABLE IF NOT EXISTS import_id_map (
+            entity VARCHAR(16) NOT NULL,
+            source_id VARCHAR(64) NOT NULL,
+            target_id INTEGER NOT NULL,
+            PRIMARY KEY (entity, source_id)
+        );
+        CREATE TABLE IF NOT EXISTS import_checkpoints (
+            source VARCHAR(512) PRIMARY KEY,
+            entity VARCHAR(16) NOT NULL,
+            "offset" BIGINT NOT NULL DEFAULT 0,
+            imported INTEGER NOT NULL DEFAULT 0,
+            skipped INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        -- Comments of long-idle posts, moved out of the hot comments table
+        CREATE TABLE IF NOT EXISTS comments_archive (
+            id INTEGER PRIMARY KEY,
+            content TEXT NOT NULL,
+            post_id INTEGER NOT NULL REFERENCES posts(id) ON DELETE CASCADE,
+            author_id INTEGER NOT NULL REFERENCES users(id),
+            parent_id INTEGER,
+            created_at TIMESTAMP,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS ix_comments_archive_post_id ON comments_archive (post_id);
+        CREATE INDEX IF NOT EXISTS ix_comments_archive_parent_id ON comments_archive (parent_id);
+
+        -- Maintained row counts (sharded over slots), seeded from the live posts
+        CREATE TABLE IF NOT EXISTS row_counters (
+            name VARCHAR(32) NOT NULL,
+            slot SMALLINT NOT NULL,
+            value BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (name, slot)
+        );
+        INSERT INTO row_counters (name, slot, value)
+        SELECT 'posts', 0, COUNT(*) FROM posts WHERE deleted_at IS NULL
+        ON CONFLICT DO NOTHING;
+
+        -- Shard directory: where each post lives, and the source of post/comment ids while sharded
+        CREATE TABLE IF NOT EXISTS post_shards (
+            post_id SERIAL PRIMARY KEY,
+            author_id INTEGER NOT NULL,
+            shard VARCHAR(64) NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS ix_post_shards_author_id ON post_shards (author_id);
+        CREATE INDEX IF NOT EXISTS ix_post_shards_shard ON post_shards (shard);
+
+        CREATE TABLE IF NOT EXISTS comment_shards (
+            comment_id SERIAL PRIMARY KEY,
+            post_id INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS ix_comment_shards_post_id ON comment_shards (post_id);
         """)
 
         conn.commit()
@@ -0,0 +1,76 @@
+"""
+Production server profile for Gunicorn.
+
+Usage:
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The app is preloaded in the master so that workers share its memory pages
+copy-on-write. Each worker then drops inherited DB connections, reopens its
+log files and reports its memory usage.
+
+Comment streams (GET /comments/stream) hold their worker thread for as long
+as they are open. Sync workers (the default, one thread each) would be taken
+by a handful of clients and killed after `timeout`, so they answer streams
+with 503. To stream from this profile, run threaded workers:
+    GUNICORN_THREADS=100 gunicorn -c gunicorn.conf.py wsgi:app
+Each open stream then costs one thread and is not cut by `timeout`. For
+thousands of idle subscribers, serve the async variant (asgi.py) instead.
+"""
+import multiprocessing
+import os
+
+# Server socket and workers
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", 1))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread" if threads > 1 else "sync")
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 0))
+
+# Import the app once in the master; workers inherit it on fork
+preload_app = True
+
+# Log memory usage of each worker every N requests (0 disables)
+memory_report_every = int(os.getenv("GUNICORN_MEMORY_REPORT_EVERY", 1000))
+
+
+def when_ready(server):
+    """Master is ready: report its memory as a baseline for the workers."""
+    from app.utils.process import log_memory_usage
+    log_memory_usage("master")
+
+
+def post_fork(server, worker):
+    """Runs in each worker right after fork."""
+    from wsgi import app
+    from app.utils.process import after_fork
+    after_fork(app)
+    if type(worker).__name__ == 'SyncWorker':
+        app.config['COMMENT_STREAM_ENABLED'] = False
+    worker.requests_handled = 0
+
+
+def post_worker_init(worker):
+    """Worker finished initializing: report its starting memory."""
+    from app.utils.process import log_memory_usage
+    log_memory_usage("worker")
+
+
+def post_request(worker, req, environ, resp):
+    """Periodically report worker memory to track copy-on-write growth."""
+    if not memory_report_every:
+        return
+    worker.requests_handled += 1
+    if worker.requests_handled % memory_report_every == 0:
+        from app.utils.process import log_memory_usage
+        log_memory_usage("worker")
+
+
+def worker_exit(server, worker):
+    """Write out buffered trending activity and report final worker memory on shutdown or recycle."""
+    from wsgi import app
+    from app.services.trending_service import flush_trending
+    from app.utils.process import log_memory_usage
+    flush_trending(app)
+    log_memory_usage("worker")
@@ -0,0 +1,30 @@
+"""Add comment parent_id for threading
+
+Revision ID: 0a9c3e7b5d26
+Revises: f08b6d2c4e51
+Create Date: 2026-10-19 15:03:12.904716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a9c3e7b5d26'
+down_revision = 'f08b6d2c4e51'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('parent_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_comments_parent_id'), ['parent_id'], unique=False)
+        batch_op.create_foreign_key('fk_comments_parent_id_comments', 'comments', ['parent_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade():
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_comments_parent_id_comments', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_comments_parent_id'))
+        batch_op.drop_column('parent_id')
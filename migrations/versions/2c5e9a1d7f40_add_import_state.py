@@ -0,0 +1,39 @@
+"""Add bulk import id map and checkpoints
+
+Revision ID: 2c5e9a1d7f40
+Revises: 1b4d8f2a6c93
+Create Date: 2026-10-19 17:41:06.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c5e9a1d7f40'
+down_revision = '1b4d8f2a6c93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('import_id_map',
+    sa.Column('entity', sa.String(length=16), nullable=False),
+    sa.Column('source_id', sa.String(length=64), nullable=False),
+    sa.Column('target_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('entity', 'source_id')
+    )
+    op.create_table('import_checkpoints',
+    sa.Column('source', sa.String(length=512), nullable=False),
+    sa.Column('entity', sa.String(length=16), nullable=False),
+    sa.Column('offset', sa.BigInteger(), nullable=False),
+    sa.Column('imported', sa.Integer(), nullable=False),
+    sa.Column('skipped', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('source')
+    )
+
+
+def downgrade():
+    op.drop_table('import_checkpoints')
+    op.drop_table('import_id_map')
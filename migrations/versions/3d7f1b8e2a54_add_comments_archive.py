@@ -0,0 +1,42 @@
+"""Add comments archive
+
+Revision ID: 3d7f1b8e2a54
+Revises: 2c5e9a1d7f40
+Create Date: 2026-10-19 18:02:47.915630
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d7f1b8e2a54'
+down_revision = '2c5e9a1d7f40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('comments_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('author_id', sa.Integer(), nullable=False),
+    sa.Column('parent_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['author_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('comments_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_comments_archive_parent_id'), ['parent_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_comments_archive_post_id'), ['post_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('comments_archive', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_comments_archive_post_id'))
+        batch_op.drop_index(batch_op.f('ix_comments_archive_parent_id'))
+
+    op.drop_table('comments_archive')
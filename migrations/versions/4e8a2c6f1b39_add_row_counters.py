@@ -0,0 +1,34 @@
+"""Add maintained row counters
+
+Revision ID: 4e8a2c6f1b39
+Revises: 3d7f1b8e2a54
+Create Date: 2026-10-19 18:31:12.640283
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4e8a2c6f1b39'
+down_revision = '3d7f1b8e2a54'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('row_counters',
+    sa.Column('name', sa.String(length=32), nullable=False),
+    sa.Column('slot', sa.SmallInteger(), autoincrement=False, nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name', 'slot')
+    )
+    # Seed the posts counter from the existing live posts
+    op.execute(
+        "INSERT INTO row_counters (name, slot, value) "
+        "SELECT 'posts', 0, COUNT(*) FROM posts WHERE deleted_at IS NULL"
+    )
+
+
+def downgrade():
+    op.drop_table('row_counters')
@@ -0,0 +1,48 @@
+"""Add the shard directory for posts and comments
+
+Revision ID: 7c1d9e3a5b82
+Revises: 4e8a2c6f1b39
+Create Date: 2026-10-19 21:04:37.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1d9e3a5b82'
+down_revision = '4e8a2c6f1b39'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('post_shards',
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('author_id', sa.Integer(), nullable=False),
+    sa.Column('shard', sa.String(length=64), nullable=False),
+    sa.PrimaryKeyConstraint('post_id')
+    )
+    with op.batch_alter_table('post_shards', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_post_shards_author_id'), ['author_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_post_shards_shard'), ['shard'], unique=False)
+
+    op.create_table('comment_shards',
+    sa.Column('comment_id', sa.Integer(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('comment_id')
+    )
+    with op.batch_alter_table('comment_shards', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_comment_shards_post_id'), ['post_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('comment_shards', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_comment_shards_post_id'))
+
+    op.drop_table('comment_shards')
+    with op.batch_alter_table('post_shards', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_post_shards_shard'))
+        batch_op.drop_index(batch_op.f('ix_post_shards_author_id'))
+
+    op.drop_table('post_shards')
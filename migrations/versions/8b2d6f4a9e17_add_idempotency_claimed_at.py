@@ -0,0 +1,26 @@
+"""Add idempotency key lease
+
+Revision ID: 8b2d6f4a9e17
+Revises: 7c1d9e3a5b82
+Create Date: 2026-10-19 19:12:40.318527
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2d6f4a9e17'
+down_revision = '7c1d9e3a5b82'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('idempotency_keys', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('claimed_at', sa.DateTime(), server_default=sa.func.now(), nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('idempotency_keys', schema=None) as batch_op:
+        batch_op.drop_column('claimed_at')
@@ -0,0 +1,36 @@
+"""Restore comment cascade and add post soft delete
+
+Revision ID: b7d2e4a91c3f
+Revises: 6f3eb160a860
+Create Date: 2026-10-19 10:12:31.402118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d2e4a91c3f'
+down_revision = '6f3eb160a860'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_constraint('comments_post_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('comments_post_id_fkey', 'posts', ['post_id'], ['id'], ondelete='CASCADE')
+        batch_op.create_index(batch_op.f('ix_comments_post_id'), ['post_id'], unique=False)
+
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_column('deleted_at')
+
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_comments_post_id'))
+        batch_op.drop_constraint('comments_post_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('comments_post_id_fkey', 'posts', ['post_id'], ['id'])
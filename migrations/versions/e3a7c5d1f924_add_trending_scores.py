@@ -0,0 +1,33 @@
+"""Add trending scores
+
+Revision ID: e3a7c5d1f924
+Revises: d95e0b3c7a18
+Create Date: 2026-10-19 13:02:44.281937
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a7c5d1f924'
+down_revision = 'd95e0b3c7a18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('trending_scores',
+    sa.Column('post_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('score_key', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('post_id')
+    )
+    with op.batch_alter_table('trending_scores', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_trending_scores_score_key'), ['score_key'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('trending_scores', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_trending_scores_score_key'))
+
+    op.drop_table('trending_scores')
@@ -0,0 +1,35 @@
+"""Add post comment stats
+
+Revision ID: f08b6d2c4e51
+Revises: e3a7c5d1f924
+Create Date: 2026-10-19 14:21:07.512390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f08b6d2c4e51'
+down_revision = 'e3a7c5d1f924'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('last_comment_at', sa.DateTime(), nullable=True))
+
+    # Backfill from existing comments
+    op.execute("""
+        UPDATE posts SET
+            comment_count = (SELECT COUNT(*) FROM comments WHERE comments.post_id = posts.id),
+            last_comment_at = (SELECT MAX(created_at) FROM comments WHERE comments.post_id = posts.id)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_column('last_comment_at')
+        batch_op.drop_column('comment_count')
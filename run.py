@@ -41,9 +41,239 @@ def db_upgrade_command():
         logger.error(f"Error applying database migrations: {e}")
         click.echo("Failed to upgrade database.")
 
-# Step 4: Register custom command with Flask CLI
+@click.command("import")
+@click.option("--users", type=click.Path(exists=True, dir_okay=False), help="NDJSON file of users.")
+@click.option("--posts", type=click.Path(exists=True, dir_okay=False), help="NDJSON file of posts.")
+@click.option("--comments", type=click.Path(exists=True, dir_okay=False), help="NDJSON file of comments.")
+@click.option("--batch-size", type=click.IntRange(min=1), default=None, help="Rows per transaction.")
+@with_appcontext
+def import_command(users, posts, comments, batch_size):
+    """
+    Bulk import users, posts and comments from NDJSON files.
+    Re-running the same command resumes after the last committed batch.
+    """
+    from flask import current_app
+    from app.extensions import db
+    from app.services.import_service import ENTITIES, import_file
+    from app.services.post_stats import repair_post_stats
+
+    files = dict(zip(ENTITIES, (users, posts, comments)))
+    batch_size = batch_size or current_app.config['IMPORT_BATCH_SIZE']
+
+    def progress(report):
+        click.echo(f"  {report['entity']}: {report['imported']} imported, {report['skipped']} skipped "
+                   f"({report['rows_per_second']:.0f} rows/s)")
+
+    try:
+        for entity in ENTITIES:
+            if files[entity]:
+                click.echo(f"Importing {entity} from {files[entity]}...")
+                report = import_file(db.engine, entity, files[entity], batch_size, progress)
+                click.echo(f"Imported {report['imported']} {entity} in {report['seconds']:.1f}s "
+                           f"({report['rows_per_second']:.0f} rows/s, {report['skipped']} skipped).")
+
+        if posts or comments:
+            repair_post_stats()
+            click.echo("Post comment stats refreshed.")
+    except Exception as e:
+        logger.error(f"Error importing data: {e}")
+        click.echo("Import failed; re-run the same command to resume.")
+
+@click.command("purge-deleted-posts")
+@with_appcontext
+def purge_deleted_posts_command():
+    """
+    Finish purging posts whose background comment purge was interrupted.
+    """
+    from app.services.post_service import purge_deleted_posts
+
+    try:
+        count = purge_deleted_posts()
+        click.echo(f"Purged {count} deleted post(s).")
+    except Exception as e:
+        logger.error(f"Error purging deleted posts: {e}")
+        click.echo("Failed to purge deleted posts.")
+
+@click.command("purge-idempotency-keys")
+@with_appcontext
+def purge_idempotency_keys_command():
+    """
+    Delete stored Idempotency-Key responses whose replay window has expired.
+    """
+    from app.services.idempotency_service import purge_expired_keys
+
+    try:
+        count = purge_expired_keys()
+        click.echo(f"Purged {count} expired idempotency key(s).")
+    except Exception as e:
+        logger.error(f"Error purging idempotency keys: {e}")
+        click.echo("Failed to purge idempotency keys.")
+
+@click.command("purge-revoked-tokens")
+@with_appcontext
+def purge_revoked_tokens_command():
+    """
+    Delete token revocations whose tokens have already expired.
+    """
+    from app.services.token_revocation import purge_expired_revocations
+
+    try:
+        count = purge_expired_revocations()
+        click.echo(f"Purged {count} expired token revocation(s).")
+    except Exception as e:
+        logger.error(f"Error purging revoked tokens: {e}")
+        click.echo("Failed to purge revoked tokens.")
+
+@click.command("repair-post-stats")
+@with_appcontext
+def repair_post_stats_command():
+    """
+    Recompute denormalized comment counts and last comment times for all posts,
+    and the maintained total of live posts.
+    """
+    from app.extensions import db
+    from app.services.post_stats import repair_post_stats
+    from app.services.count_service import rebuild_counter, live_posts_count_query, POSTS
+
+    try:
+        rebuild_counter(POSTS, live_posts_count_query())
+        db.session.commit()
+        count = repair_post_stats()
+        click.echo(f"Repaired stats for {count} post(s).")
+    except Exception as e:
+        logger.error(f"Error repairing post stats: {e}")
+        click.echo("Failed to repair post stats.")
+
+@click.command("purge-changes")
+@with_appcontext
+def purge_changes_command():
+    """
+    Delete change feed entries older than CHANGE_FEED_RETENTION_DAYS.
+    """
+    from flask import current_app
+    from app.services.change_feed import purge_old_changes
+
+    try:
+        count = purge_old_changes(current_app.config['CHANGE_FEED_RETENTION_DAYS'])
+        click.echo(f"Purged {count} change feed entries.")
+    except Exception as e:
+        logger.error(f"Error purging change feed: {e}")
+        click.echo("Failed to purge change feed.")
+
+@click.command("archive-comments")
+@click.option("--older-than-days", type=click.IntRange(min=1), default=None,
+              help="Idle time after which a post's comments are archived.")
+@with_appcontext
+def archive_comments_command(older_than_days):
+    """
+    Move the comments of long-idle posts into the comments archive.
+    """
+    from flask import current_app
+    from app.services.comment_archive import archive_comments
+
+    try:
+        days = older_than_days or current_app.config['COMMENT_ARCHIVE_AFTER_DAYS']
+        count = archive_comments(days, current_app.config['COMMENT_ARCHIVE_BATCH_SIZE'])
+        click.echo(f"Archived {count} comment(s).")
+    except Exception as e:
+        logger.error(f"Error archiving comments: {e}")
+        click.echo("Failed to archive comments.")
+
+@click.command("export")
+@click.argument("entity", type=click.Choice(["posts", "comments"]))
+@click.option("--format", "fmt", type=click.Choice(["csv", "ndjson"]), default="ndjson", help="Output format.")
+@click.option("--since", default=None, help="Only rows created/updated at or after this ISO 8601 time.")
+@click.option("--output", "-o", type=click.File("w"), default="-", help="Output file (default: stdout).")
+@with_appcontext
+def export_command(entity, fmt, since, output):
+    """
+    Stream all posts or comments to a CSV or NDJSON file.
+    """
+    from flask import current_app
+    from app.services.export_service import parse_since, stream_export
+    from app.services.shard_service import all_shard_engines
+
+    try:
+        since = parse_since(since) if since else None
+        for chunk in stream_export(all_shard_engines(), entity, fmt, since, current_app.config['EXPORT_BATCH_SIZE']):
+            output.write(chunk)
+        output.flush()
+        if output.name != "<stdout>":
+            click.echo(f"Exported {entity} to {output.name}.")
+    except Exception as e:
+        logger.error(f"Error exporting {entity}: {e}")
+        click.echo(f"Failed to export {entity}.", err=True)
+
+@click.group("shards")
+def shards_cli():
+    """
+    Manage the shards listed in SHARD_BINDS.
+    """
+
+@shards_cli.command("init")
+@with_appcontext
+def shards_init_command():
+    """
+    Create the post and comment tables on every shard and register the posts
+    already on the main database. Safe to re-run.
+    """
+    from app.services.shard_service import init_shards
+
+    try:
+        posts, comments = init_shards()
+        click.echo(f"Shards ready; registered {posts} post(s) and {comments} comment(s) of the main database.")
+    except Exception as e:
+        logger.error(f"Error initializing shards: {e}")
+        click.echo("Failed to initialize shards.")
+
+@shards_cli.command("status")
+@with_appcontext
+def shards_status_command():
+    """
+    Show the number of posts on each shard.
+    """
+    from app.services.shard_service import shard_counts
+
+    try:
+        for shard, count in shard_counts().items():
+            click.echo(f"  {shard}: {count} post(s)")
+    except Exception as e:
+        logger.error(f"Error reading shard status: {e}")
+        click.echo("Failed to read shard status.")
+
+@shards_cli.command("rebalance")
+@click.option("--batch-size", type=click.IntRange(min=1), default=None, help="Posts moved per transaction.")
+@click.option("--dry-run", is_flag=True, help="Only report what would move.")
+@with_appcontext
+def shards_rebalance_command(batch_size, dry_run):
+    """
+    Move posts and their comments to the shard their author is placed on,
+    e.g. after adding a shard to SHARD_BINDS. Run one rebalance at a time.
+    """
+    from flask import current_app
+    from app.services.shard_service import rebalance
+
+    try:
+        moved = rebalance(batch_size or current_app.config['SHARD_REBALANCE_BATCH_SIZE'], dry_run=dry_run)
+        for route, count in moved.items():
+            click.echo(f"  {route}: {count} post(s){' to move' if dry_run else ' moved'}")
+        click.echo("Nothing to move." if not moved else "Rebalance planned." if dry_run else "Rebalance finished.")
+    except Exception as e:
+        logger.error(f"Error rebalancing shards: {e}")
+        click.echo("Rebalance failed; re-run it to continue.")
+
+# Step 4: Register custom commands with Flask CLI
 app.cli.add_command(db_upgrade_command)
-logger.debug("Custom CLI command 'db-upgrade' registered with Flask.")
+app.cli.add_command(import_command)
+app.cli.add_command(purge_deleted_posts_command)
+app.cli.add_command(purge_idempotency_keys_command)
+app.cli.add_command(purge_revoked_tokens_command)
+app.cli.add_command(repair_post_stats_command)
+app.cli.add_command(purge_changes_command)
+app.cli.add_command(archive_comments_command)
+app.cli.add_command(export_command)
+app.cli.add_command(shards_cli)
+logger.debug("Custom CLI commands registered with Flask.")
 
 # Step 5: Run the app if executed directly
 if __name__ == '__main__':
@@ -23,7 +23,10 @@ def test_client():
             "TESTING": True,
             "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",  # Use in-memory DB for fast tests
             "SQLALCHEMY_TRACK_MODIFICATIONS": False,
-            "JWT_SECRET_KEY": "test-secret"
+            "JWT_SECRET_KEY": "test-secret",
+            "BACKGROUND_TASKS_EAGER": True,  # Run background tasks inline for deterministic tests
+            "RATE_LIMIT_ENABLED": False,    # Tests log in and write far faster than real clients
+            "MICRO_CACHE_ENABLED": False    # Tests read their own writes right away
         })
         logger.debug("Test configuration applied.")
 
@@ -39,3 +42,35 @@ def test_client():
     except Exception as e:
         logger.error(f"Error during test client setup or teardown: {e}")
         raise  # Re-raise to fail the test immediately
+
+
+@pytest.fixture
+def capture_queries(test_client):
+    """
+    Context manager factory recording the SQL statements executed inside it,
+    for tests that pin down how many round trips an endpoint costs. The
+    token revocation sync is left out; it runs at most once per interval on
+    whichever request comes first.
+
+    Usage:
+        with capture_queries() as statements:
+            test_client.put(...)
+        assert len(statements) == 3
+    """
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def capture():
+        statements = []
+        def listener(conn, cursor, statement, *args):
+            if 'revoked_tokens' not in statement:
+                statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+    return capture
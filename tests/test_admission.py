@@ -0,0 +1,85 @@
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+def test_admission_control(test_client):
+    """
+    Test admission control:
+    - Requests beyond a class limit are shed with 503 and Retry-After
+    - Other endpoint classes are unaffected
+    - Limits shrink when DB latency exceeds the target and recover afterwards
+    - Waiting on the connection pool counts as DB latency
+    - Decisions are visible in /api/metrics
+    """
+    logger.info("Starting test: test_admission_control")
+
+    from app.utils.admission import get_admission_controller
+
+    controller = get_admission_controller(test_client.application)
+    assert controller is not None
+
+    original_limits = dict(controller.limits)
+    try:
+        # Occupy every read slot, as if requests were stuck waiting on the database
+        controller.limits['read'] = 1
+        assert controller.try_acquire('read')
+
+        shed_res = test_client.get('/api/posts')
+        assert shed_res.status_code == 503
+        assert shed_res.headers['Retry-After'] == str(controller.retry_after)
+
+        # Writes and auth have their own limits
+        login_res = test_client.post('/api/auth/login', json={'username': 'nobody', 'password': 'x'})
+        assert login_res.status_code != 503
+
+        # Metrics stay reachable and report the shed request
+        metrics = test_client.get('/api/metrics').get_json()['admission']
+        assert metrics['classes']['read']['shed'] >= 1
+        assert metrics['classes']['read']['in_flight'] == 1
+
+        controller.release('read')
+        assert test_client.get('/api/posts').status_code == 200
+        assert controller.in_flight['read'] == 0
+        logger.info("Load shedding test passed.")
+    except AssertionError as e:
+        logger.error(f"Load shedding test failed: {e}")
+        raise
+    finally:
+        controller.limits.update(original_limits)
+
+    try:
+        # Slow statements lower every limit, but never below the floor
+        controller._next_adjust = 0.0
+        for _ in range(20):
+            controller.observe_db_latency(controller.target_latency * 10)
+        assert controller.limits['read'] < controller.max_limits['read']
+        assert controller.limits['auth'] >= controller.min_limit
+
+        # Fast statements let the limits grow back one step per interval
+        lowered = controller.limits['read']
+        controller.db_latency = 0.0
+        controller._next_adjust = 0.0
+        controller.observe_db_latency(0.0)
+        assert controller.limits['read'] == lowered + 1
+
+        # Slow connection checkouts alone also lower the limits
+        controller.limits.update(original_limits)
+        controller._next_adjust = 0.0
+        for _ in range(20):
+            controller.observe_checkout_wait(controller.target_latency * 10)
+        assert controller.limits['read'] < controller.max_limits['read']
+
+        # Every checkout on the engine is timed
+        from app.extensions import db
+        controller.checkout_wait = 1.0
+        db.engine.connect().close()
+        assert controller.checkout_wait < 1.0
+        logger.info("Adaptive limit test passed.")
+    except AssertionError as e:
+        logger.error(f"Adaptive limit test failed: {e}")
+        raise
+    finally:
+        controller.limits.update(original_limits)
+        controller.db_latency = 0.0
+        controller.checkout_wait = 0.0
@@ -0,0 +1,116 @@
+import asyncio
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+def test_async_app_lifecycle():
+    """
+    Test the ASGI variant end to end against an in-memory SQLite database:
+    - Register, log in and refresh the access token
+    - Create, read, update and delete a post, inline and with a background purge
+    - Create and list comments, and see the post trending
+    - Log out and have the token rejected
+    """
+    logger.info("Starting test: test_async_app_lifecycle")
+
+    from app.aio import create_async_app
+    from app.aio.database import create_all, get_session
+    from app.models.post import Post
+
+    app = create_async_app()
+    app.config.update({
+        "TESTING": True,
+        "BACKGROUND_TASKS_EAGER": True,        # Materialize trending scores inline
+        "TRENDING_MATERIALIZE_INTERVAL": 0     # ...on every event
+    })
+
+    async def scenario():
+        async with app.app_context():
+            await create_all()
+
+        client = app.test_client()
+
+        # Register and login
+        res = await client.post('/api/auth/register', json={
+            'username': 'asyncuser',
+            'email': 'async@example.com',
+            'password': 'Pass1234'
+        })
+        assert res.status_code == 201
+
+        res = await client.get('/api/auth/available?username=asyncuser&email=free@example.com')
+        assert (await res.get_json())['available'] == {'username': False, 'email': True}
+
+        res = await client.post('/api/auth/login', json={
+            'username': 'asyncuser',
+            'password': 'Pass1234'
+        })
+        assert res.status_code == 200
+        tokens = await res.get_json()
+        headers = {'Authorization': f"Bearer {tokens['access_token']}"}
+
+        # Refresh issues a new access token
+        res = await client.post('/api/auth/refresh',
+                                headers={'Authorization': f"Bearer {tokens['refresh_token']}"})
+        assert res.status_code == 200
+        headers = {'Authorization': f"Bearer {(await res.get_json())['access_token']}"}
+
+        # Post lifecycle
+        res = await client.post('/api/posts', json={'title': 'Async', 'content': 'Body'}, headers=headers)
+        assert res.status_code == 201
+        post = await res.get_json()
+        assert set(post) >= {'id', 'title', 'content', 'author_id', 'created_at'}
+
+        res = await client.put(f"/api/posts/{post['id']}", json={'title': 'Async 2'}, headers=headers)
+        assert (await res.get_json())['title'] == 'Async 2'
+
+        # Comments
+        res = await client.post('/api/comments', json={'post_id': post['id'], 'content': 'Hi'}, headers=headers)
+        assert res.status_code == 201
+
+        res = await client.get(f"/api/comments?post_id={post['id']}")
+        assert len(await res.get_json()) == 1
+
+        res = await client.get('/api/posts/trending')
+        assert [trending['id'] for trending in await res.get_json()] == [post['id']]
+
+        res = await client.delete(f"/api/posts/{post['id']}", headers=headers)
+        assert res.status_code == 200
+
+        res = await client.get(f"/api/comments?post_id={post['id']}")
+        assert await res.get_json() == []
+
+        res = await client.get(f"/api/posts/{post['id']}")
+        assert res.status_code == 404
+
+        # Threads above the inline threshold are hidden, then purged in batches
+        app.config.update({"POST_PURGE_INLINE_THRESHOLD": 1, "POST_PURGE_BATCH_SIZE": 1})
+        res = await client.post('/api/posts', json={'title': 'Busy', 'content': 'Body'}, headers=headers)
+        busy = await res.get_json()
+        for content in ('One', 'Two', 'Three'):
+            await client.post('/api/comments', json={'post_id': busy['id'], 'content': content}, headers=headers)
+
+        res = await client.delete(f"/api/posts/{busy['id']}", headers=headers)
+        assert res.status_code == 202
+
+        res = await client.get(f"/api/comments?post_id={busy['id']}")
+        assert await res.get_json() == []
+        res = await client.get(f"/api/posts/{busy['id']}")
+        assert res.status_code == 404
+        async with app.app_context():
+            async with get_session() as session:
+                assert await session.get(Post, busy['id']) is None  # Purged, not just hidden
+
+        # Logout revokes the token
+        res = await client.post('/api/auth/logout', headers=headers)
+        assert res.status_code == 200
+        res = await client.post('/api/posts', json={'title': 'After', 'content': 'Logout'}, headers=headers)
+        assert res.status_code == 401
+
+    try:
+        asyncio.run(scenario())
+        logger.info("Async app lifecycle test passed.")
+    except AssertionError as e:
+        logger.error(f"Async app lifecycle test failed: {e}")
+        raise
@@ -4,11 +4,11 @@ from app.logger import setup_logger
 # Initialize logger for this test module
 logger = setup_logger(__name__)
 
-def test_register_and_login(test_client):
+def test_register_and_login(test_client, capture_queries):
     """
     Test user registration and login functionality using Flask test client.
     Ensures:
-    - User can register successfully.
+    - User can register successfully, in a single INSERT.
     - User can log in and receive a valid access token.
     """
     logger.info("Starting test: test_register_and_login")
@@ -28,6 +28,36 @@ def test_register_and_login(test_client):
         logger.error(f"User registration test failed. Response: {res.get_data(as_text=True)}")
         raise
 
+    # Taken usernames and emails are rejected by the unique constraints
+    try:
+        res = test_client.post('/api/auth/register', json={
+            'username': 'testuser',
+            'email': 'other@example.com',
+            'password': 'Testpass123'
+        })
+        assert res.status_code == 409
+        res = test_client.post('/api/auth/register', json={
+            'username': 'otheruser',
+            'email': 'test@example.com',
+            'password': 'Testpass123'
+        })
+        assert res.status_code == 409
+
+        # The failed inserts leave the session usable; the response comes from INSERT ... RETURNING
+        with capture_queries() as statements:
+            res = test_client.post('/api/auth/register', json={
+                'username': 'otheruser',
+                'email': 'other@example.com',
+                'password': 'Testpass123'
+            })
+        assert res.status_code == 201
+        assert res.get_json()['user']['email'] == 'other@example.com'
+        assert len(statements) == 1 and statements[0].startswith('INSERT INTO users')
+        logger.info("Duplicate registration test passed.")
+    except AssertionError as e:
+        logger.error(f"Duplicate registration test failed. Response: {res.get_data(as_text=True)}")
+        raise
+
     # Attempt to log in with the newly registered user
     try:
         res = test_client.post('/api/auth/login', json={
@@ -40,3 +70,160 @@ def test_register_and_login(test_client):
     except AssertionError as e:
         logger.error(f"User login test failed. Response: {res.get_data(as_text=True)}")
         raise
+
+
+def test_logout_revokes_token(test_client):
+    """
+    Test that logging out revokes the access token:
+    - The token works before logout
+    - After logout, the same token is rejected
+    - Revocations made by another worker are picked up on the next sync
+    """
+    logger.info("Starting test: test_logout_revokes_token")
+
+    from datetime import datetime, timedelta
+    from app.extensions import db
+    from app.models.revoked_token import RevokedToken
+
+    app = test_client.application
+
+    test_client.post('/api/auth/register', json={
+        'username': 'leaver',
+        'email': 'leaver@example.com',
+        'password': 'Pass1234'
+    })
+
+    def login():
+        res = test_client.post('/api/auth/login', json={'username': 'leaver', 'password': 'Pass1234'})
+        return {'Authorization': f"Bearer {res.get_json()['access_token']}"}
+
+    try:
+        headers = login()
+        assert test_client.post('/api/posts', json={'title': 'Hi', 'content': 'Bye'}, headers=headers).status_code == 201
+
+        logout_res = test_client.post('/api/auth/logout', headers=headers)
+        assert logout_res.status_code == 200
+
+        res = test_client.post('/api/posts', json={'title': 'Hi', 'content': 'Again'}, headers=headers)
+        assert res.status_code == 401
+        logger.info("Logout revocation test passed.")
+    except AssertionError as e:
+        logger.error(f"Logout revocation test failed. Response: {logout_res.get_data(as_text=True)}")
+        raise
+
+    try:
+        # Simulate a revocation written by another worker
+        headers = login()
+        with app.test_request_context(headers=headers):
+            from flask_jwt_extended import decode_token
+            jti = decode_token(headers['Authorization'].split()[1])['jti']
+        db.session.add(RevokedToken(jti=jti, expires_at=datetime.utcnow() + timedelta(minutes=5)))
+        db.session.commit()
+
+        app.extensions['token_revocation'].sync_interval = 0
+        app.extensions['token_revocation']._next_sync = 0
+        res = test_client.post('/api/posts', json={'title': 'Hi', 'content': 'Elsewhere'}, headers=headers)
+        assert res.status_code == 401
+        logger.info("Cross-worker revocation sync test passed.")
+    except AssertionError as e:
+        logger.error(f"Cross-worker revocation sync failed. Response: {res.get_data(as_text=True)}")
+        raise
+
+
+def test_refresh_token_flow(test_client):
+    """
+    Test refresh tokens:
+    - Login returns a refresh token
+    - /refresh issues a working access token without the password
+    - Access and refresh tokens cannot be used in place of each other
+    """
+    logger.info("Starting test: test_refresh_token_flow")
+
+    test_client.post('/api/auth/register', json={
+        'username': 'refresher',
+        'email': 'refresher@example.com',
+        'password': 'Pass1234'
+    })
+    login_res = test_client.post('/api/auth/login', json={
+        'username': 'refresher',
+        'password': 'Pass1234'
+    })
+
+    try:
+        tokens = login_res.get_json()
+        assert 'refresh_token' in tokens
+        refresh_headers = {'Authorization': f"Bearer {tokens['refresh_token']}"}
+        access_headers = {'Authorization': f"Bearer {tokens['access_token']}"}
+
+        refresh_res = test_client.post('/api/auth/refresh', headers=refresh_headers)
+        assert refresh_res.status_code == 200
+        new_headers = {'Authorization': f"Bearer {refresh_res.get_json()['access_token']}"}
+        assert test_client.post('/api/posts', json={'title': 'Fresh', 'content': 'Token'},
+                                headers=new_headers).status_code == 201
+
+        assert test_client.post('/api/auth/refresh', headers=access_headers).status_code == 422
+        assert test_client.post('/api/posts', json={'title': 'Wrong', 'content': 'Token'},
+                                headers=refresh_headers).status_code == 422
+        logger.info("Refresh token flow test passed.")
+    except AssertionError as e:
+        logger.error(f"Refresh token flow failed. Response: {login_res.get_data(as_text=True)}")
+        raise
+
+    try:
+        # Revoking the refresh token ends the session
+        assert test_client.post('/api/auth/logout', headers=refresh_headers).status_code == 200
+        assert test_client.post('/api/auth/refresh', headers=refresh_headers).status_code == 401
+        logger.info("Refresh token revocation test passed.")
+    except AssertionError as e:
+        logger.error(f"Refresh token revocation failed: {e}")
+        raise
+
+
+def test_username_availability(test_client):
+    """
+    Test the availability check:
+    - Registered usernames and emails are reported as taken
+    - Unknown values are answered from the in-memory filter without a query
+    - Users created elsewhere (another worker, an import) show up after a sync
+    """
+    logger.info("Starting test: test_username_availability")
+
+    from sqlalchemy import event
+    from app.extensions import db
+    from app.models.user import User
+    from app.services.availability import get_availability_index
+
+    try:
+        res = test_client.get('/api/auth/available')
+        assert res.status_code == 400
+
+        test_client.post('/api/auth/register', json={
+            'username': 'availuser',
+            'email': 'avail@example.com',
+            'password': 'Testpass123'
+        })
+        res = test_client.get('/api/auth/available?username=availuser&email=AVAIL@example.com')
+        assert res.status_code == 200
+        assert res.get_json()['available'] == {'username': False, 'email': False}
+
+        # A miss in the filter is answered without touching the database
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            res = test_client.get('/api/auth/available?username=freshname')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        assert res.get_json()['available'] == {'username': True}
+        assert not any('users' in statement for statement in statements)
+
+        # Registered by another worker: visible once the index syncs
+        db.session.add(User(username='elsewhere', email='elsewhere@example.com', password='x'))
+        db.session.commit()
+        get_availability_index(test_client.application)._next_sync = 0
+        res = test_client.get('/api/auth/available?username=elsewhere')
+        assert res.get_json()['available'] == {'username': False}
+        logger.info("Availability test passed.")
+    except AssertionError as e:
+        logger.error(f"Availability test failed. Response: {res.get_data(as_text=True)}")
+        raise
@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+def test_export(test_client):
+    """
+    Test streaming bulk export:
+    - Posts and comments as NDJSON, one object per line
+    - CSV output starts with a header row
+    - `since` filters rows, invalid parameters return 400
+    """
+    logger.info("Starting test: test_export")
+
+    try:
+        test_client.post('/api/auth/register', json={
+            'username': 'exporter',
+            'email': 'exporter@example.com',
+            'password': 'Pass1234'
+        })
+        token = test_client.post('/api/auth/login', json={
+            'username': 'exporter',
+            'password': 'Pass1234'
+        }).get_json()['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+
+        post_id = test_client.post('/api/posts', json={'title': 'Exported', 'content': 'Body, with "quotes"'},
+                                   headers=headers).get_json()['id']
+        test_client.post('/api/comments', json={'content': 'Exported comment', 'post_id': post_id},
+                         headers=headers)
+    except Exception as e:
+        logger.error(f"Export setup failed: {e}")
+        raise
+
+    try:
+        assert test_client.get('/api/export/posts').status_code == 401
+
+        response = test_client.get('/api/export/posts', headers=headers)
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        assert 'attachment' in response.headers['Content-Disposition']
+        posts = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        exported = next(post for post in posts if post['id'] == post_id)
+        assert exported['title'] == 'Exported' and exported['comment_count'] == 1
+
+        response = test_client.get('/api/export/comments?format=csv', headers=headers)
+        assert response.mimetype == 'text/csv'
+        rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+        assert rows[0] == ['id', 'content', 'post_id', 'author_id', 'parent_id', 'created_at']
+        assert any(row[1] == 'Exported comment' for row in rows[1:])
+
+        response = test_client.get('/api/export/posts?format=csv', headers=headers)
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        assert any(row['content'] == 'Body, with "quotes"' for row in rows)
+        logger.info("Export format test passed.")
+    except AssertionError as e:
+        logger.error(f"Export format test failed: {e}")
+        raise
+
+    try:
+        response = test_client.get('/api/export/posts?since=2999-01-01T00:00:00Z', headers=headers)
+        assert response.status_code == 200
+        assert response.get_data(as_text=True) == ''
+
+        assert test_client.get('/api/export/posts?format=xml', headers=headers).status_code == 400
+        assert test_client.get('/api/export/comments?since=yesterday', headers=headers).status_code == 400
+        logger.info("Export filter test passed.")
+    except AssertionError as e:
+        logger.error(f"Export filter test failed: {e}")
+        raise
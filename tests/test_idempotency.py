@@ -0,0 +1,180 @@
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+def test_idempotent_post_creation(test_client):
+    """
+    Test Idempotency-Key handling on create endpoints:
+    - A retried request with the same key replays the stored response
+    - No duplicate row is inserted
+    - Reusing the key on a different endpoint or with a different body is rejected
+    """
+    logger.info("Starting test: test_idempotent_post_creation")
+
+    from app.models.post import Post
+
+    try:
+        # Register and login
+        test_client.post('/api/auth/register', json={
+            'username': 'retrier',
+            'email': 'retrier@example.com',
+            'password': 'Pass1234'
+        })
+        login_res = test_client.post('/api/auth/login', json={
+            'username': 'retrier',
+            'password': 'Pass1234'
+        })
+        token = login_res.get_json()['access_token']
+        headers = {'Authorization': f'Bearer {token}', 'Idempotency-Key': 'create-post-1'}
+        logger.info("User registered and logged in successfully.")
+    except Exception as e:
+        logger.error(f"User authentication failed: {e}")
+        raise
+
+    try:
+        # Original request and its retry
+        first_res = test_client.post('/api/posts', json={
+            'title': 'Retried post',
+            'content': 'Sent twice'
+        }, headers=headers)
+        second_res = test_client.post('/api/posts', json={
+            'title': 'Retried post',
+            'content': 'Sent twice'
+        }, headers=headers)
+
+        assert first_res.status_code == 201
+        assert second_res.status_code == 201
+        assert second_res.headers.get('Idempotent-Replayed') == 'true'
+        assert second_res.get_json()['id'] == first_res.get_json()['id']
+        assert Post.query.filter_by(title='Retried post').count() == 1
+        logger.info("Idempotent replay test passed.")
+    except AssertionError as e:
+        logger.error(f"Idempotent replay failed. Response: {second_res.get_data(as_text=True)}")
+        raise
+
+    try:
+        # Same key on another endpoint
+        comment_res = test_client.post('/api/comments', json={
+            'post_id': first_res.get_json()['id'],
+            'content': 'Wrong key reuse'
+        }, headers=headers)
+        assert comment_res.status_code == 422
+
+        # Same key and endpoint, different payload
+        changed_res = test_client.post('/api/posts', json={
+            'title': 'Retried post',
+            'content': 'Sent with other content'
+        }, headers=headers)
+        assert changed_res.status_code == 422
+        assert Post.query.filter_by(title='Retried post').count() == 1
+        logger.info("Idempotency key reuse test passed.")
+    except AssertionError as e:
+        logger.error(f"Idempotency key reuse test failed. Response: {comment_res.get_data(as_text=True)}")
+        raise
+
+
+def test_idempotency_key_released_on_exception(test_client):
+    """
+    Test that a handler raising an exception frees its Idempotency-Key:
+    - No half-claimed key is left behind
+    - A retry with the same key runs the handler again instead of getting 409
+    """
+    logger.info("Starting test: test_idempotency_key_released_on_exception")
+
+    import pytest
+    from app.models.idempotency_key import IdempotencyKey
+    from app.models.user import User
+    from app.utils.decorators import idempotent
+
+    app = test_client.application
+    user = User.query.filter_by(username='retrier').first()
+    calls = []
+
+    @idempotent
+    def flaky(current_user):
+        calls.append(current_user.id)
+        if len(calls) == 1:
+            raise RuntimeError("handler crashed")
+        return {"ok": True}, 201
+
+    def call():
+        with app.test_request_context('/api/flaky', method='POST',
+                                      headers={'Idempotency-Key': 'crash-1'}):
+            return flaky(user)
+
+    try:
+        with pytest.raises(RuntimeError):
+            call()
+        assert IdempotencyKey.query.filter_by(user_id=user.id, key='crash-1').count() == 0
+
+        response = call()
+        assert response.status_code == 201
+        assert len(calls) == 2
+        logger.info("Idempotency key release on exception test passed.")
+    except AssertionError as e:
+        logger.error(f"Idempotency key release on exception test failed: {e}")
+        raise
+
+
+def test_abandoned_idempotency_key_is_reclaimed(test_client):
+    """
+    Test that an in-flight key left behind by a request that never finished
+    (e.g. a killed worker) blocks retries only until its lease runs out.
+    """
+    logger.info("Starting test: test_abandoned_idempotency_key_is_reclaimed")
+
+    from datetime import datetime, timedelta
+    from flask import make_response
+    from app.extensions import db
+    from app.models.idempotency_key import IdempotencyKey
+    from app.models.user import User
+    from app.services.idempotency_service import request_fingerprint
+    from app.utils.decorators import idempotent
+
+    app = test_client.application
+    user = User.query.filter_by(username='retrier').first()
+    lease = app.config['IDEMPOTENCY_LEASE_SECONDS']
+    wait_timeout = app.config['IDEMPOTENCY_WAIT_TIMEOUT']
+    calls = []
+
+    @idempotent
+    def create(current_user):
+        calls.append(current_user.id)
+        return {"ok": True}, 201
+
+    def call(key):
+        with app.test_request_context('/api/create', method='POST', data=b'{}',
+                                      headers={'Idempotency-Key': key}):
+            return make_response(create(user))
+
+    def leave_in_flight(key, claimed_seconds_ago):
+        now = datetime.utcnow()
+        db.session.add(IdempotencyKey(
+            key=key,
+            user_id=user.id,
+            request_fingerprint=request_fingerprint('POST', '/api/create', b'{}'),
+            expires_at=now + timedelta(days=1),
+            claimed_at=now - timedelta(seconds=claimed_seconds_ago)
+        ))
+        db.session.commit()
+
+    try:
+        # Within the lease the original request may still finish
+        app.config['IDEMPOTENCY_WAIT_TIMEOUT'] = 0.1
+        leave_in_flight('killed-1', 0)
+        assert call('killed-1').status_code == 409
+        assert calls == []
+
+        # Past the lease the key is claimed afresh
+        leave_in_flight('killed-2', lease + 1)
+        response = call('killed-2')
+        assert response.status_code == 201
+        assert len(calls) == 1
+        assert IdempotencyKey.query.filter_by(user_id=user.id, key='killed-2').one().status_code == 201
+        logger.info("Abandoned idempotency key test passed.")
+    except AssertionError as e:
+        logger.error(f"Abandoned idempotency key test failed: {e}")
+        raise
+    finally:
+        app.config['IDEMPOTENCY_WAIT_TIMEOUT'] = wait_timeout
@@ -0,0 +1,118 @@
+import threading
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+
+def test_micro_cache_serves_anonymous_gets(test_client):
+    """
+    Test the micro-cache on GET /api/posts/<id> and GET /api/comments:
+    - A miss computes, an identical request within the TTL is a hit.
+    - Past the TTL the stale response is served while it refreshes.
+    - Authenticated requests and error responses are not cached.
+    """
+    logger.info("Starting test: test_micro_cache_serves_anonymous_gets")
+
+    app = test_client.application
+    app.extensions.pop('micro_cache', None)
+    app.config.update({'MICRO_CACHE_ENABLED': True, 'MICRO_CACHE_TTL': 60, 'MICRO_CACHE_STALE_TTL': 60})
+
+    try:
+        test_client.post('/api/auth/register', json={
+            'username': 'cached', 'email': 'cached@example.com', 'password': 'Pass1234'
+        })
+        login_res = test_client.post('/api/auth/login', json={'username': 'cached', 'password': 'Pass1234'})
+        headers = {'Authorization': f"Bearer {login_res.get_json()['access_token']}"}
+        post_id = test_client.post('/api/posts', json={'title': 'Hot', 'content': 'Linked'},
+                                   headers=headers).get_json()['id']
+
+        first = test_client.get(f'/api/posts/{post_id}')
+        second = test_client.get(f'/api/posts/{post_id}')
+        assert first.headers['X-Cache'] == 'MISS' and second.headers['X-Cache'] == 'HIT'
+        assert second.get_json() == first.get_json()
+
+        assert test_client.put(f'/api/posts/{post_id}', json={'title': 'Hotter'}, headers=headers).status_code == 200
+        assert test_client.get(f'/api/posts/{post_id}').get_json()['title'] == 'Hot'
+        authed = test_client.get(f'/api/posts/{post_id}', headers=headers)
+        assert 'X-Cache' not in authed.headers and authed.get_json()['title'] == 'Hotter'
+
+        # Error responses are not stored
+        missing = [test_client.get('/api/posts/999999') for _ in range(2)]
+        assert all(res.status_code != 200 and res.headers['X-Cache'] == 'MISS' for res in missing)
+
+        comments = test_client.get(f'/api/comments?post_id={post_id}&limit=10')
+        reordered = test_client.get(f'/api/comments?limit=10&post_id={post_id}')
+        assert comments.headers['X-Cache'] == 'MISS' and reordered.headers['X-Cache'] == 'HIT'
+        assert reordered.headers['X-Total-Count'] == comments.headers['X-Total-Count']
+        logger.info("Micro-cache hits and misses verified.")
+    except AssertionError:
+        logger.error("Micro-cache hit/miss behaviour is wrong.")
+        raise
+
+    try:
+        # Every response is stale at once; each request serves the previous one and refreshes it
+        app.extensions.pop('micro_cache', None)
+        app.config['MICRO_CACHE_TTL'] = 0
+        assert test_client.get(f'/api/posts/{post_id}').headers['X-Cache'] == 'MISS'
+        test_client.put(f'/api/posts/{post_id}', json={'title': 'Hottest'}, headers=headers)
+
+        stale = test_client.get(f'/api/posts/{post_id}')
+        assert stale.headers['X-Cache'] == 'STALE' and stale.get_json()['title'] == 'Hotter'
+        assert test_client.get(f'/api/posts/{post_id}').get_json()['title'] == 'Hottest'
+
+        metrics = test_client.get('/api/metrics').get_json()['micro_cache']
+        assert metrics['misses'] == 1 and metrics['refreshes'] == 2 and metrics['in_flight'] == 0
+        logger.info("Stale-while-revalidate verified.")
+    except AssertionError:
+        logger.error("Stale-while-revalidate failed.")
+        raise
+    finally:
+        app.config.update({'MICRO_CACHE_ENABLED': False, 'MICRO_CACHE_TTL': 0.5, 'MICRO_CACHE_STALE_TTL': 2})
+        app.extensions.pop('micro_cache', None)
+
+
+def test_micro_cache_coalesces_identical_misses(test_client):
+    """
+    Test single flight: requests for a key that is being computed wait for
+    that computation and share its response instead of computing their own.
+    """
+    logger.info("Starting test: test_micro_cache_coalesces_identical_misses")
+
+    from app.utils.micro_cache import MicroCache
+
+    cache = MicroCache(ttl=60, stale_ttl=0, max_entries=1, wait_timeout=5)
+    state, _, flight = cache.lookup('GET /api/posts/1?')
+    assert state == 'compute'
+
+    results = []
+
+    def follower():
+        follower_state, _, follower_flight = cache.lookup('GET /api/posts/1?')
+        assert follower_state == 'wait' and follower_flight is flight
+        follower_flight.done.wait(5)
+        results.append(follower_flight.result)
+
+    try:
+        threads = [threading.Thread(target=follower) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(0.05)
+
+        cache.complete('GET /api/posts/1?', flight, test_client.application.response_class(b'{"id": 1}', status=200))
+        for thread in threads:
+            thread.join(5)
+
+        assert len(results) == 5 and all(result.body == b'{"id": 1}' for result in results)
+        assert cache.lookup('GET /api/posts/1?')[0] == 'hit'
+        assert cache.snapshot()['coalesced'] == 5 and cache.snapshot()['misses'] == 1
+
+        # Only max_entries responses are kept, oldest dropped first
+        _, _, other = cache.lookup('GET /api/posts/2?')
+        cache.complete('GET /api/posts/2?', other, test_client.application.response_class(b'{}', status=200))
+        assert cache.snapshot()['entries'] == 1 and cache.lookup('GET /api/posts/1?')[0] == 'compute'
+        logger.info("Identical misses coalesced into one computation.")
+    except AssertionError:
+        logger.error("Micro-cache coalescing failed.")
+        raise
@@ -75,3 +75,553 @@ def test_create_read_update_delete_post(test_client):
     except AssertionError as e:
         logger.error(f"Post deletion failed. Response: {delete_res.get_data(as_text=True)}")
         raise
+
+
+def test_delete_post_purges_comments(test_client):
+    """
+    Test that deleting a post removes its comments without loading them:
+    - Small threads are deleted inline (200)
+    - Threads above the inline threshold are hidden and purged in batches (202)
+    """
+    logger.info("Starting test: test_delete_post_purges_comments")
+
+    from app.extensions import db
+    from app.models.comment import Comment
+    from app.models.post import Post
+
+    app = test_client.application
+
+    try:
+        # Register and login
+        test_client.post('/api/auth/register', json={
+            'username': 'purger',
+            'email': 'purger@example.com',
+            'password': 'Pass1234'
+        })
+        login_res = test_client.post('/api/auth/login', json={
+            'username': 'purger',
+            'password': 'Pass1234'
+        })
+        token = login_res.get_json()['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+    except Exception as e:
+        logger.error(f"User authentication failed: {e}")
+        raise
+
+    def create_post_with_comments(count):
+        post_id = test_client.post('/api/posts', json={
+            'title': 'Busy thread',
+            'content': 'Lots of comments'
+        }, headers=headers).get_json()['id']
+        for i in range(count):
+            test_client.post('/api/comments', json={
+                'post_id': post_id,
+                'content': f'Comment {i}'
+            }, headers=headers)
+        return post_id
+
+    try:
+        # Small thread: deleted inline with a single set-based DELETE
+        post_id = create_post_with_comments(2)
+        delete_res = test_client.delete(f'/api/posts/{post_id}', headers=headers)
+        assert delete_res.status_code == 200
+        assert Comment.query.filter_by(post_id=post_id).count() == 0
+        logger.info("Inline post deletion test passed.")
+    except AssertionError as e:
+        logger.error(f"Inline post deletion failed. Response: {delete_res.get_data(as_text=True)}")
+        raise
+
+    original_threshold = app.config['POST_PURGE_INLINE_THRESHOLD']
+    original_batch_size = app.config['POST_PURGE_BATCH_SIZE']
+    try:
+        # Large thread: hidden immediately and purged in batches of 2
+        app.config.update(POST_PURGE_INLINE_THRESHOLD=3, POST_PURGE_BATCH_SIZE=2)
+        post_id = create_post_with_comments(5)
+        delete_res = test_client.delete(f'/api/posts/{post_id}', headers=headers)
+        assert delete_res.status_code == 202
+        db.session.expire_all()
+        assert Comment.query.filter_by(post_id=post_id).count() == 0
+        assert db.session.get(Post, post_id) is None
+        logger.info("Background post purge test passed.")
+    except AssertionError as e:
+        logger.error(f"Background post purge failed. Response: {delete_res.get_data(as_text=True)}")
+        raise
+    finally:
+        app.config.update(POST_PURGE_INLINE_THRESHOLD=original_threshold,
+                          POST_PURGE_BATCH_SIZE=original_batch_size)
+
+
+def test_trending_posts(test_client):
+    """
+    Test the trending endpoint:
+    - Posts are ranked by decayed comment activity
+    - Deleting comments lowers a post's score
+    """
+    logger.info("Starting test: test_trending_posts")
+
+    app = test_client.application
+    app.config['TRENDING_MATERIALIZE_INTERVAL'] = 0  # Materialize on every event
+    app.extensions.pop('trending', None)
+
+    try:
+        test_client.post('/api/auth/register', json={
+            'username': 'trender',
+            'email': 'trender@example.com',
+            'password': 'Pass1234'
+        })
+        login_res = test_client.post('/api/auth/login', json={
+            'username': 'trender',
+            'password': 'Pass1234'
+        })
+        headers = {'Authorization': f"Bearer {login_res.get_json()['access_token']}"}
+
+        quiet_id = test_client.post('/api/posts', json={'title': 'Quiet', 'content': 'x'},
+                                    headers=headers).get_json()['id']
+        busy_id = test_client.post('/api/posts', json={'title': 'Busy', 'content': 'y'},
+                                   headers=headers).get_json()['id']
+
+        test_client.post('/api/comments', json={'post_id': quiet_id, 'content': 'one'}, headers=headers)
+        comment_ids = [
+            test_client.post('/api/comments', json={'post_id': busy_id, 'content': f'c{i}'},
+                             headers=headers).get_json()['id']
+            for i in range(3)
+        ]
+    except Exception as e:
+        logger.error(f"Trending setup failed: {e}")
+        raise
+
+    try:
+        res = test_client.get('/api/posts/trending?limit=2')
+        assert res.status_code == 200
+        trending = res.get_json()
+        assert [post['id'] for post in trending] == [busy_id, quiet_id]
+        assert trending[0]['trending_score'] > trending[1]['trending_score']
+        logger.info("Trending ranking test passed.")
+    except AssertionError as e:
+        logger.error(f"Trending ranking failed. Response: {res.get_data(as_text=True)}")
+        raise
+
+    try:
+        for comment_id in comment_ids:
+            test_client.delete(f'/api/comments/{comment_id}', headers=headers)
+        trending = test_client.get('/api/posts/trending').get_json()
+        assert trending[0]['id'] == quiet_id
+        assert busy_id not in [post['id'] for post in trending]
+        assert test_client.get('/api/posts/trending?limit=0').status_code == 400
+        logger.info("Trending decrement test passed.")
+    except AssertionError as e:
+        logger.error(f"Trending decrement failed: {trending}")
+        raise
+
+    try:
+        # A burst that arrives before the next flush is due stays buffered...
+        aggregator = app.extensions['trending']
+        app.config['TRENDING_MATERIALIZE_INTERVAL'] = aggregator.interval = 3600
+        aggregator.finish_flush()
+        test_client.post('/api/comments', json={'post_id': busy_id, 'content': 'late'}, headers=headers)
+        assert aggregator.has_pending()
+
+        # ...until a read finds the flush due, without waiting for another comment
+        aggregator._next_flush = 0.0
+        trending = test_client.get('/api/posts/trending').get_json()
+        assert not aggregator.has_pending()
+        assert busy_id in [post['id'] for post in trending]
+        logger.info("Trending flush on read test passed.")
+    except AssertionError as e:
+        logger.error(f"Trending flush on read failed: {trending}")
+        raise
+
+
+def test_post_comment_stats(test_client):
+    """
+    Test that comment_count and last_comment_at are maintained on write
+    and can be rebuilt by the repair command.
+    """
+    logger.info("Starting test: test_post_comment_stats")
+
+    from app.extensions import db
+    from app.models.post import Post
+    from app.services.post_stats import repair_post_stats
+
+    app = test_client.application
+
+    try:
+        # Register and login
+        test_client.post('/api/auth/register', json={
+            'username': 'statskeeper',
+            'email': 'statskeeper@example.com',
+            'password': 'Pass1234'
+        })
+        login_res = test_client.post('/api/auth/login', json={
+            'username': 'statskeeper',
+            'password': 'Pass1234'
+        })
+        token = login_res.get_json()['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+
+        post_id = test_client.post('/api/posts', json={
+            'title': 'Counted',
+            'content': 'Comments are counted on write'
+        }, headers=headers).get_json()['id']
+    except Exception as e:
+        logger.error(f"Setup for post stats test failed: {e}")
+        raise
+
+    try:
+        # New posts start with no comments
+        post_data = test_client.get(f'/api/posts/{post_id}').get_json()
+        assert post_data['comment_count'] == 0
+        assert post_data['last_comment_at'] is None
+
+        comment_ids = [
+            test_client.post('/api/comments', json={
+                'post_id': post_id,
+                'content': f'Comment {i}'
+            }, headers=headers).get_json()['id']
+            for i in range(3)
+        ]
+
+        post_data = test_client.get(f'/api/posts/{post_id}').get_json()
+        assert post_data['comment_count'] == 3
+        assert post_data['last_comment_at'] is not None
+
+        # Comment writes are not post edits
+        with app.app_context():
+            assert db.session.get(Post, post_id).updated_at is None
+
+        test_client.delete(f'/api/comments/{comment_ids[-1]}', headers=headers)
+        listed = {p['id']: p for p in test_client.get('/api/posts').get_json()}
+        assert listed[post_id]['comment_count'] == 2
+        logger.info("Post stats maintained on write.")
+    except AssertionError as e:
+        logger.error(f"Post stats test failed: {e}")
+        raise
+
+    try:
+        # Corrupt the stats and rebuild them in bulk
+        with app.app_context():
+            post = db.session.get(Post, post_id)
+            post.comment_count = 42
+            post.last_comment_at = None
+            db.session.commit()
+            edited_at = post.updated_at
+
+            assert repair_post_stats() >= 1
+
+            db.session.expire_all()
+            post = db.session.get(Post, post_id)
+            assert post.comment_count == 2
+            assert post.last_comment_at is not None
+            assert post.updated_at == edited_at
+        logger.info("Post stats repair test passed.")
+    except AssertionError as e:
+        logger.error(f"Post stats repair failed: {e}")
+        raise
+
+
+def test_change_feed(test_client):
+    """
+    Test the incremental change feed:
+    - A full sync returns current posts and comments
+    - Later calls return only what changed after the cursor
+    - Deletes appear as tombstones
+    - A hole in the sequence holds the cursor back until it settles
+    """
+    logger.info("Starting test: test_change_feed")
+
+    from app.extensions import db
+    from app.models.change import Change
+
+    app = test_client.application
+
+    try:
+        test_client.post('/api/auth/register', json={
+            'username': 'syncer',
+            'email': 'syncer@example.com',
+            'password': 'Pass1234'
+        })
+        login_res = test_client.post('/api/auth/login', json={
+            'username': 'syncer',
+            'password': 'Pass1234'
+        })
+        headers = {'Authorization': f"Bearer {login_res.get_json()['access_token']}"}
+
+        # Start from the current end of the feed
+        cursor = 0
+        while True:
+            page = test_client.get(f'/api/changes?since={cursor}').get_json()
+            cursor = page['cursor']
+            if not page['has_more']:
+                break
+    except Exception as e:
+        logger.error(f"Change feed setup failed: {e}")
+        raise
+
+    try:
+        post_id = test_client.post('/api/posts', json={
+            'title': 'Synced',
+            'content': 'Version 1'
+        }, headers=headers).get_json()['id']
+        comment_id = test_client.post('/api/comments', json={
+            'post_id': post_id,
+            'content': 'Synced comment'
+        }, headers=headers).get_json()['id']
+        test_client.put(f'/api/posts/{post_id}', json={'content': 'Version 2'}, headers=headers)
+
+        page = test_client.get(f'/api/changes?since={cursor}').get_json()
+        changes = {(c['type'], c['id']): c for c in page['changes']}
+
+        # Create and update of the post are compacted into one upsert with the latest data
+        assert len(page['changes']) == 2
+        assert changes[('post', post_id)]['op'] == 'upsert'
+        assert changes[('post', post_id)]['data']['content'] == 'Version 2'
+        assert changes[('comment', comment_id)]['data']['content'] == 'Synced comment'
+        assert page['cursor'] > cursor
+        cursor = page['cursor']
+
+        # Nothing new since the cursor
+        assert test_client.get(f'/api/changes?since={cursor}').get_json()['changes'] == []
+        logger.info("Change feed upsert test passed.")
+    except AssertionError as e:
+        logger.error(f"Change feed upsert test failed: {e}")
+        raise
+
+    try:
+        test_client.delete(f'/api/comments/{comment_id}', headers=headers)
+        test_client.delete(f'/api/posts/{post_id}', headers=headers)
+
+        page = test_client.get(f'/api/changes?since={cursor}').get_json()
+        assert [(c['type'], c['id'], c['op']) for c in page['changes']] == [
+            ('comment', comment_id, 'delete'),
+            ('post', post_id, 'delete')
+        ]
+        assert 'data' not in page['changes'][0]
+        cursor = page['cursor']
+        logger.info("Change feed tombstone test passed.")
+    except AssertionError as e:
+        logger.error(f"Change feed tombstone test failed: {e}")
+        raise
+
+    try:
+        # Simulate a transaction that holds cursor + 1 but has not committed yet
+        with app.app_context():
+            db.session.add(Change(id=cursor + 2, entity='post', entity_id=post_id, op='delete'))
+            db.session.commit()
+
+        page = test_client.get(f'/api/changes?since={cursor}').get_json()
+        assert page['changes'] == [] and page['cursor'] == cursor
+
+        # Once the hole is older than the gap timeout it is skipped
+        original_timeout = app.config['CHANGE_FEED_GAP_TIMEOUT']
+        app.config['CHANGE_FEED_GAP_TIMEOUT'] = -60
+        try:
+            page = test_client.get(f'/api/changes?since={cursor}').get_json()
+        finally:
+            app.config['CHANGE_FEED_GAP_TIMEOUT'] = original_timeout
+        assert page['cursor'] == cursor + 2
+
+        assert test_client.get('/api/changes?since=-1').status_code == 400
+        # A malformed cursor is rejected instead of forcing a full resync
+        assert test_client.get('/api/changes?since=abc').status_code == 400
+        assert test_client.get('/api/changes?limit=abc').status_code == 400
+        logger.info("Change feed gap test passed.")
+    except AssertionError as e:
+        logger.error(f"Change feed gap test failed: {e}")
+        raise
+
+
+def test_total_counts(test_client):
+    """
+    Test X-Total-Count on list endpoints:
+    - The post total comes from the maintained counter and tracks creates/deletes
+    - Per-post comment totals are exact; other filters report their count type
+    - Planner estimates are read from PostgreSQL EXPLAIN output
+    """
+    logger.info("Starting test: test_total_counts")
+
+    from sqlalchemy.dialects import postgresql
+    from app.models.comment import Comment
+    from app.services.comment_archive import comments_list_query
+    from app.services.count_service import estimate_statement, parse_estimate
+
+    try:
+        test_client.post('/api/auth/register', json={
+            'username': 'counter',
+            'email': 'counter@example.com',
+            'password': 'Pass1234'
+        })
+        token = test_client.post('/api/auth/login', json={
+            'username': 'counter',
+            'password': 'Pass1234'
+        }).get_json()['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+    except Exception as e:
+        logger.error(f"Count setup failed: {e}")
+        raise
+
+    try:
+        response = test_client.get('/api/posts')
+        before = int(response.headers['X-Total-Count'])
+        assert before == len(response.get_json())
+        assert response.headers['X-Total-Count-Type'] == 'exact'
+
+        post_ids = [test_client.post('/api/posts', json={'title': f'Counted {i}', 'content': 'x'},
+                                     headers=headers).get_json()['id'] for i in range(3)]
+        test_client.delete(f'/api/posts/{post_ids[0]}', headers=headers)
+        response = test_client.get('/api/posts')
+        assert int(response.headers['X-Total-Count']) == before + 2 == len(response.get_json())
+
+        for content in ('one', 'two'):
+            test_client.post('/api/comments', json={'post_id': post_ids[1], 'content': content},
+                             headers=headers)
+        response = test_client.get(f'/api/comments?post_id={post_ids[1]}&limit=1')
+        assert response.headers['X-Total-Count'] == '2'
+        assert response.headers['X-Total-Count-Type'] == 'exact'
+
+        response = test_client.get('/api/comments?limit=1')
+        assert int(response.headers['X-Total-Count']) >= 2
+        assert response.headers['X-Total-Count-Type'] in ('exact', 'estimated')
+        logger.info("Total count headers test passed.")
+    except AssertionError as e:
+        logger.error(f"Total count headers test failed: {e}")
+        raise
+
+    try:
+        sql, params = estimate_statement(comments_list_query(Comment, post_id=7), postgresql.dialect())
+        assert sql.startswith('EXPLAIN (FORMAT JSON) SELECT') and 7 in params.values()
+        assert parse_estimate('[{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 1234}}]') == 1234
+        logger.info("Count estimate test passed.")
+    except AssertionError as e:
+        logger.error(f"Count estimate test failed: {e}")
+        raise
+
+
+def test_core_read_path(test_client):
+    """
+    Test that list endpoints served from Core rows match the schema output:
+    - GET /posts equals PostSchema dumping the ORM instances
+    - GET /comments equals CommentSchema dumping the ORM instances
+    - Listing builds no ORM instances in the session
+    """
+    logger.info("Starting test: test_core_read_path")
+
+    from app.extensions import db
+    from app.models.post import Post
+    from app.models.comment import Comment
+    from app.schemas.post_schema import posts_schema
+    from app.schemas.comment_schema import comments_schema
+    from app.services.read_path import post_list_query, read_rows
+
+    try:
+        test_client.post('/api/auth/register', json={
+            'username': 'corereader',
+            'email': 'corereader@example.com',
+            'password': 'Pass1234'
+        })
+        token = test_client.post('/api/auth/login', json={
+            'username': 'corereader',
+            'password': 'Pass1234'
+        }).get_json()['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+
+        post_id = test_client.post('/api/posts', json={'title': 'Core', 'content': 'Rows'},
+                                   headers=headers).get_json()['id']
+        test_client.put(f'/api/posts/{post_id}', json={'title': 'Core 2'}, headers=headers)
+        parent_id = test_client.post('/api/comments', json={'content': 'Top', 'post_id': post_id},
+                                     headers=headers).get_json()['id']
+        test_client.post('/api/comments', json={'content': 'Reply', 'post_id': post_id, 'parent_id': parent_id},
+                         headers=headers)
+    except Exception as e:
+        logger.error(f"Core read path setup failed: {e}")
+        raise
+
+    try:
+        posts = test_client.get('/api/posts').get_json()
+        comments = test_client.get(f'/api/comments?post_id={post_id}').get_json()
+
+        # The read path returns plain rows and leaves the session untouched
+        db.session.expunge_all()
+        rows = read_rows(post_list_query())
+        assert rows and not isinstance(rows[0], Post)
+        assert len(db.session.identity_map) == 0
+
+        expected_posts = posts_schema.dump(Post.query.filter(Post.deleted_at.is_(None)).all())
+        assert sorted(posts, key=lambda post: post['id']) == sorted(expected_posts, key=lambda post: post['id'])
+        expected_comments = comments_schema.dump(Comment.query.filter_by(post_id=post_id).order_by(Comment.id).all())
+        assert comments == expected_comments
+        assert comments[1]['parent_id'] == parent_id
+        logger.info("Core read path test passed.")
+    except AssertionError as e:
+        logger.error(f"Core read path test failed: {e}")
+        raise
+
+
+def test_post_write_query_counts(test_client, capture_queries):
+    """
+    Test that post writes are single conditional statements:
+    - Create and update return the row from INSERT/UPDATE ... RETURNING, with no read-back
+    - Updating or deleting another user's post is a 403, a missing post a 404
+    - Refused writes cost one extra owner lookup and change nothing
+    """
+    logger.info("Starting test: test_post_write_query_counts")
+
+    def auth_headers(username):
+        test_client.post('/api/auth/register', json={
+            'username': username,
+            'email': f'{username}@example.com',
+            'password': 'Pass1234'
+        })
+        token = test_client.post('/api/auth/login', json={
+            'username': username,
+            'password': 'Pass1234'
+        }).get_json()['access_token']
+        return {'Authorization': f'Bearer {token}'}
+
+    try:
+        owner = auth_headers('writecounter')
+        other = auth_headers('writeintruder')
+    except Exception as e:
+        logger.error(f"Write query count setup failed: {e}")
+        raise
+
+    def selects(statements):
+        # The first statement is the user lookup of jwt_required_with_user
+        return [s for s in statements[1:] if s.lstrip().upper().startswith('SELECT')]
+
+    try:
+        # User lookup, INSERT ... RETURNING, change feed, post counter
+        with capture_queries() as statements:
+            res = test_client.post('/api/posts', json={'title': 'Counted', 'content': 'Body'}, headers=owner)
+        assert res.status_code == 201
+        post = res.get_json()
+        assert post['created_at'] and post['comment_count'] == 0
+        assert len(statements) == 4 and not selects(statements)
+
+        # User lookup, UPDATE ... RETURNING, change feed
+        with capture_queries() as statements:
+            res = test_client.put(f"/api/posts/{post['id']}", json={'title': 'Counted 2'}, headers=owner)
+        assert res.status_code == 200
+        assert res.get_json()['title'] == 'Counted 2' and res.get_json()['content'] == 'Body'
+        assert res.get_json()['updated_at'] is not None
+        assert len(statements) == 3 and not selects(statements)
+
+        # Refused: the UPDATE/DELETE matches nothing, then one owner lookup
+        with capture_queries() as statements:
+            res = test_client.put(f"/api/posts/{post['id']}", json={'title': 'Hijacked'}, headers=other)
+        assert res.status_code == 403
+        assert len(statements) == 3
+        assert test_client.delete(f"/api/posts/{post['id']}", headers=other).status_code == 403
+        assert test_client.put('/api/posts/999999', json={'title': 'x'}, headers=owner).status_code == 404
+        assert test_client.delete('/api/posts/999999', headers=owner).status_code == 404
+        assert test_client.get(f"/api/posts/{post['id']}").get_json()['title'] == 'Counted 2'
+
+        # User lookup, comment probe, DELETE ... RETURNING, change feed, counter, comment cleanup
+        with capture_queries() as statements:
+            res = test_client.delete(f"/api/posts/{post['id']}", headers=owner)
+        assert res.status_code == 200
+        assert len(statements) == 7
+        assert test_client.put(f"/api/posts/{post['id']}", json={'title': 'x'}, headers=owner).status_code == 404
+        logger.info("Post write query count test passed.")
+    except AssertionError as e:
+        logger.error(f"Post write query count test failed: {e}")
+        raise
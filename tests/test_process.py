@@ -0,0 +1,36 @@
+import logging
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+def test_worker_fork_helpers(test_client):
+    """
+    Test the helpers used by the production server profile:
+    - memory_usage reports RSS figures
+    - reopen_log_handlers gives file handlers a fresh stream
+    - after_fork leaves the app able to open new connections
+    """
+    logger.info("Starting test: test_worker_fork_helpers")
+
+    from sqlalchemy import text
+    from app.extensions import db
+    from app.utils.process import memory_usage, reopen_log_handlers, after_fork
+
+    try:
+        usage = memory_usage()
+        assert usage['rss_kb'] > 0
+
+        file_handler = next(h for h in logger.handlers if isinstance(h, logging.FileHandler))
+        old_stream = file_handler.stream
+        assert reopen_log_handlers() >= 1
+        assert file_handler.stream is not old_stream
+        logger.info("Log handlers reopened.")
+
+        # Pools are disposed, so the worker opens its own fresh connection
+        after_fork(test_client.application)
+        assert db.session.execute(text('SELECT 1')).scalar() == 1
+        logger.info("Worker fork helpers test passed.")
+    except AssertionError as e:
+        logger.error(f"Worker fork helpers test failed: {e}")
+        raise
@@ -0,0 +1,64 @@
+import os
+import threading
+import time
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+
+def test_profile_requests_on_demand(test_client, tmp_path):
+    """
+    Test the request profiler:
+    - Without a matching X-Profile header (and sampling off) nothing is written.
+    - With the header, the request's collapsed stacks land in a file tagged
+      with its endpoint, named in X-Profile-File.
+    - The sampler records the stacks of the thread it watches.
+    """
+    logger.info("Starting test: test_profile_requests_on_demand")
+
+    from app.utils.profiling import init_profiling, StackSampler
+
+    app = test_client.application
+    app.config.update({'PROFILING_TOKEN': 'let-me-profile', 'PROFILING_DIR': str(tmp_path),
+                       'PROFILING_INTERVAL_MS': 1})
+    init_profiling(app)
+
+    try:
+        assert 'X-Profile-File' not in test_client.get('/api/posts').headers
+        assert 'X-Profile-File' not in test_client.get('/api/posts', headers={'X-Profile': 'wrong'}).headers
+        assert os.listdir(tmp_path) == []
+
+        res = test_client.get('/api/posts', headers={'X-Profile': 'let-me-profile'})
+        assert res.status_code == 200
+        name = res.headers['X-Profile-File']
+        assert name.startswith('posts.get_posts-') and name.endswith('.collapsed')
+        assert os.listdir(tmp_path) == [name]
+        with open(tmp_path / name, encoding='utf-8') as f:
+            for line in f:
+                stack, count = line.rsplit(' ', 1)
+                assert int(count) > 0 and ':' in stack
+        logger.info(f"Profile written to {name}.")
+    except AssertionError:
+        logger.error("Profiling a request failed.")
+        raise
+
+    try:
+        def busy_wait():
+            deadline = time.perf_counter() + 0.05
+            while time.perf_counter() < deadline:
+                pass
+
+        worker = threading.Thread(target=busy_wait)
+        worker.start()
+        sampler = StackSampler(worker.ident, 0.001).start()
+        worker.join()
+        sampler.stop()
+
+        assert sampler.samples > 0
+        assert any(stack.endswith('tests.test_profiling:busy_wait') for stack in sampler.stacks)
+        assert sampler.collapsed().splitlines()[0].rsplit(' ', 1)[1].isdigit()
+        logger.info(f"Sampler took {sampler.samples} sample(s).")
+    except AssertionError:
+        logger.error("Stack sampling failed.")
+        raise
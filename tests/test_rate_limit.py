@@ -0,0 +1,166 @@
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+def test_rate_limits(test_client):
+    """
+    Test token-bucket rate limiting:
+    - Logins beyond the per-IP policy get 429 with Retry-After
+    - Availability checks are throttled per IP as well
+    - Behind trusted proxies, buckets are keyed by the forwarded client IP
+    - Write quotas are tracked per user
+    """
+    logger.info("Starting test: test_rate_limits")
+
+    app = test_client.application
+    original = {key: app.config[key] for key in
+                ('RATE_LIMIT_ENABLED', 'RATE_LIMIT_LOGIN', 'RATE_LIMIT_WRITES', 'RATE_LIMIT_AVAILABILITY')}
+
+    try:
+        # Register two users before limits apply
+        tokens = {}
+        for username in ('limited1', 'limited2'):
+            test_client.post('/api/auth/register', json={
+                'username': username,
+                'email': f'{username}@example.com',
+                'password': 'Pass1234'
+            })
+            tokens[username] = test_client.post('/api/auth/login', json={
+                'username': username,
+                'password': 'Pass1234'
+            }).get_json()['access_token']
+
+        app.config.update(RATE_LIMIT_ENABLED=True, RATE_LIMIT_LOGIN='2/minute', RATE_LIMIT_WRITES='1/minute',
+                          RATE_LIMIT_AVAILABILITY='2/minute')
+        app.extensions.pop('rate_limiter', None)
+    except Exception as e:
+        logger.error(f"Rate limit setup failed: {e}")
+        raise
+
+    try:
+        credentials = {'username': 'limited1', 'password': 'Pass1234'}
+        assert test_client.post('/api/auth/login', json=credentials).status_code == 200
+        assert test_client.post('/api/auth/login', json=credentials).status_code == 200
+
+        throttled = test_client.post('/api/auth/login', json=credentials)
+        assert throttled.status_code == 429
+        assert 1 <= int(throttled.headers['Retry-After']) <= 30
+        logger.info("Login rate limit test passed.")
+    except AssertionError as e:
+        logger.error(f"Login rate limit test failed: {e}")
+        raise
+
+    try:
+        for _ in range(2):
+            assert test_client.get('/api/auth/available?email=limited1@example.com').status_code == 200
+        assert test_client.get('/api/auth/available?email=other@example.com').status_code == 429
+        logger.info("Availability rate limit test passed.")
+    except AssertionError as e:
+        logger.error(f"Availability rate limit test failed: {e}")
+        raise
+
+    try:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+
+        wsgi_app = app.wsgi_app
+        app.wsgi_app = ProxyFix(wsgi_app, x_for=1)
+        try:
+            for _ in range(2):
+                res = test_client.get('/api/auth/available?username=x',
+                                      headers={'X-Forwarded-For': '203.0.113.1'})
+                assert res.status_code == 200
+            # Another client behind the same proxy has a bucket of its own
+            res = test_client.get('/api/auth/available?username=x', headers={'X-Forwarded-For': '203.0.113.2'})
+            assert res.status_code == 200
+            res = test_client.get('/api/auth/available?username=x', headers={'X-Forwarded-For': '203.0.113.1'})
+            assert res.status_code == 429
+        finally:
+            app.wsgi_app = wsgi_app
+        logger.info("Forwarded client IP rate limit test passed.")
+    except AssertionError as e:
+        logger.error(f"Forwarded client IP rate limit test failed: {e}")
+        raise
+
+    try:
+        post = {'title': 'Quota', 'content': 'One per minute'}
+        first = {'Authorization': f"Bearer {tokens['limited1']}"}
+        second = {'Authorization': f"Bearer {tokens['limited2']}"}
+
+        assert test_client.post('/api/posts', json=post, headers=first).status_code == 201
+        assert test_client.post('/api/posts', json=post, headers=first).status_code == 429
+
+        # Another user has a bucket of their own
+        assert test_client.post('/api/posts', json=post, headers=second).status_code == 201
+        logger.info("Per-user write quota test passed.")
+    except AssertionError as e:
+        logger.error(f"Per-user write quota test failed: {e}")
+        raise
+    finally:
+        app.config.update(original)
+        app.extensions.pop('rate_limiter', None)
+
+
+def test_rate_limit_backends(tmp_path):
+    """
+    Test the bucket backends directly:
+    - Buckets refill over time
+    - The SQLite backend shares buckets between independent instances (processes)
+    """
+    logger.info("Starting test: test_rate_limit_backends")
+
+    from app.utils.rate_limit import MemoryBackend, SQLiteBackend, parse_rate
+
+    try:
+        assert parse_rate('10/minute') == (10, 10 / 60, 60)
+        assert parse_rate('5/30s') == (5, 5 / 30, 30)
+        assert parse_rate('1/s') == (1, 1.0, 1)
+        assert parse_rate('10/s') == (10, 10.0, 1)
+        assert parse_rate('2/hours') == (2, 2 / 3600, 3600)
+        for invalid in ('10/', '10/fortnight', 'ten/minute'):
+            try:
+                parse_rate(invalid)
+                raise AssertionError(f"{invalid!r} was accepted")
+            except ValueError:
+                pass
+
+        memory = MemoryBackend()
+        assert memory.take('k', 1, 1.0, now=100.0) == (True, 0.0)
+        allowed, retry_after = memory.take('k', 1, 1.0, now=100.5)
+        assert not allowed and abs(retry_after - 0.5) < 1e-9
+        assert memory.take('k', 1, 1.0, now=101.0)[0]
+        logger.info("Memory backend test passed.")
+
+        path = str(tmp_path / 'buckets.sqlite3')
+        worker_a, worker_b = SQLiteBackend(path), SQLiteBackend(path)
+        assert worker_a.take('login:ip:1.2.3.4', 2, 0.01, now=100.0)[0]
+        assert worker_b.take('login:ip:1.2.3.4', 2, 0.01, now=100.0)[0]
+        assert not worker_a.take('login:ip:1.2.3.4', 2, 0.01, now=100.0)[0]
+        assert worker_b.prune(older_than=200.0) == 1
+        logger.info("SQLite backend test passed.")
+    except AssertionError as e:
+        logger.error(f"Rate limit backend test failed: {e}")
+        raise
+
+
+def test_trusted_proxy_hops(monkeypatch):
+    """
+    Test that TRUSTED_PROXY_HOPS wraps the app in ProxyFix, and that it is off by default.
+    """
+    logger.info("Starting test: test_trusted_proxy_hops")
+
+    from werkzeug.middleware.proxy_fix import ProxyFix
+    from app import create_app
+    from app.config import Config
+
+    try:
+        assert not isinstance(create_app().wsgi_app, ProxyFix)
+
+        monkeypatch.setattr(Config, 'TRUSTED_PROXY_HOPS', 2)
+        wsgi_app = create_app().wsgi_app
+        assert isinstance(wsgi_app, ProxyFix)
+        assert wsgi_app.x_for == 2 and wsgi_app.x_proto == 2
+        logger.info("Trusted proxy hops test passed.")
+    except AssertionError as e:
+        logger.error(f"Trusted proxy hops test failed: {e}")
+        raise
@@ -0,0 +1,135 @@
+from sqlalchemy import select, func
+from app.logger import setup_logger
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+
+def _register(test_client, username):
+    test_client.post('/api/auth/register', json={
+        'username': username,
+        'email': f'{username}@example.com',
+        'password': 'Pass1234'
+    })
+    login_res = test_client.post('/api/auth/login', json={'username': username, 'password': 'Pass1234'})
+    return {'Authorization': f"Bearer {login_res.get_json()['access_token']}"}
+
+
+def _post_ids_on(shard):
+    from app.models.post import Post
+    from app.services.shard_service import shard_engine
+
+    with shard_engine(shard).connect() as conn:
+        return set(conn.execute(select(Post.__table__.c.id)).scalars())
+
+
+def test_sharded_posts_and_comments(test_client, tmp_path):
+    """
+    Test the sharded write and read paths:
+    - With two extra shards, posts land on their author's shard.
+    - Lists merge every shard; single reads, updates and deletes find the
+      right shard; unknown ids are 404.
+    - Adding a shard and rebalancing moves posts to their new placement
+      and keeps them readable.
+    """
+    logger.info("Starting test: test_sharded_posts_and_comments")
+
+    from app.extensions import db
+    from app.models.comment import Comment
+    from app.services.shard_service import init_shards, place_author, rebalance, shard_counts, shard_engine
+    from app.utils.sharding import get_shard_engines
+
+    app = test_client.application
+    app.config['SHARD_BINDS'] = f"east=sqlite:///{tmp_path}/east.db,west=sqlite:///{tmp_path}/west.db"
+
+    try:
+        init_shards()
+        authors = {}
+        for username in ('shard_alice', 'shard_bob', 'shard_carol', 'shard_dave'):
+            headers = _register(test_client, username)
+            post_res = test_client.post('/api/posts', json={'title': username, 'content': 'Sharded'}, headers=headers)
+            assert post_res.status_code == 201
+            post = post_res.get_json()
+            authors[username] = (headers, post['id'], post['author_id'])
+
+        ids = [post_id for _, post_id, _ in authors.values()]
+        assert ids == sorted(ids) and len(set(ids)) == len(ids)
+        for _, post_id, author_id in authors.values():
+            assert post_id in _post_ids_on(place_author(author_id))
+        logger.info(f"Posts placed by author: {shard_counts()}")
+    except AssertionError:
+        logger.error("Sharded post creation failed.")
+        raise
+
+    try:
+        list_res = test_client.get('/api/posts')
+        assert list_res.status_code == 200
+        assert [post['id'] for post in list_res.get_json()] == ids
+
+        headers, post_id, _ = authors['shard_alice']
+        other_headers = authors['shard_bob'][0]
+        assert test_client.get(f'/api/posts/{post_id}').status_code == 200
+        assert test_client.get(f'/api/posts/{max(ids) + 100}').status_code == 404
+
+        update_res = test_client.put(f'/api/posts/{post_id}', json={'title': 'Moved?'}, headers=headers)
+        assert update_res.status_code == 200 and update_res.get_json()['title'] == 'Moved?'
+        assert test_client.put(f'/api/posts/{post_id}', json={'title': 'x'}, headers=other_headers).status_code == 403
+
+        comment_res = test_client.post('/api/comments', json={'post_id': post_id, 'content': 'First'}, headers=other_headers)
+        assert comment_res.status_code == 201
+        comment_id = comment_res.get_json()['id']
+        reply_res = test_client.post('/api/comments', json={
+            'post_id': post_id, 'content': 'Reply', 'parent_id': comment_id
+        }, headers=headers)
+        assert reply_res.status_code == 201
+        assert test_client.post('/api/comments', json={
+            'post_id': max(ids) + 100, 'content': 'Lost'
+        }, headers=headers).status_code == 404
+
+        with shard_engine(place_author(authors['shard_alice'][2])).connect() as conn:
+            assert conn.execute(select(func.count()).select_from(Comment.__table__)).scalar() == 2
+
+        assert len(test_client.get(f'/api/comments?post_id={post_id}').get_json()) == 2
+        assert [c['id'] for c in test_client.get('/api/comments').get_json()][-2:] == [comment_id, reply_res.get_json()['id']]
+        assert test_client.get(f'/api/comments/{comment_id}').status_code == 200
+        assert test_client.put(f'/api/comments/{comment_id}', json={'content': 'Edited'},
+                               headers=other_headers).status_code == 200
+        logger.info("Sharded reads and writes succeeded.")
+    except AssertionError:
+        logger.error("Sharded reads or writes failed.")
+        raise
+
+    try:
+        # A third shard takes over the authors it wins; nothing else moves
+        app.config['SHARD_BINDS'] += f",north=sqlite:///{tmp_path}/north.db"
+        init_shards()
+        expected = {post_id: place_author(author_id) for _, post_id, author_id in authors.values()}
+        planned = rebalance(100, dry_run=True)
+        moved = rebalance(100)
+        assert moved == planned
+        assert sum(moved.values()) == sum(target == 'north' for target in expected.values())
+        assert all(key.endswith('->north') for key in moved)
+
+        for post_id, shard in expected.items():
+            assert post_id in _post_ids_on(shard)
+            assert all(post_id not in _post_ids_on(other) for other in shard_counts() if other != shard)
+        assert rebalance(100) == {}
+
+        assert [post['id'] for post in test_client.get('/api/posts').get_json()] == ids
+        dave_post = authors['shard_dave'][1]
+        assert test_client.get(f'/api/comments?post_id={dave_post}').get_json() == []
+        alice_post = authors['shard_alice'][1]
+        assert len(test_client.get(f'/api/comments?post_id={alice_post}').get_json()) == 2
+
+        delete_res = test_client.delete(f'/api/posts/{alice_post}', headers=authors['shard_alice'][0])
+        assert delete_res.status_code == 200
+        assert test_client.get(f'/api/posts/{alice_post}').status_code == 404
+        assert test_client.get(f'/api/comments/{comment_id}').status_code == 404
+        logger.info(f"Rebalance moved {moved}.")
+    except AssertionError:
+        logger.error("Rebalance failed.")
+        raise
+    finally:
+        db.session.rollback()
+        app.config['SHARD_BINDS'] = ''
+        get_shard_engines(app)
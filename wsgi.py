@@ -1,7 +1,12 @@
-"""WSGI entry point for production deployment (e.g., Gunicorn or uWSGI)."""
+"""WSGI entry point for production deployment (e.g., Gunicorn or uWSGI).
+
+For the preload-friendly production profile, run:
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
 
 from app import create_app
 from app.logger import setup_logger
+from app.utils.process import freeze_gc
 
 # Initialize the logger
 logger = setup_logger(__name__)
@@ -13,3 +18,6 @@ logger.info("Flask application instance created successfully for WSGI deployment
 
 # Optional: expose `app` as a module-level variable (default behavior for WSGI servers)
 # WSGI servers like Gunicorn or uWSGI look for a variable named `app` by default.
+
+# Keep import-time objects out of future GC passes so forked workers share their pages
+freeze_gc()